@@ -227,4 +227,23 @@ COLUMN_NAME_STANDARDIZATION = {
     'precio': ['price', 'cost', 'amount', 'total', 'valor'],
     'cantidad': ['quantity', 'qty', 'count', 'units'],
     'nombre': ['name', 'title', 'description', 'desc']
-}
\ No newline at end of file
+}
+
+
+def required_columns(dataset_config: Dict) -> List[str]:
+    """
+    Columnas que usa la configuración de limpieza de un dataset.
+    
+    Args:
+        dataset_config (Dict): Configuración de limpieza del dataset
+        
+    Returns:
+        List[str]: Columnas referenciadas, sin duplicados
+    """
+    columns = []
+    for key in ['text_columns', 'outlier_columns', 'duplicate_subset']:
+        columns.extend(dataset_config.get(key) or [])
+    for key in ['type_mapping', 'fill_values']:
+        columns.extend((dataset_config.get(key) or {}).keys())
+    
+    return list(dict.fromkeys(columns))
@@ -13,12 +13,15 @@ Versión: 1.0
 import pandas as pd
 import numpy as np
 import os
+import sys
 import zipfile
 import logging
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Union
 import warnings
 
+from config import COLUMN_NAME_STANDARDIZATION, required_columns
+
 warnings.filterwarnings('ignore')
 
 # Importar el detector de inconsistencias
@@ -32,6 +35,18 @@ try:
 except ImportError:
     INCONSISTENCY_DETECTOR_AVAILABLE = False
 
+# Lectura/escritura unificada (data-cleaning-project/src/utils/file_handlers.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'data-cleaning-project', 'src', 'utils'))
+try:
+    from file_handlers import iter_chunks, read_columns, read_table, resolve_columns, write_table
+    FILE_HANDLERS_AVAILABLE = True
+except ImportError:
+    FILE_HANDLERS_AVAILABLE = False
+
+# Filas leídas para conocer los tipos de columna al planificar la proyección
+PLAN_SAMPLE_ROWS = 1_000
+
 
 class DataCleaningPipeline:
     """
@@ -56,6 +71,7 @@ class DataCleaningPipeline:
         self.cleaning_report = {}
         self.inconsistency_detector = None
         self.inconsistencies_found = []
+        self.quarantine_data = {}
         
     def _setup_logger(self, level: str) -> logging.Logger:
         """
@@ -90,12 +106,17 @@ class DataCleaningPipeline:
             
         return logger
     
-    def extract_and_load_data(self, file_mapping: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    def extract_and_load_data(self, file_mapping: Dict[str, str],
+                              columns: Dict[str, List[str]] = None,
+                              standardize_names: bool = False) -> Dict[str, pd.DataFrame]:
         """
         Extrae y carga datos desde archivos CSV.
         
         Args:
             file_mapping (Dict[str, str]): Mapeo de nombre_dataset -> nombre_archivo
+            columns (Dict[str, List[str]]): Columnas a leer por dataset (las
+                demás no se parsean); ver plan_columns
+            standardize_names (bool): Renombrar al leer según COLUMN_NAME_STANDARDIZATION
             
         Returns:
             Dict[str, pd.DataFrame]: Diccionario con los DataFrames cargados
@@ -110,8 +131,8 @@ class DataCleaningPipeline:
                 if filename.endswith('.zip'):
                     file_path = self._extract_zip(file_path)
                 
-                # Cargar CSV
-                df = pd.read_csv(file_path)
+                # Cargar archivo (formato y compresión detectados automáticamente)
+                df = self._read_dataset(file_path, (columns or {}).get(dataset_name), standardize_names)
                 self.raw_data[dataset_name] = df
                 
                 self.logger.info(
@@ -125,6 +146,85 @@ class DataCleaningPipeline:
         self.logger.info(f"🎉 Extracción completada: {len(self.raw_data)} datasets cargados")
         return self.raw_data
     
+    def _read_dataset(self, file_path: str, columns: List[str] = None,
+                      standardize_names: bool = False) -> pd.DataFrame:
+        """
+        Lee un archivo parseando solo las columnas indicadas (por nombre
+        estándar si se estandarizan los nombres).
+        """
+        if FILE_HANDLERS_AVAILABLE:
+            if columns is None and not standardize_names:
+                return read_table(file_path)
+            standardization = COLUMN_NAME_STANDARDIZATION if standardize_names else {}
+            return read_table(file_path, columns=columns, standardization=standardization)
+        
+        if standardize_names:
+            self.logger.warning("file_handlers no disponible: nombres de columnas sin estandarizar")
+        usecols = (lambda column: column in columns) if columns is not None else None
+        return pd.read_csv(file_path, usecols=usecols)
+    
+    def plan_columns(self, file_mapping: Dict[str, str], cleaning_config: Dict[str, Dict] = None,
+                     standardize_names: bool = False) -> Dict[str, List[str]]:
+        """
+        Calcula qué columnas necesita cada dataset a partir de su
+        configuración de limpieza.
+        
+        Los datasets sin configuración de limpieza se leen completos. Si el
+        detector está inicializado se añaden las columnas de sus reglas y
+        referencias y las que revisan los detectores de formato, rango,
+        temporales y estadísticos, que se eligen por tipo a partir de una
+        muestra de las primeras filas. Las tablas con reglas definidas como
+        funciones se leen completas (no declaran sus columnas).
+        
+        Args:
+            file_mapping (Dict[str, str]): Mapeo de nombre_dataset -> nombre_archivo
+            cleaning_config (Dict[str, Dict]): Configuración específica por dataset
+            standardize_names (bool): Si los nombres se estandarizan al leer
+            
+        Returns:
+            Dict[str, List[str]]: Columnas a leer por dataset
+        """
+        if not FILE_HANDLERS_AVAILABLE:
+            self.logger.warning("file_handlers no disponible: se leerán todas las columnas")
+            return {}
+        
+        plan = {}
+        for dataset_name, filename in file_mapping.items():
+            config = (cleaning_config or {}).get(dataset_name)
+            if not config:
+                continue
+            
+            try:
+                header = read_columns(os.path.join(self.base_path, filename))
+            except Exception as e:
+                self.logger.warning(f"No se pudo leer la cabecera de {dataset_name}: {e}")
+                continue
+            
+            renames = {}
+            if standardize_names:
+                renames = resolve_columns(header, None, COLUMN_NAME_STANDARDIZATION)[1]
+                header = [renames.get(column, column) for column in header]
+            
+            needed = required_columns(config)
+            if self.inconsistency_detector:
+                try:
+                    sample = next(iter_chunks(os.path.join(self.base_path, filename),
+                                              chunk_rows=PLAN_SAMPLE_ROWS, rename=renames), None)
+                except Exception as e:
+                    self.logger.warning(f"No se pudo leer una muestra de {dataset_name}: {e}")
+                    continue
+                dtypes = sample.dtypes.to_dict() if sample is not None else None
+                rule_columns = self.inconsistency_detector.required_columns(dataset_name, header,
+                                                                            dtypes=dtypes)
+                if rule_columns is None:
+                    continue
+                needed += rule_columns
+            
+            plan[dataset_name] = [column for column in header if column in needed]
+            self.logger.info(f"📐 {dataset_name}: {len(plan[dataset_name])} de {len(header)} columnas")
+        
+        return plan
+    
     def _extract_zip(self, zip_path: str) -> str:
         """
         Extrae archivos ZIP si es necesario.
@@ -431,11 +531,7 @@ class DataCleaningPipeline:
         references_to_use = references or MEGAMERCADO_REFERENCES
         
         # Añadir reglas de negocio
-        for table, table_rules in rules_to_use.items():
-            for rule_name, rule_info in table_rules.items():
-                self.inconsistency_detector.add_business_rule(
-                    table, rule_name, rule_info['function'], rule_info['severity']
-                )
+        self.inconsistency_detector.add_business_rules(rules_to_use)
         
         # Añadir referencias de integridad
         for child_ref, parent_info in references_to_use.items():
@@ -488,15 +584,50 @@ class DataCleaningPipeline:
         return {
             'inconsistencies_by_table': inconsistencies_by_table,
             'summary': summary,
-            'detailed_report': self.inconsistency_detector.generate_inconsistency_report()
+            'violation_bitmaps': dict(self.inconsistency_detector.violation_bitmaps)
         }
     
+    def route_to_quarantine(self, df: pd.DataFrame, dataset_name: str,
+                            severities: List[str] = None) -> pd.DataFrame:
+        """
+        Separa las filas que violan reglas de negocio usando el bitmap de
+        violaciones del detector (un único filtro vectorizado).
+        
+        Las filas separadas se guardan en ``self.quarantine_data`` con la
+        columna 'reglas_violadas'.
+        
+        Args:
+            df (pd.DataFrame): Dataset original (el mismo que se validó)
+            dataset_name (str): Nombre del dataset
+            severities (List[str]): Severidades a poner en cuarentena (None = todas)
+            
+        Returns:
+            pd.DataFrame: Filas que no violan ninguna regla de esas severidades
+        """
+        bitmap = self.inconsistency_detector.get_violation_bitmap(dataset_name) if self.inconsistency_detector else None
+        if bitmap is None or bitmap.n_rows != len(df):
+            return df
+        
+        quarantined = bitmap.any_mask(severities)
+        if not quarantined.any():
+            return df
+        
+        quarantine_df = df[quarantined].copy()
+        quarantine_df['reglas_violadas'] = bitmap.rule_labels(quarantined).to_numpy()
+        self.quarantine_data[dataset_name] = quarantine_df
+        
+        self.logger.info(f"🚧 {dataset_name}: {len(quarantine_df)} registros enviados a cuarentena")
+        return df[~quarantined]
+    
     def run_complete_pipeline(self, 
                             file_mapping: Dict[str, str],
                             cleaning_config: Dict[str, Dict] = None,
                             detect_inconsistencies: bool = True,
                             business_rules: Dict = None,
-                            references: Dict = None) -> Dict[str, pd.DataFrame]:
+                            references: Dict = None,
+                            quarantine_severities: List[str] = None,
+                            project_columns: bool = False,
+                            standardize_names: bool = False) -> Dict[str, pd.DataFrame]:
         """
         Ejecuta el pipeline completo de limpieza de datos.
         
@@ -506,19 +637,32 @@ class DataCleaningPipeline:
             detect_inconsistencies (bool): Si detectar inconsistencias antes de limpiar
             business_rules (Dict): Reglas de negocio personalizadas para detección
             references (Dict): Referencias de integridad entre tablas
+            quarantine_severities (List[str]): Severidades cuyas filas se separan
+                a cuarentena antes de limpiar (ej. ['CRITICAL', 'HIGH'])
+            project_columns (bool): Leer solo las columnas que usan la limpieza y,
+                con detección de inconsistencias, los detectores y reglas; las
+                tablas con reglas definidas como funciones se leen completas
+                (ver plan_columns)
+            standardize_names (bool): Renombrar columnas al leer según
+                COLUMN_NAME_STANDARDIZATION
             
         Returns:
             Dict[str, pd.DataFrame]: Datasets limpios
         """
         self.logger.info("🚀 Iniciando pipeline completo de limpieza de datos")
         
-        # 1. Extraer y cargar datos
-        self.extract_and_load_data(file_mapping)
+        detection_enabled = detect_inconsistencies and INCONSISTENCY_DETECTOR_AVAILABLE
+        if detection_enabled:
+            self.initialize_inconsistency_detector(business_rules, references)
+        
+        # 1. Extraer y cargar datos (solo las columnas necesarias si se solicita)
+        columns = self.plan_columns(file_mapping, cleaning_config, standardize_names) if project_columns else None
+        self.extract_and_load_data(file_mapping, columns, standardize_names)
+        self.quarantine_data = {}
         
         # 2. Detectar inconsistencias si se solicita
         inconsistency_report = {}
-        if detect_inconsistencies and INCONSISTENCY_DETECTOR_AVAILABLE:
-            self.initialize_inconsistency_detector(business_rules, references)
+        if detection_enabled:
             inconsistency_report = self.detect_data_inconsistencies()
             
             if inconsistency_report.get('summary', {}).get('total', 0) > 0:
@@ -546,6 +690,10 @@ class DataCleaningPipeline:
             # Pipeline de limpieza
             df_clean = df.copy()
             
+            # 0. Separar filas que violan reglas de negocio
+            if quarantine_severities and inconsistency_report:
+                df_clean = self.route_to_quarantine(df_clean, dataset_name, quarantine_severities)
+            
             # 1. Limpiar columnas de texto
             df_clean = self.clean_text_columns(df_clean, config.get('text_columns'))
             
@@ -630,6 +778,7 @@ class DataCleaningPipeline:
                     f"Registros eliminados: {initial_report.get('total_records', 0) - final_report.get('total_records', 0):,}",
                     f"Duplicados iniciales: {initial_report.get('duplicates', 0):,}",
                     f"Duplicados finales: {final_report.get('duplicates', 0):,}",
+                    f"Registros en cuarentena: {len(self.quarantine_data.get(dataset_name, [])):,}",
                     ""
                 ])
         
@@ -678,9 +827,20 @@ class DataCleaningPipeline:
         
         for dataset_name, df in self.clean_data.items():
             file_path = os.path.join(output_path, f"{dataset_name}_clean.csv")
-            df.to_csv(file_path, index=False)
+            if FILE_HANDLERS_AVAILABLE:
+                write_table(df, file_path)
+            else:
+                df.to_csv(file_path, index=False)
             self.logger.info(f"💾 Dataset guardado: {file_path}")
         
+        for dataset_name, df in self.quarantine_data.items():
+            file_path = os.path.join(output_path, f"{dataset_name}_quarantine.csv")
+            if FILE_HANDLERS_AVAILABLE:
+                write_table(df, file_path)
+            else:
+                df.to_csv(file_path, index=False)
+            self.logger.info(f"🚧 Cuarentena guardada: {file_path}")
+        
         # Guardar reporte de limpieza
         report_path = os.path.join(output_path, "cleaning_report.txt")
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -688,11 +848,10 @@ class DataCleaningPipeline:
         
         self.logger.info(f"📄 Reporte de limpieza guardado: {report_path}")
         
-        # Guardar reporte detallado de inconsistencias si existe
-        if 'inconsistencies' in self.cleaning_report:
+        # Reporte detallado de inconsistencias: se escribe en streaming desde el detector
+        if 'inconsistencies' in self.cleaning_report and self.inconsistency_detector:
             inconsistency_report_path = os.path.join(output_path, "inconsistencies_report.txt")
-            with open(inconsistency_report_path, 'w', encoding='utf-8') as f:
-                f.write(self.cleaning_report['inconsistencies'].get('detailed_report', ''))
+            self.inconsistency_detector.write_inconsistency_report(inconsistency_report_path)
             
             self.logger.info(f"📄 Reporte de inconsistencias guardado: {inconsistency_report_path}")
 
@@ -11,6 +11,8 @@ import pandas as pd
 import re
 from datetime import datetime, timedelta
 
+from rule_engine import entity_violation_mask
+
 # ============================================================================
 # REGLAS DE NEGOCIO PREDEFINIDAS
 # ============================================================================
@@ -150,49 +152,66 @@ def validate_price_greater_than_cost(df: pd.DataFrame) -> pd.DataFrame:
 def validate_unique_emails_per_customer(df: pd.DataFrame) -> pd.DataFrame:
     """Valida que cada email pertenezca a un único cliente."""
     if 'email' in df.columns and 'id_cliente' in df.columns:
-        email_customer_counts = df.groupby('email')['id_cliente'].nunique()
-        duplicate_emails = email_customer_counts[email_customer_counts > 1].index
-        return df[df['email'].isin(duplicate_emails)]
+        return df[entity_violation_mask(df, 'email', ['id_cliente'])]
     return pd.DataFrame()
 
+CUSTOMER_UNIQUE_FIELDS = ['email', 'telefono', 'documento', 'dni']
+
 def validate_consistent_customer_data(df: pd.DataFrame) -> pd.DataFrame:
     """Valida consistencia en datos del mismo cliente."""
     if 'id_cliente' in df.columns:
-        # Verificar que el mismo cliente tenga datos consistentes
-        inconsistent_data = pd.DataFrame()
-        
-        for customer_id in df['id_cliente'].unique():
-            customer_data = df[df['id_cliente'] == customer_id]
-            
-            # Verificar campos que deberían ser únicos por cliente
-            unique_fields = ['email', 'telefono', 'documento', 'dni']
-            
-            for field in unique_fields:
-                if field in df.columns:
-                    unique_values = customer_data[field].dropna().unique()
-                    if len(unique_values) > 1:
-                        inconsistent_data = pd.concat([inconsistent_data, customer_data])
-        
-        return inconsistent_data.drop_duplicates()
+        # Campos que deberían ser únicos por cliente, en una sola pasada groupby
+        mask = entity_violation_mask(df, 'id_cliente', CUSTOMER_UNIQUE_FIELDS)
+        return df[mask].drop_duplicates()
     return pd.DataFrame()
 
 # ============================================================================
 # CONFIGURACIONES POR DOMINIO
 # ============================================================================
 
+# Expresiones declarativas equivalentes a las funciones de validación
+# vectorizables. Cada lista contiene alternativas por nombre de columna;
+# solo se evalúan las que aplican a la tabla (ver rule_engine.py).
+AGE_RANGE_EXPRESSIONS = [
+    f"{col} between 0 and 150" for col in ['edad', 'age', 'anos', 'years']
+]
+
+POSITIVE_AMOUNT_EXPRESSIONS = [
+    f"{col} >= 0" for col in ['precio', 'costo', 'monto', 'total', 'subtotal', 'amount', 'cost', 'price']
+]
+
+PRICE_VS_COST_EXPRESSIONS = [
+    'precio > costo',
+    'price > cost',
+    'precio_venta > precio_costo',
+    'sale_price > cost_price'
+]
+
+NON_NEGATIVE_STOCK_EXPRESSIONS = [
+    f"{col} >= 0" for col in ['stock', 'inventory', 'inventario', 'cantidad_disponible']
+]
+
+DELIVERY_AFTER_ORDER_EXPRESSIONS = [
+    'fecha_entrega >= fecha_pedido',
+    'delivery_date >= order_date',
+    'fecha_entrega >= fecha_orden',
+    'shipped_date >= created_date'
+]
+
 # Configuración para E-commerce
 ECOMMERCE_INCONSISTENCY_RULES = {
     'clientes': {
         'email_format': {
             'function': validate_email_format,
-            'severity': 'HIGH'
+            'severity': 'HIGH',
+            'row_local': True
         },
         'phone_format': {
             'function': validate_phone_format,
             'severity': 'MEDIUM'
         },
         'age_range': {
-            'function': validate_age_range,
+            'expression': AGE_RANGE_EXPRESSIONS,
             'severity': 'HIGH'
         },
         'future_birth_dates': {
@@ -200,41 +219,41 @@ ECOMMERCE_INCONSISTENCY_RULES = {
             'severity': 'HIGH'
         },
         'unique_emails': {
-            'function': validate_unique_emails_per_customer,
+            'unique_per_entity': {'key': 'email', 'attributes': ['id_cliente']},
             'severity': 'CRITICAL'
         },
         'consistent_data': {
-            'function': validate_consistent_customer_data,
+            'unique_per_entity': {'key': 'id_cliente', 'attributes': CUSTOMER_UNIQUE_FIELDS},
             'severity': 'MEDIUM'
         }
     },
     'productos': {
         'positive_amounts': {
-            'function': validate_positive_amounts,
+            'expression': POSITIVE_AMOUNT_EXPRESSIONS,
             'severity': 'HIGH'
         },
         'price_vs_cost': {
-            'function': validate_price_greater_than_cost,
+            'expression': PRICE_VS_COST_EXPRESSIONS,
             'severity': 'HIGH'
         },
         'non_negative_stock': {
-            'function': validate_stock_non_negative,
+            'expression': NON_NEGATIVE_STOCK_EXPRESSIONS,
             'severity': 'MEDIUM'
         }
     },
     'ventas': {
         'positive_amounts': {
-            'function': validate_positive_amounts,
+            'expression': POSITIVE_AMOUNT_EXPRESSIONS,
             'severity': 'HIGH'
         },
         'delivery_dates': {
-            'function': validate_delivery_after_order,
+            'expression': DELIVERY_AFTER_ORDER_EXPRESSIONS,
             'severity': 'HIGH'
         }
     },
     'logistica': {
         'delivery_dates': {
-            'function': validate_delivery_after_order,
+            'expression': DELIVERY_AFTER_ORDER_EXPRESSIONS,
             'severity': 'HIGH'
         }
     }
@@ -244,14 +263,15 @@ ECOMMERCE_INCONSISTENCY_RULES = {
 FINANCIAL_INCONSISTENCY_RULES = {
     'transacciones': {
         'positive_amounts': {
-            'function': validate_positive_amounts,
+            'expression': POSITIVE_AMOUNT_EXPRESSIONS,
             'severity': 'CRITICAL'
         }
     },
     'cuentas': {
         'email_format': {
             'function': validate_email_format,
-            'severity': 'HIGH'
+            'severity': 'HIGH',
+            'row_local': True
         },
         'phone_format': {
             'function': validate_phone_format,
@@ -264,7 +284,7 @@ FINANCIAL_INCONSISTENCY_RULES = {
 HEALTHCARE_INCONSISTENCY_RULES = {
     'pacientes': {
         'age_range': {
-            'function': validate_age_range,
+            'expression': AGE_RANGE_EXPRESSIONS,
             'severity': 'HIGH'
         },
         'future_birth_dates': {
@@ -446,16 +466,24 @@ def create_custom_validation_rule(column_name: str,
         'description': description or f'Validación personalizada para {column_name}'
     }
 
-def evaluate_data_quality(inconsistency_summary: Dict) -> Dict:
+def evaluate_data_quality(inconsistency_summary: Dict, mode: str = 'exact',
+                          thresholds: Dict = None) -> Dict:
     """
     Evalúa la calidad de los datos basado en las inconsistencias encontradas.
     
     Args:
         inconsistency_summary (Dict): Resumen de inconsistencias
+        mode (str): 'exact' o 'sample'. En modo 'sample' se usan además los
+            intervalos de confianza de las tasas estimadas ('estimated_rates'
+            del resumen) frente a los umbrales porcentuales. En modo 'exact',
+            si el resumen trae 'row_percentages' (bitmaps de violaciones),
+            los umbrales porcentuales se aplican de forma exacta
+        thresholds (Dict): Umbrales de calidad (por defecto QUALITY_THRESHOLDS)
         
     Returns:
         Dict: Evaluación de calidad y recomendaciones
     """
+    thresholds = thresholds or QUALITY_THRESHOLDS
     total = inconsistency_summary.get('total', 0)
     by_severity = inconsistency_summary.get('by_severity', {})
     
@@ -464,23 +492,41 @@ def evaluate_data_quality(inconsistency_summary: Dict) -> Dict:
     medium = by_severity.get('MEDIUM', 0)
     low = by_severity.get('LOW', 0)
     
+    # En modo muestreo, una severidad cuyo intervalo supera por completo su
+    # umbral porcentual cuenta como incumplida; si lo cruza, queda indecisa
+    exceeded, uncertain = set(), []
+    if mode == 'sample':
+        for severity, (rate_low, rate_high) in inconsistency_summary.get('estimated_rates', {}).items():
+            threshold = thresholds.get(f"max_{severity.lower()}_percentage")
+            if threshold is None:
+                continue
+            if rate_low > threshold:
+                exceeded.add(severity)
+            elif rate_high > threshold:
+                uncertain.append(severity)
+    else:
+        for severity, percentage in inconsistency_summary.get('row_percentages', {}).items():
+            threshold = thresholds.get(f"max_{severity.lower()}_percentage")
+            if threshold is not None and percentage > threshold:
+                exceeded.add(severity)
+    
     # Determinar nivel de calidad
-    if critical > QUALITY_THRESHOLDS['max_critical_inconsistencies']:
+    if critical > thresholds['max_critical_inconsistencies'] or 'CRITICAL' in exceeded:
         quality_level = 'INACEPTABLE'
         quality_score = 0
         recommendation = 'RECHAZAR: Problemas críticos que impiden el procesamiento'
         action = 'STOP'
-    elif high > QUALITY_THRESHOLDS['max_high_inconsistencies']:
+    elif high > thresholds['max_high_inconsistencies'] or 'HIGH' in exceeded:
         quality_level = 'POBRE'
         quality_score = 25
         recommendation = 'REVISAR: Demasiados problemas de alta severidad'
         action = 'MANUAL_REVIEW'
-    elif medium > QUALITY_THRESHOLDS['max_medium_inconsistencies']:
+    elif medium > thresholds['max_medium_inconsistencies'] or 'MEDIUM' in exceeded:
         quality_level = 'REGULAR'
         quality_score = 50
         recommendation = 'PROCESAR CON PRECAUCIÓN: Problemas moderados detectados'
         action = 'CLEAN_AND_PROCESS'
-    elif total > QUALITY_THRESHOLDS['max_total_inconsistencies']:
+    elif total > thresholds['max_total_inconsistencies'] or 'TOTAL' in exceeded:
         quality_level = 'BUENA'
         quality_score = 75
         recommendation = 'ACEPTABLE: Pocos problemas menores'
@@ -491,7 +537,7 @@ def evaluate_data_quality(inconsistency_summary: Dict) -> Dict:
         recommendation = 'ÓPTIMO: Datos de alta calidad'
         action = 'PROCESS'
     
-    return {
+    evaluation = {
         'quality_level': quality_level,
         'quality_score': quality_score,
         'recommendation': recommendation,
@@ -504,6 +550,28 @@ def evaluate_data_quality(inconsistency_summary: Dict) -> Dict:
             'total_issues': total
         }
     }
+    
+    if mode == 'sample':
+        evaluation['estimated'] = True
+        evaluation['details']['estimated_rates'] = inconsistency_summary.get('estimated_rates', {})
+        evaluation['details']['uncertain_severities'] = uncertain
+    elif 'row_percentages' in inconsistency_summary:
+        evaluation['details']['row_percentages'] = inconsistency_summary['row_percentages']
+    
+    # Ejecución parcial (fail_fast o presupuesto de tiempo): un STOP ya es
+    # definitivo; sin él, las verificaciones omitidas podrían haberlo dado,
+    # así que los datos nunca se aceptan sin revisión
+    if inconsistency_summary.get('skipped_checks'):
+        evaluation['details']['skipped_checks'] = inconsistency_summary['skipped_checks']
+        evaluation['details']['stopped_by'] = inconsistency_summary.get('stopped_by')
+        if action != 'STOP':
+            evaluation['details']['partial_quality_level'] = quality_level
+            evaluation['quality_level'] = 'INCOMPLETA'
+            evaluation['action'] = 'MANUAL_REVIEW'
+            evaluation['recommendation'] = (f"REVISAR: Evaluación incompleta, {inconsistency_summary['skipped_checks']} "
+                                            f"verificaciones sin ejecutar ({recommendation})")
+    
+    return evaluation
 
 # ============================================================================
 # PLANTILLAS DE REPORTES
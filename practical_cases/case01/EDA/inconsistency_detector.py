@@ -17,17 +17,84 @@ Tipos de inconsistencias detectadas:
 import pandas as pd
 import numpy as np
 import re
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Iterable
 from datetime import datetime, date
 import logging
+import time
 from dataclasses import dataclass
 from collections import Counter
 import warnings
 
+from rule_engine import (CompiledRuleSet, DeclarativeRule, EntityConsistencyRule,
+                         create_declarative_rule, create_entity_consistency_rule,
+                         entity_violation_mask, find_inconsistent_entities)
+from inconsistency_config import QUALITY_THRESHOLDS
+from sampling import stratified_sample, wilson_interval
+from violation_bitmap import ViolationBitmap
+from rule_profiler import RuleProfiler, RuleTimeoutError
+from result_cache import ResultCache, callable_version, fingerprint_table, make_cache_key
+from result_store import read_examples, read_results, write_run
+from streaming_summaries import (HeavyHitters, SequenceSketch, TableSummaryState,
+                                 ViolationCounter, WelfordMoments)
+
 warnings.filterwarnings('ignore')
 
 
-@dataclass
+# Patrones de formato esperados según el nombre de la columna
+FORMAT_PATTERNS = {
+    'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+    'phone': r'^[\+]?[0-9\-\(\)\s]{7,15}$',
+    'postal_code': r'^[0-9]{5}(-[0-9]{4})?$',
+    'date_iso': r'^\d{4}-\d{2}-\d{2}$',
+    'currency': r'^\$?\d+(\.\d{2})?$',
+    'percentage': r'^\d+(\.\d+)?%?$'
+}
+
+# Rangos esperados comunes
+EXPECTED_RANGES = {
+    'age': (0, 120),
+    'edad': (0, 120),
+    'percentage': (0, 100),
+    'porcentaje': (0, 100),
+    'rating': (1, 5),
+    'calificacion': (1, 5),
+    'month': (1, 12),
+    'mes': (1, 12),
+    'day': (1, 31),
+    'dia': (1, 31),
+    'hour': (0, 23),
+    'hora': (0, 23),
+    'minute': (0, 59),
+    'minuto': (0, 59)
+}
+
+# Columnas que no deberían tener valores negativos
+NON_NEGATIVE_KEYWORDS = ['price', 'cost', 'amount', 'quantity', 'stock',
+                         'precio', 'costo', 'cantidad', 'inventario']
+
+# Coste relativo por fila de cada tipo de verificación (1 = una comparación
+# vectorizada) y severidad máxima que puede producir. Se usan para ordenar
+# las verificaciones hasta que haya tiempos medidos en ejecuciones previas.
+CHECK_COSTS = {
+    'range': (1.0, 'HIGH'),
+    'temporal': (3.0, 'HIGH'),
+    'statistical': (5.0, 'MEDIUM'),
+    'format': (20.0, 'MEDIUM'),          # regex por valor de texto
+    'expression': (1.0, None),           # severidad de la propia regla
+    'unique_per_entity': (4.0, None),
+    'function': (10.0, None),
+    'reference': (2.0, 'CRITICAL'),      # filas de la tabla hija más la padre
+    'sample': (10.0, 'HIGH')             # triage completo de una tabla muestreada
+}
+
+# Segundos estimados por unidad de coste y fila
+SECONDS_PER_COST_UNIT = 1e-8
+
+# Peso de cada severidad al priorizar: las que pueden forzar el rechazo primero
+SEVERITY_PRIORITY = {'CRITICAL': 8, 'HIGH': 4, 'MEDIUM': 2, 'LOW': 1}
+
+
+@dataclass(slots=True)
 class Inconsistency:
     """Clase para representar una inconsistencia encontrada."""
     type: str
@@ -38,6 +105,8 @@ class Inconsistency:
     count: int
     examples: List[Any]
     suggested_action: str
+    estimated: bool = False  # True si el conteo se estimó sobre una muestra
+    rate_interval: Optional[Tuple[float, float]] = None  # % de filas afectadas (IC)
 
 
 class InconsistencyDetector:
@@ -56,25 +125,203 @@ class InconsistencyDetector:
         self.inconsistencies = []
         self.business_rules = {}
         self.reference_mappings = {}
+        self._compiled_rules = {}
+        self.result_cache = None
+        self.last_run_info = {}
+        self._parent_keys = {}
+        self.profiler = RuleProfiler()
+        self.violation_bitmaps = {}
+        self._check_costs = {}
         
-    def add_business_rule(self, table: str, rule_name: str, rule_function, severity: str = 'HIGH'):
+    def add_business_rule(self, table: str, rule_name: str, rule_function, severity: str = 'HIGH',
+                          cache: bool = True, version: str = None, row_local: bool = False):
         """
         Añade una regla de negocio personalizada.
         
         Args:
             table: Nombre de la tabla
             rule_name: Nombre de la regla
-            rule_function: Función que valida la regla
+            rule_function: Función que valida la regla, expresión declarativa
+                (texto o lista de expresiones alternativas, ej. 'precio > costo')
+                o dict {'key': ..., 'attributes': [...]} de consistencia por entidad
             severity: Severidad de violaciones
+            cache: Si los resultados de una función pueden reutilizarse desde la
+                caché (False para reglas que dependen de datos externos o de la hora)
+            version: Versión explícita de la función; cambiarla invalida la caché
+            row_local: Si la función decide cada fila solo con sus propios valores
+                (sin duplicados, grupos, len(df) ni agregados), de modo que puede
+                evaluarse sobre varios lotes concatenados
         """
+        if isinstance(rule_function, (str, list, tuple)):
+            self.add_declarative_rule(table, rule_name, rule_function, severity)
+            return
+        if isinstance(rule_function, dict):
+            self.add_entity_consistency_rule(table, rule_name, rule_function['key'],
+                                             rule_function['attributes'], severity)
+            return
+        
         if table not in self.business_rules:
             self.business_rules[table] = {}
         
         self.business_rules[table][rule_name] = {
             'function': rule_function,
+            'severity': severity,
+            'cache': cache,
+            'version': version,
+            'row_local': row_local
+        }
+        self._compiled_rules.pop(table, None)
+    
+    def add_declarative_rule(self, table: str, rule_name: str, expression, severity: str = 'HIGH'):
+        """
+        Añade una regla de negocio declarativa.
+        
+        La expresión describe la condición que cumplen los registros válidos
+        y se compila junto al resto de reglas de la tabla para evaluarse en
+        una sola pasada vectorizada.
+        
+        Args:
+            table: Nombre de la tabla
+            rule_name: Nombre de la regla
+            expression: Expresión o lista de expresiones alternativas
+            severity: Severidad de violaciones
+        """
+        rule = create_declarative_rule(rule_name, expression, severity)
+        
+        if table not in self.business_rules:
+            self.business_rules[table] = {}
+        
+        self.business_rules[table][rule_name] = {
+            'expression': [e.text for e in rule.expressions],
+            'description': ' | '.join(e.text for e in rule.expressions),
+            'rule': rule,
+            'severity': severity
+        }
+        self._compiled_rules.pop(table, None)
+    
+    def add_entity_consistency_rule(self, table: str, rule_name: str, key: str,
+                                    attributes, severity: str = 'HIGH'):
+        """
+        Añade una regla "un valor por entidad" (ej. un único email por cliente).
+        
+        Args:
+            table: Nombre de la tabla
+            rule_name: Nombre de la regla
+            key: Columna que identifica la entidad
+            attributes: Atributo o lista de atributos únicos por entidad
+            severity: Severidad de violaciones
+        """
+        rule = create_entity_consistency_rule(rule_name, key, attributes, severity)
+        
+        if table not in self.business_rules:
+            self.business_rules[table] = {}
+        
+        self.business_rules[table][rule_name] = {
+            'unique_per_entity': {'key': rule.key, 'attributes': rule.attributes},
+            'description': rule.description,
+            'rule': rule,
             'severity': severity
         }
+        self._compiled_rules.pop(table, None)
+    
+    def add_business_rules(self, rules: Dict[str, Dict[str, Dict]]):
+        """
+        Añade un conjunto de reglas con el formato de configuración
+        {tabla: {regla: {'function' | 'expression' | 'unique_per_entity': ..., 'severity': ...}}}.
+        Las funciones admiten además 'cache', 'version' y 'row_local'.
+        
+        Args:
+            rules: Reglas de negocio por tabla
+        """
+        for table, table_rules in rules.items():
+            for rule_name, rule_info in table_rules.items():
+                definition = rule_info.get('expression', rule_info.get('unique_per_entity', rule_info.get('function')))
+                self.add_business_rule(table, rule_name, definition, rule_info.get('severity', 'HIGH'),
+                                       cache=rule_info.get('cache', True), version=rule_info.get('version'),
+                                       row_local=rule_info.get('row_local', False))
+    
+    def _get_compiled_rules(self, table: str) -> CompiledRuleSet:
+        """Devuelve (compilando una sola vez) las reglas declarativas de una tabla."""
+        if table not in self._compiled_rules:
+            rules = [info['rule'] for info in self.business_rules.get(table, {}).values() if 'rule' in info]
+            self._compiled_rules[table] = CompiledRuleSet(rules)
+        return self._compiled_rules[table]
         
+    def required_columns(self, table: str, available_columns: List[str],
+                         table_detectors: bool = True,
+                         dtypes: Dict[str, Any] = None) -> Optional[List[str]]:
+        """
+        Columnas que necesitan los detectores, las reglas de negocio y las
+        referencias de una tabla, para leer solo esas columnas del fichero.
+        
+        Args:
+            table: Nombre de la tabla
+            available_columns: Columnas presentes en el fichero
+            table_detectors: Si se ejecutarán los detectores de formato,
+                rango, temporales y estadísticos (run_full_inconsistency_detection)
+            dtypes: Tipos de las columnas (ej. los de una muestra del fichero);
+                los detectores por tabla eligen sus columnas por tipo
+            
+        Returns:
+            Lista de columnas, o None si hay que leer la tabla completa: con
+            detectores por tabla y sin ``dtypes``, o si alguna regla está
+            definida como función (no declara sus columnas)
+        """
+        if table_detectors and dtypes is None:
+            return None
+        
+        columns = []
+        if table_detectors:
+            header = pd.DataFrame({column: pd.Series(dtype=dtypes[column])
+                                   for column in available_columns if column in dtypes})
+            for detector_name in ['format', 'range', 'temporal', 'statistical']:
+                columns.extend(self.detector_columns(detector_name, header))
+        else:
+            header = pd.DataFrame(columns=available_columns)
+        
+        for rule_info in self.business_rules.get(table, {}).values():
+            if 'rule' not in rule_info:
+                return None
+            columns.extend(rule_info['rule'].columns(header))
+        
+        for child_ref, parent_info in self.reference_mappings.items():
+            child_table, child_key = child_ref.split('.', 1)
+            if child_table == table:
+                columns.append(child_key)
+            if parent_info['parent_table'] == table:
+                columns.append(parent_info['parent_key'])
+        
+        return [column for column in dict.fromkeys(columns) if column in available_columns]
+    
+    def detector_columns(self, detector_name: str, df: pd.DataFrame) -> List[str]:
+        """
+        Columnas que revisa un detector por tabla, con el mismo criterio de
+        nombre y tipo que el propio detector (basta un DataFrame vacío con
+        los tipos de la tabla).
+        
+        Args:
+            detector_name: 'format', 'range', 'temporal' o 'statistical'
+            df: Tabla o DataFrame vacío con sus tipos
+            
+        Returns:
+            Lista de columnas
+        """
+        if detector_name == 'format':
+            # Todas las de texto: la capitalización se revisa en cualquiera,
+            # no solo en las que tienen un formato esperado por su nombre
+            return df.select_dtypes(include=['object']).columns.tolist()
+        if detector_name == 'range':
+            keywords = list(EXPECTED_RANGES) + NON_NEGATIVE_KEYWORDS
+            return [column for column in df.select_dtypes(include=[np.number]).columns
+                    if any(keyword in column.lower() for keyword in keywords)]
+        if detector_name == 'temporal':
+            return [column for column in df.columns
+                    if pd.api.types.is_datetime64_any_dtype(df[column])
+                    or 'fecha' in column.lower() or 'date' in column.lower()]
+        if detector_name == 'statistical':
+            return df.select_dtypes(include=[np.number]).columns.tolist()
+        raise ValueError(f"Detector no soportado: {detector_name}")
+    
     def add_reference_mapping(self, child_table: str, parent_table: str, 
                             child_key: str, parent_key: str):
         """
@@ -91,6 +338,19 @@ class InconsistencyDetector:
             'parent_key': parent_key
         }
     
+    def register_parent_keys(self, parent_table: str, parent_key: str, values):
+        """
+        Registra las claves de una tabla padre que no forma parte de los
+        datasets a validar (ej. un catálogo de productos en validación
+        continua), para verificar la integridad referencial contra ellas.
+        
+        Args:
+            parent_table: Tabla padre
+            parent_key: Columna de clave primaria
+            values: Valores de la clave
+        """
+        self._parent_keys[(parent_table, parent_key)] = pd.Index(pd.Series(values).dropna().unique())
+    
     def detect_format_inconsistencies(self, df: pd.DataFrame, table_name: str) -> List[Inconsistency]:
         """
         Detecta inconsistencias de formato en columnas de texto.
@@ -98,14 +358,7 @@ class InconsistencyDetector:
         inconsistencies = []
         
         # Patrones comunes esperados
-        patterns = {
-            'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            'phone': r'^[\+]?[0-9\-\(\)\s]{7,15}$',
-            'postal_code': r'^[0-9]{5}(-[0-9]{4})?$',
-            'date_iso': r'^\d{4}-\d{2}-\d{2}$',
-            'currency': r'^\$?\d+(\.\d{2})?$',
-            'percentage': r'^\d+(\.\d+)?%?$'
-        }
+        patterns = FORMAT_PATTERNS
         
         text_columns = df.select_dtypes(include=['object']).columns
         
@@ -180,22 +433,7 @@ class InconsistencyDetector:
         inconsistencies = []
         
         # Rangos esperados comunes
-        expected_ranges = {
-            'age': (0, 120),
-            'edad': (0, 120),
-            'percentage': (0, 100),
-            'porcentaje': (0, 100),
-            'rating': (1, 5),
-            'calificacion': (1, 5),
-            'month': (1, 12),
-            'mes': (1, 12),
-            'day': (1, 31),
-            'dia': (1, 31),
-            'hour': (0, 23),
-            'hora': (0, 23),
-            'minute': (0, 59),
-            'minuto': (0, 59)
-        }
+        expected_ranges = EXPECTED_RANGES
         
         numeric_columns = df.select_dtypes(include=[np.number]).columns
         
@@ -228,8 +466,7 @@ class InconsistencyDetector:
                     ))
             
             # Detectar valores negativos donde no deberían estar
-            negative_keywords = ['price', 'cost', 'amount', 'quantity', 'stock', 
-                               'precio', 'costo', 'cantidad', 'inventario']
+            negative_keywords = NON_NEGATIVE_KEYWORDS
             
             if any(keyword in column_lower for keyword in negative_keywords):
                 negative_values = df[df[column] < 0]
@@ -335,33 +572,49 @@ class InconsistencyDetector:
         """
         inconsistencies = []
         
-        for child_ref, parent_info in self.reference_mappings.items():
-            child_table, child_key = child_ref.split('.')
-            parent_table = parent_info['parent_table']
-            parent_key = parent_info['parent_key']
+        for child_ref in self.reference_mappings:
+            inconsistencies.extend(self._check_reference(child_ref, datasets))
+        
+        return inconsistencies
+    
+    def _check_reference(self, child_ref: str, datasets: Dict[str, pd.DataFrame]) -> List[Inconsistency]:
+        """Verifica una relación hija → padre."""
+        inconsistencies = []
+        parent_info = self.reference_mappings[child_ref]
+        child_table, child_key = child_ref.split('.')
+        parent_table = parent_info['parent_table']
+        parent_key = parent_info['parent_key']
+        
+        registered_keys = self._parent_keys.get((parent_table, parent_key))
+        
+        if child_table in datasets and (parent_table in datasets or registered_keys is not None):
+            child_df = datasets[child_table]
+            parent_df = datasets.get(parent_table)
             
-            if child_table in datasets and parent_table in datasets:
-                child_df = datasets[child_table]
-                parent_df = datasets[parent_table]
+            # Encontrar valores en tabla hija que no existen en tabla padre
+            if parent_df is None and child_key in child_df.columns:
+                # Claves padre registradas: búsqueda en el índice precalculado
+                child_values = child_df[child_key].dropna().unique()
+                orphaned_values = set(child_values[registered_keys.get_indexer(child_values) == -1])
+            elif child_key in child_df.columns and parent_key in parent_df.columns:
+                child_values = set(child_df[child_key].dropna())
+                parent_values = set(parent_df[parent_key].dropna())
                 
-                # Encontrar valores en tabla hija que no existen en tabla padre
-                if child_key in child_df.columns and parent_key in parent_df.columns:
-                    child_values = set(child_df[child_key].dropna())
-                    parent_values = set(parent_df[parent_key].dropna())
-                    
-                    orphaned_values = child_values - parent_values
-                    
-                    if orphaned_values:
-                        inconsistencies.append(Inconsistency(
-                            type="REFERENTIAL_INTEGRITY_VIOLATION",
-                            severity="CRITICAL",
-                            table=child_table,
-                            column=child_key,
-                            description=f"Referencias a {parent_table}.{parent_key} que no existen",
-                            count=len(orphaned_values),
-                            examples=list(orphaned_values)[:5],
-                            suggested_action=f"Eliminar o corregir referencias huérfanas en {child_table}.{child_key}"
-                        ))
+                orphaned_values = child_values - parent_values
+            else:
+                orphaned_values = set()
+            
+            if orphaned_values:
+                inconsistencies.append(Inconsistency(
+                    type="REFERENTIAL_INTEGRITY_VIOLATION",
+                    severity="CRITICAL",
+                    table=child_table,
+                    column=child_key,
+                    description=f"Referencias a {parent_table}.{parent_key} que no existen",
+                    count=len(orphaned_values),
+                    examples=list(orphaned_values)[:5],
+                    suggested_action=f"Eliminar o corregir referencias huérfanas en {child_table}.{child_key}"
+                ))
         
         return inconsistencies
     
@@ -433,35 +686,145 @@ class InconsistencyDetector:
         
         return inconsistencies
     
-    def detect_business_rule_violations(self, df: pd.DataFrame, table_name: str) -> List[Inconsistency]:
+    def detect_business_rule_violations(self, df: pd.DataFrame, table_name: str,
+                                        rule_names: List[str] = None) -> List[Inconsistency]:
         """
         Detecta violaciones de reglas de negocio personalizadas.
+        
+        Args:
+            df: Tabla a validar
+            table_name: Nombre de la tabla
+            rule_names: Subconjunto de reglas a evaluar (None = todas)
         """
-        inconsistencies = []
+        results = self._evaluate_business_rules(df, table_name, rule_names)
+        return [inconsistency for rule_results in results.values() for inconsistency in rule_results]
+    
+    def _evaluate_business_rules(self, df: pd.DataFrame, table_name: str,
+                                 rule_names: List[str] = None,
+                                 masks: Dict[str, np.ndarray] = None) -> Dict[str, List[Inconsistency]]:
+        """
+        Evalúa reglas de negocio y devuelve sus resultados por regla. Las
+        reglas que fallan no aparecen en el resultado. Si se pasa ``masks``,
+        se completa con la máscara empaquetada (np.packbits) de filas que
+        violan cada regla.
+        """
+        results = {}
+        table_rules = self.business_rules.get(table_name, {})
+        if rule_names is not None:
+            table_rules = {name: info for name, info in table_rules.items() if name in rule_names}
         
-        if table_name in self.business_rules:
-            for rule_name, rule_info in self.business_rules[table_name].items():
-                try:
-                    violations = rule_info['function'](df)
+        # Reglas declarativas: una sola evaluación vectorizada por tabla
+        compiled = self._get_compiled_rules(table_name)
+        declarative = [info['rule'] for info in table_rules.values() if 'rule' in info]
+        if len(declarative) != len(compiled.rules):
+            compiled = CompiledRuleSet(declarative)
+        
+        if compiled.rules:
+            try:
+                evaluation = self.profiler.call(compiled.evaluate, df)
+                for rule in compiled.rules:
+                    results[rule.name] = []
+                    count = evaluation.counts.get(rule.name, 0)
+                    if rule.name in evaluation.timings:
+                        self.profiler.add('rule', table_name, rule.name, len(df),
+                                          evaluation.timings[rule.name], violations=count)
+                        if masks is not None:
+                            masks[rule.name] = evaluation.packed[evaluation.rule_names.index(rule.name)]
+                    if count == 0:
+                        continue
                     
-                    if len(violations) > 0:
-                        examples = violations.head(5).to_dict('records') if hasattr(violations, 'head') else violations[:5]
-                        
-                        inconsistencies.append(Inconsistency(
-                            type="BUSINESS_RULE_VIOLATION",
-                            severity=rule_info['severity'],
-                            table=table_name,
-                            column="multiple" if hasattr(violations, 'columns') else "unknown",
-                            description=f"Violación de regla de negocio: {rule_name}",
-                            count=len(violations),
-                            examples=examples,
-                            suggested_action=f"Corregir violaciones de la regla '{rule_name}'"
-                        ))
-                        
-                except Exception as e:
-                    self.logger.error(f"Error ejecutando regla de negocio {rule_name}: {e}")
+                    if not isinstance(rule, EntityConsistencyRule):
+                        results[rule.name].append(
+                            self._rule_inconsistency(df, table_name, rule.name, evaluation.indices(rule.name))
+                        )
+                        continue
+                    
+                    rule_info = table_rules[rule.name]
+                    columns = rule.columns(df)
+                    description = f"Violación de regla de negocio: {rule.name} ({rule_info['description']})"
+                    
+                    # Se reportan las entidades con varios valores, no filas sueltas
+                    entities = find_inconsistent_entities(df, rule.key, rule.attributes)
+                    description += f" - {len(entities)} entidades afectadas"
+                    examples = entities.head(5).reset_index().to_dict('records')
+                    
+                    results[rule.name].append(Inconsistency(
+                        type="BUSINESS_RULE_VIOLATION",
+                        severity=rule_info['severity'],
+                        table=table_name,
+                        column=columns[0] if len(columns) == 1 else "multiple",
+                        description=description,
+                        count=count,
+                        examples=examples,
+                        suggested_action=f"Corregir violaciones de la regla '{rule.name}'"
+                    ))
+            except Exception as e:
+                status = 'TIMEOUT' if isinstance(e, RuleTimeoutError) else 'ERROR'
+                for rule in compiled.rules:
+                    self.profiler.add('rule', table_name, rule.name, len(df), 0.0, status=status, error=str(e))
+                self.logger.error(f"Error evaluando reglas declarativas de {table_name}: {e}")
         
-        return inconsistencies
+        # Reglas definidas como funciones (compatibilidad)
+        for rule_name, rule_info in table_rules.items():
+            if 'function' not in rule_info:
+                continue
+            try:
+                with self.profiler.measure('rule', table_name, rule_name, len(df)) as record:
+                    violations = self.profiler.call(rule_info['function'], df)
+                    record.violations = len(violations)
+                results[rule_name] = []
+                
+                # Filas violadas a partir del índice devuelto por la función
+                if masks is not None and hasattr(violations, 'index') and df.index.is_unique:
+                    positions = df.index.get_indexer(violations.index)
+                    mask = np.zeros(len(df), dtype=bool)
+                    mask[positions[positions >= 0]] = True
+                    masks[rule_name] = np.packbits(mask)
+                
+                if len(violations) > 0:
+                    examples = violations.head(5).to_dict('records') if hasattr(violations, 'head') else violations[:5]
+                    
+                    results[rule_name].append(Inconsistency(
+                        type="BUSINESS_RULE_VIOLATION",
+                        severity=rule_info['severity'],
+                        table=table_name,
+                        column="multiple" if hasattr(violations, 'columns') else "unknown",
+                        description=f"Violación de regla de negocio: {rule_name}",
+                        count=len(violations),
+                        examples=examples,
+                        suggested_action=f"Corregir violaciones de la regla '{rule_name}'"
+                    ))
+                    
+            except Exception as e:
+                self.logger.error(f"Error ejecutando regla de negocio {rule_name}: {e}")
+        
+        return results
+    
+    def _rule_inconsistency(self, df: pd.DataFrame, table_name: str, rule_name: str,
+                            rows: np.ndarray) -> Inconsistency:
+        """
+        Inconsistencia de una regla por fila a partir de las posiciones de
+        las filas que la violan.
+        """
+        rule_info = self.business_rules[table_name][rule_name]
+        if 'rule' in rule_info:
+            columns = rule_info['rule'].columns(df)
+            column = columns[0] if len(columns) == 1 else "multiple"
+            description = f"Violación de regla de negocio: {rule_name} ({rule_info['description']})"
+        else:
+            columns, column = list(df.columns), "multiple"
+            description = f"Violación de regla de negocio: {rule_name}"
+        
+        return Inconsistency(
+            type="BUSINESS_RULE_VIOLATION",
+            severity=rule_info['severity'],
+            table=table_name,
+            column=column,
+            description=description,
+            count=len(rows),
+            examples=df.iloc[rows[:5]][columns].to_dict('records'),
+            suggested_action=f"Corregir violaciones de la regla '{rule_name}'"
+        )
     
     def _should_be_chronological(self, col1: str, col2: str) -> bool:
         """
@@ -487,41 +850,110 @@ class InconsistencyDetector:
         
         return False
     
-    def run_full_inconsistency_detection(self, datasets: Dict[str, pd.DataFrame]) -> Dict[str, List[Inconsistency]]:
+    def run_full_inconsistency_detection(self, datasets: Dict[str, pd.DataFrame],
+                                         mode: str = 'exact',
+                                         sample_size: int = 100_000,
+                                         strata: Dict[str, str] = None,
+                                         confidence: float = 0.95,
+                                         thresholds: Dict = None,
+                                         fail_fast: bool = False,
+                                         time_budget: float = None,
+                                         rules: Dict[str, List[str]] = None) -> Dict[str, List[Inconsistency]]:
         """
         Ejecuta detección completa de inconsistencias en todos los datasets.
         
+        Con mode='sample' las detecciones por fila (formato, rango, temporales
+        y reglas de negocio por fila) se ejecutan sobre una muestra
+        estratificada y los conteos se reportan como estimaciones con
+        intervalo de confianza. Si el intervalo cruza un límite de
+        QUALITY_THRESHOLDS, ese detector o regla se repite de forma exacta.
+        Las detecciones estadísticas, las reglas por entidad y la integridad
+        referencial siempre son exactas.
+        
+        Con fail_fast o time_budget las verificaciones se ejecutan por
+        prioridad (coste estimado frente a la severidad que pueden producir,
+        las más baratas primero). Las que no llegan a ejecutarse quedan en
+        last_run_info['skipped_checks'] y en el reporte.
+        
         Args:
             datasets: Diccionario de datasets a analizar
+            mode: 'exact' (por defecto) o 'sample' para triage rápido
+            sample_size: Filas de la muestra por tabla en modo 'sample'
+            strata: Columna de estratificación por tabla (opcional)
+            confidence: Nivel de confianza de los intervalos
+            thresholds: Umbrales de calidad (por defecto QUALITY_THRESHOLDS)
+            fail_fast: Detenerse en cuanto las inconsistencias CRÍTICAS superen
+                max_critical_inconsistencies (evaluate_data_quality daría STOP)
+            time_budget: Segundos disponibles; al agotarse no se inician más
+                verificaciones
+            rules: Reglas de negocio a evaluar por tabla (None = todas)
             
         Returns:
             Dict con inconsistencias encontradas por tabla
         """
-        all_inconsistencies = {}
+        if mode not in ('exact', 'sample'):
+            raise ValueError(f"Modo no soportado: {mode}. Usar 'exact' o 'sample'")
+        
+        thresholds = thresholds or QUALITY_THRESHOLDS
+        all_inconsistencies = {table_name: [] for table_name in datasets}
+        self.last_run_info = {'mode': mode, 'sampled_tables': {}, 'escalated': [],
+                              'skipped_checks': [], 'stopped_by': None,
+                              'table_rows': {table_name: len(df) for table_name, df in datasets.items()}}
+        self.profiler.reset()
+        self.violation_bitmaps = {}
         
         self.logger.info("🔍 Iniciando detección completa de inconsistencias...")
         
-        # Detección por tabla individual
-        for table_name, df in datasets.items():
-            self.logger.info(f"Analizando inconsistencias en: {table_name}")
+        # Huellas de las tablas para reutilizar resultados en caché
+        fingerprints = {}
+        if self.result_cache is not None:
+            fingerprints = {table_name: fingerprint_table(df) for table_name, df in datasets.items()}
+            self.last_run_info['fingerprints'] = fingerprints
+        
+        plan = self._plan_checks(datasets, mode, sample_size, strata, confidence, thresholds, fingerprints, rules)
+        if fail_fast or time_budget is not None:
+            plan.sort(key=lambda check: check['priority'])
+        
+        # Ejecución de las verificaciones (por prioridad si hay fail_fast o presupuesto)
+        start = time.perf_counter()
+        critical_count = 0
+        for check in plan:
+            if (self.last_run_info['stopped_by'] is None and time_budget is not None
+                    and time.perf_counter() - start >= time_budget):
+                self.last_run_info['stopped_by'] = 'time_budget'
+                self.logger.warning(f"⏱️ Presupuesto de {time_budget}s agotado")
             
-            table_inconsistencies = []
+            if self.last_run_info['stopped_by'] is not None:
+                self.last_run_info['skipped_checks'].append(
+                    {'kind': check['kind'], 'table': check['table'], 'name': check['name'],
+                     'reason': self.last_run_info['stopped_by']}
+                )
+                continue
             
-            # Diferentes tipos de detección
-            table_inconsistencies.extend(self.detect_format_inconsistencies(df, table_name))
-            table_inconsistencies.extend(self.detect_range_inconsistencies(df, table_name))
-            table_inconsistencies.extend(self.detect_temporal_inconsistencies(df, table_name))
-            table_inconsistencies.extend(self.detect_statistical_inconsistencies(df, table_name))
-            table_inconsistencies.extend(self.detect_business_rule_violations(df, table_name))
+            check_start = time.perf_counter()
+            found = check['run']()
+            self._check_costs[check['key']] = (time.perf_counter() - check_start) / max(check['rows'], 1)
+            all_inconsistencies.setdefault(check['group'], []).extend(found)
             
-            all_inconsistencies[table_name] = table_inconsistencies
+            critical_count += sum(1 for inc in found if inc.severity == 'CRITICAL')
+            if fail_fast and critical_count > thresholds['max_critical_inconsistencies']:
+                self.last_run_info['stopped_by'] = 'fail_fast'
+                # El nombre de las referencias ya es 'tabla.columna'
+                name = check['name'] if check['kind'] == 'reference' else f"{check['table']}.{check['name']}"
+                self.logger.warning(f"🛑 Rechazo anticipado: {name} supera el máximo de inconsistencias CRÍTICAS")
         
-        # Detección entre tablas
-        referential_inconsistencies = self.detect_referential_inconsistencies(datasets)
-        if referential_inconsistencies:
-            all_inconsistencies['REFERENTIAL'] = referential_inconsistencies
+        self.last_run_info['elapsed_s'] = time.perf_counter() - start
+        if self.last_run_info['skipped_checks']:
+            self.logger.warning(f"⏭️ {len(self.last_run_info['skipped_checks'])} verificaciones sin ejecutar "
+                                f"({self.last_run_info['stopped_by']})")
+        
+        if self.result_cache is not None:
+            self.logger.info(f"♻️ Caché de resultados: {self.result_cache.hits} aciertos, "
+                             f"{self.result_cache.misses} fallos")
         
         # Consolidar todas las inconsistencias
+        if not all_inconsistencies.get('REFERENTIAL'):
+            all_inconsistencies.pop('REFERENTIAL', None)
         self.inconsistencies = []
         for table_inconsistencies in all_inconsistencies.values():
             self.inconsistencies.extend(table_inconsistencies)
@@ -530,12 +962,690 @@ class InconsistencyDetector:
         
         return all_inconsistencies
     
+    # ------------------------------------------------------------------
+    # Planificación de verificaciones por coste
+    # ------------------------------------------------------------------
+    
+    def _plan_checks(self, datasets: Dict[str, pd.DataFrame], mode: str, sample_size: int,
+                     strata: Optional[Dict[str, str]], confidence: float, thresholds: Dict,
+                     fingerprints: Dict[str, str],
+                     rules: Dict[str, List[str]] = None) -> List[Dict]:
+        """
+        Lista de verificaciones de una ejecución completa, en el orden
+        habitual, con su coste estimado y su prioridad.
+        """
+        plan = []
+        
+        def add(kind, table_name, name, rows, severity, group, run, cost_kind=None):
+            key = (kind, table_name, name)
+            cost_per_row, default_severity = CHECK_COSTS[cost_kind or kind]
+            seconds_per_row = self._check_costs.get(key, cost_per_row * SECONDS_PER_COST_UNIT)
+            estimated_seconds = rows * seconds_per_row
+            severity = severity or default_severity
+            plan.append({
+                'key': key, 'kind': kind, 'table': table_name, 'name': name, 'rows': rows,
+                'group': group, 'run': run, 'estimated_seconds': estimated_seconds,
+                'priority': estimated_seconds / SEVERITY_PRIORITY.get(severity, 1)
+            })
+        
+        for table_name, df in datasets.items():
+            fingerprint = fingerprints.get(table_name)
+            
+            if mode == 'sample' and len(df) > sample_size:
+                add('sample', table_name, 'triage', sample_size, None, table_name,
+                    lambda df=df, table_name=table_name, fingerprint=fingerprint: self._detect_table_sampled(
+                        df, table_name, sample_size, (strata or {}).get(table_name),
+                        confidence, thresholds, fingerprint))
+                continue
+            
+            for detector_name in ['format', 'range', 'temporal', 'statistical']:
+                add('detector', table_name, detector_name, len(df), None, table_name,
+                    lambda detector_name=detector_name, df=df, table_name=table_name, fingerprint=fingerprint:
+                        self._run_table_detector(detector_name, df, table_name, fingerprint),
+                    cost_kind=detector_name)
+            
+            # Las reglas declarativas se evalúan juntas (un solo conjunto
+            # compilado); las definidas como funciones, una a una
+            table_rules = self.business_rules.get(table_name, {})
+            if rules is not None:
+                table_rules = {name: info for name, info in table_rules.items()
+                               if name in rules.get(table_name, [])}
+            declarative = [name for name, info in table_rules.items() if 'rule' in info]
+            groups = []
+            if declarative:
+                has_entity_rules = any('unique_per_entity' in table_rules[name] for name in declarative)
+                groups.append((declarative, 'unique_per_entity' if has_entity_rules else 'expression'))
+            groups += [([name], 'function') for name, info in table_rules.items() if 'rule' not in info]
+            
+            for rule_names, cost_kind in groups:
+                severity = max((table_rules[name]['severity'] for name in rule_names),
+                               key=lambda sev: SEVERITY_PRIORITY.get(sev, 0))
+                add('rule', table_name, ','.join(rule_names), len(df), severity, table_name,
+                    lambda rule_names=rule_names, df=df, table_name=table_name, fingerprint=fingerprint:
+                        self._run_business_rules_cached(df, table_name, fingerprint, rule_names),
+                    cost_kind=cost_kind)
+        
+        # Detección entre tablas
+        for child_ref, parent_info in self.reference_mappings.items():
+            child_table = child_ref.split('.')[0]
+            rows = sum(len(datasets[table]) for table in (child_table, parent_info['parent_table'])
+                       if table in datasets)
+            add('reference', child_table, child_ref, rows, None, 'REFERENTIAL',
+                lambda child_ref=child_ref: self._run_reference_cached(child_ref, datasets, fingerprints))
+        
+        return plan
+    
+    # ------------------------------------------------------------------
+    # Caché de resultados por huella de datos
+    # ------------------------------------------------------------------
+    
+    def enable_result_cache(self, cache_dir: str = None):
+        """
+        Activa la caché de resultados por huella de datos: las tablas (y
+        relaciones entre tablas) sin cambios no se vuelven a validar.
+        
+        Args:
+            cache_dir: Directorio para persistir la caché entre ejecuciones
+                (None = solo en memoria)
+        """
+        self.result_cache = ResultCache(cache_dir, self.logger)
+    
+    def _detector_config(self, detector_name: str) -> tuple:
+        """Método y configuración de la que depende cada detector por tabla."""
+        detectors = {
+            'format': (self.detect_format_inconsistencies, FORMAT_PATTERNS),
+            'range': (self.detect_range_inconsistencies, (EXPECTED_RANGES, NON_NEGATIVE_KEYWORDS)),
+            # Las fechas futuras dependen del día de ejecución
+            'temporal': (self.detect_temporal_inconsistencies,
+                         (callable_version(self._should_be_chronological), str(date.today()))),
+            'statistical': (self.detect_statistical_inconsistencies, None)
+        }
+        return detectors[detector_name]
+    
+    def _run_table_detector(self, detector_name: str, df: pd.DataFrame, table_name: str,
+                            fingerprint: str = None) -> List[Inconsistency]:
+        """Ejecuta un detector por tabla reutilizando resultados en caché."""
+        detector, config = self._detector_config(detector_name)
+        if self.result_cache is None or fingerprint is None:
+            return self._profiled('detector', table_name, detector_name, len(df), detector, df, table_name)
+        
+        key = make_cache_key('detector', fingerprint, table_name, detector_name, callable_version(detector), config)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.profiler.add('detector', table_name, detector_name, len(df), 0.0, len(cached), status='CACHED')
+            return cached
+        
+        result = self._profiled('detector', table_name, detector_name, len(df), detector, df, table_name)
+        self.result_cache.set(key, result)
+        return result
+    
+    def _profiled(self, kind: str, table_name: str, name: str, rows: int, function, *args) -> List[Inconsistency]:
+        """Ejecuta un detector midiendo tiempo, memoria y violaciones."""
+        with self.profiler.measure(kind, table_name, name, rows) as record:
+            result = function(*args)
+            record.violations = sum(int(inc.count) for inc in result)
+        return result
+    
+    def _rule_version(self, rule_info: Dict) -> tuple:
+        """Versión de una regla: su definición y, si depende de la fecha, el día."""
+        if 'expression' in rule_info:
+            uses_today = any('today' in expression.lower() for expression in rule_info['expression'])
+            return (tuple(rule_info['expression']), str(date.today()) if uses_today else None)
+        if 'unique_per_entity' in rule_info:
+            return (rule_info['unique_per_entity']['key'], tuple(rule_info['unique_per_entity']['attributes']))
+        # Una función puede depender de la fecha actual (ej. edad a partir de
+        # pd.Timestamp.now()): su resultado vale como mucho durante el día
+        return (callable_version(rule_info['function']), rule_info.get('version'), str(date.today()))
+    
+    def _run_business_rules_cached(self, df: pd.DataFrame, table_name: str,
+                                   fingerprint: str = None,
+                                   rule_names: List[str] = None) -> List[Inconsistency]:
+        """
+        Evalúa las reglas de negocio (solo las que no están en caché) y
+        añade sus violaciones por fila al bitmap de la tabla.
+        """
+        table_rules = self.business_rules.get(table_name, {})
+        if rule_names is not None:
+            table_rules = {name: info for name, info in table_rules.items() if name in rule_names}
+        use_cache = self.result_cache is not None and fingerprint is not None
+        keys, results, packed = {}, {}, {}
+        
+        if use_cache:
+            for rule_name, rule_info in table_rules.items():
+                if rule_info.get('cache', True) is False:
+                    continue
+                keys[rule_name] = make_cache_key('rule-mask', fingerprint, table_name, rule_name,
+                                                 self._rule_version(rule_info), rule_info['severity'])
+                cached = self.result_cache.get(keys[rule_name])
+                if cached is not None:
+                    results[rule_name], packed[rule_name] = cached
+                    self.profiler.add('rule', table_name, rule_name, len(df), 0.0,
+                                      sum(int(inc.count) for inc in results[rule_name]), status='CACHED')
+        
+        pending = [rule_name for rule_name in table_rules if rule_name not in results]
+        if pending:
+            masks = {}
+            for rule_name, result in self._evaluate_business_rules(df, table_name, pending, masks).items():
+                results[rule_name] = result
+                packed[rule_name] = masks.get(rule_name)
+                if rule_name in keys:
+                    self.result_cache.set(keys[rule_name], (result, packed[rule_name]))
+        
+        bitmap = self.violation_bitmaps.setdefault(table_name, ViolationBitmap(len(df)))
+        for rule_name, rule_info in table_rules.items():
+            if packed.get(rule_name) is not None:
+                bitmap.add_packed(rule_name, packed[rule_name], rule_info['severity'])
+        
+        return [inconsistency for rule_name in table_rules for inconsistency in results.get(rule_name) or []]
+    
+    def get_violation_bitmap(self, table_name: str) -> Optional[ViolationBitmap]:
+        """
+        Retorna el bitmap de violaciones por fila y regla de la última
+        ejecución exacta de una tabla (None si no se validó).
+        """
+        return self.violation_bitmaps.get(table_name)
+    
+    def _run_reference_cached(self, child_ref: str, datasets: Dict[str, pd.DataFrame],
+                              fingerprints: Dict[str, str]) -> List[Inconsistency]:
+        """
+        Verifica una relación entre tablas; solo se recalcula cuando cambia
+        la tabla hija o la tabla padre.
+        """
+        child_table = child_ref.split('.')[0]
+        parent_info = self.reference_mappings[child_ref]
+        parent_table = parent_info['parent_table']
+        
+        rows = len(datasets[child_table]) if child_table in datasets else 0
+        if (self.result_cache is None or child_table not in fingerprints
+                or parent_table not in fingerprints):
+            return self._profiled('reference', child_table, child_ref, rows, self._check_reference, child_ref, datasets)
+        
+        key = make_cache_key('reference', child_ref, fingerprints[child_table], parent_table,
+                             parent_info['parent_key'], fingerprints[parent_table],
+                             callable_version(self._check_reference))
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.profiler.add('reference', child_table, child_ref, rows, 0.0, len(cached), status='CACHED')
+            return cached
+        
+        result = self._profiled('reference', child_table, child_ref, rows, self._check_reference, child_ref, datasets)
+        self.result_cache.set(key, result)
+        return result
+    
+    # ------------------------------------------------------------------
+    # Triage por muestreo con intervalos de confianza
+    # ------------------------------------------------------------------
+    
+    def _detect_table_sampled(self, df: pd.DataFrame, table_name: str, sample_size: int,
+                              strata_column: Optional[str], confidence: float,
+                              thresholds: Dict, fingerprint: str = None) -> List[Inconsistency]:
+        """Detección de una tabla sobre muestra, escalando a exacta si hay duda."""
+        sample = stratified_sample(df, sample_size, strata_column)
+        sample_rows, total_rows = len(sample), len(df)
+        self.last_run_info['sampled_tables'][table_name] = {'sample_rows': sample_rows, 'total_rows': total_rows}
+        self.logger.info(f"🎲 {table_name}: muestra de {sample_rows:,} de {total_rows:,} filas")
+        
+        inconsistencies = []
+        
+        # Detectores por fila sobre la muestra
+        for detector_name in ['format', 'range', 'temporal']:
+            detector = self._detector_config(detector_name)[0]
+            found = [self._as_estimate(inc, sample_rows, total_rows, confidence)
+                     for inc in detector(sample, table_name)]
+            
+            if any(self._crosses_threshold(inc.severity, inc.rate_interval, thresholds) for inc in found):
+                self.logger.info(f"🔁 {table_name}.{detector_name}: intervalo cruza un umbral, ejecución exacta")
+                self.last_run_info['escalated'].append((table_name, detector_name))
+                found = self._run_table_detector(detector_name, df, table_name, fingerprint)
+            inconsistencies.extend(found)
+        
+        # Las detecciones estadísticas dependen de la distribución completa
+        inconsistencies.extend(self._run_table_detector('statistical', df, table_name, fingerprint))
+        
+        # Reglas de negocio: por fila sobre la muestra, por entidad exactas
+        table_rules = self.business_rules.get(table_name, {})
+        exact_rules = [name for name, info in table_rules.items() if 'unique_per_entity' in info]
+        sampled_rules = [name for name in table_rules if name not in exact_rules]
+        
+        for rule_name, found in self._evaluate_business_rules(sample, table_name, sampled_rules).items():
+            found = [self._as_estimate(inc, sample_rows, total_rows, confidence) for inc in found]
+            severity = table_rules[rule_name]['severity']
+            interval = found[0].rate_interval if found else \
+                tuple(100 * bound for bound in wilson_interval(0, sample_rows, confidence))
+            
+            if self._crosses_threshold(severity, interval, thresholds):
+                self.last_run_info['escalated'].append((table_name, rule_name))
+                exact_rules.append(rule_name)
+            else:
+                inconsistencies.extend(found)
+        
+        if exact_rules:
+            inconsistencies.extend(self.detect_business_rule_violations(df, table_name, exact_rules))
+        
+        return inconsistencies
+    
+    def _as_estimate(self, inconsistency: Inconsistency, sample_rows: int, total_rows: int,
+                     confidence: float) -> Inconsistency:
+        """Escala el conteo de una muestra a la tabla completa con su intervalo."""
+        low, high = wilson_interval(int(inconsistency.count), sample_rows, confidence)
+        inconsistency.count = int(round(inconsistency.count * total_rows / sample_rows))
+        inconsistency.estimated = True
+        inconsistency.rate_interval = (100 * low, 100 * high)
+        return inconsistency
+    
+    def _crosses_threshold(self, severity: str, rate_interval: Tuple[float, float], thresholds: Dict) -> bool:
+        """True si el intervalo no permite decidir frente al umbral de su severidad."""
+        threshold = thresholds.get(f"max_{severity.lower()}_percentage")
+        if threshold is None or rate_interval is None:
+            return False
+        low, high = rate_interval
+        return low <= threshold < high
+    
+    # ------------------------------------------------------------------
+    # Detección por chunks con resúmenes combinables
+    # ------------------------------------------------------------------
+    
+    def create_chunk_state(self, table_name: str) -> TableSummaryState:
+        """
+        Crea un estado vacío para detectar inconsistencias por chunks.
+        
+        Args:
+            table_name: Nombre de la tabla
+            
+        Returns:
+            TableSummaryState: Estado a alimentar con accumulate_chunk
+        """
+        return TableSummaryState(table_name)
+    
+    def accumulate_chunk(self, state: TableSummaryState, df: pd.DataFrame) -> TableSummaryState:
+        """
+        Acumula un chunk en el estado parcial con memoria acotada.
+        
+        Cubre las detecciones de formato, rango, temporales, estadísticas y
+        las reglas declarativas por fila; las reglas por entidad y las
+        funciones necesitan la tabla completa y no se evalúan por chunks.
+        
+        Args:
+            state: Estado parcial de la tabla
+            df: Chunk de datos
+            
+        Returns:
+            TableSummaryState: El mismo estado actualizado
+        """
+        state.rows += len(df)
+        self._accumulate_format(state, df)
+        self._accumulate_range(state, df)
+        self._accumulate_temporal(state, df)
+        self._accumulate_statistical(state, df)
+        self._accumulate_business_rules(state, df)
+        return state
+    
+    def merge_chunk_states(self, states: List[TableSummaryState]) -> TableSummaryState:
+        """
+        Combina estados parciales (por ejemplo, de distintos workers).
+        
+        Args:
+            states: Estados de la misma tabla
+            
+        Returns:
+            TableSummaryState: Estado combinado
+        """
+        merged = self.create_chunk_state(states[0].table_name)
+        for state in states:
+            merged.merge(state)
+        return merged
+    
+    def finalize_chunk_state(self, state: TableSummaryState) -> List[Inconsistency]:
+        """
+        Convierte un estado acumulado en la lista de inconsistencias.
+        
+        Args:
+            state: Estado completo de la tabla
+            
+        Returns:
+            List[Inconsistency]: Inconsistencias en el mismo formato que la detección en memoria
+        """
+        inconsistencies = []
+        inconsistencies.extend(self._finalize_format(state))
+        inconsistencies.extend(self._finalize_range(state))
+        inconsistencies.extend(self._finalize_temporal(state))
+        inconsistencies.extend(self._finalize_statistical(state))
+        inconsistencies.extend(self._finalize_business_rules(state))
+        return inconsistencies
+    
+    def detect_inconsistencies_in_chunks(self, chunks: Iterable[pd.DataFrame], table_name: str) -> List[Inconsistency]:
+        """
+        Detecta inconsistencias de una tabla leída por partes.
+        
+        Args:
+            chunks: Iterable de DataFrames (ej. pd.read_csv(..., chunksize=100000))
+            table_name: Nombre de la tabla
+            
+        Returns:
+            List[Inconsistency]: Inconsistencias encontradas
+        """
+        skipped = [name for name, info in self.business_rules.get(table_name, {}).items()
+                   if not isinstance(info.get('rule'), DeclarativeRule)]
+        if skipped:
+            self.logger.warning(f"⚠️ Reglas que requieren la tabla completa omitidas en modo chunks: {skipped}")
+        
+        state = self.create_chunk_state(table_name)
+        for chunk in chunks:
+            self.accumulate_chunk(state, chunk)
+        
+        self.logger.info(f"Chunks procesados para {table_name}: {state.rows} filas")
+        return self.finalize_chunk_state(state)
+    
+    def _probable_format(self, column: str) -> Optional[str]:
+        """Formato esperado de una columna según su nombre."""
+        column_lower = column.lower()
+        for format_name in FORMAT_PATTERNS:
+            if any(keyword in column_lower for keyword in format_name.split('_')):
+                return format_name
+        return None
+    
+    def _date_columns(self, df: pd.DataFrame) -> List[str]:
+        """Columnas de fecha por tipo o por nombre."""
+        return [column for column in df.columns
+                if df[column].dtype == 'datetime64[ns]' or 'fecha' in column.lower() or 'date' in column.lower()]
+    
+    def _accumulate_format(self, state: TableSummaryState, df: pd.DataFrame):
+        for column in df.select_dtypes(include=['object']).columns:
+            valid_values = df[column].dropna()
+            if len(valid_values) == 0:
+                continue
+            
+            probable_format = self._probable_format(column)
+            if probable_format:
+                matches = valid_values.str.match(FORMAT_PATTERNS[probable_format], na=False)
+                state.get(('format', column, probable_format), ViolationCounter).update(valid_values[~matches])
+            
+            text_values = valid_values.astype(str)
+            state.get(('capitalization', column, 'text'), lambda: ViolationCounter(3)).update(text_values)
+            for case, matches in (('upper', text_values.str.isupper()),
+                                  ('lower', text_values.str.islower()),
+                                  ('title', text_values.str.istitle())):
+                state.get(('capitalization', column, case), lambda: ViolationCounter(0)).update(text_values[matches])
+    
+    def _accumulate_range(self, state: TableSummaryState, df: pd.DataFrame):
+        for column in df.select_dtypes(include=[np.number]).columns:
+            column_lower = column.lower()
+            values = df[column]
+            
+            for range_key, (min_val, max_val) in EXPECTED_RANGES.items():
+                if range_key in column_lower:
+                    out_of_range = values[(values < min_val) | (values > max_val)]
+                    state.get(('range', column, (min_val, max_val)), ViolationCounter).update(out_of_range)
+                    break
+            
+            if any(keyword in column_lower for keyword in NON_NEGATIVE_KEYWORDS):
+                state.get(('negative', column), ViolationCounter).update(values[values < 0])
+    
+    def _accumulate_temporal(self, state: TableSummaryState, df: pd.DataFrame):
+        date_columns = self._date_columns(df)
+        dates = {column: pd.to_datetime(df[column], errors='coerce') for column in date_columns}
+        
+        for column, date_series in dates.items():
+            if 'nacimiento' in column.lower():
+                future_dates = date_series[date_series > pd.Timestamp.now()]
+                state.get(('future_date', column), lambda: ViolationCounter(3)).update(future_dates)
+            
+            very_old_dates = date_series[date_series < pd.Timestamp('1900-01-01')]
+            state.get(('ancient_date', column), lambda: ViolationCounter(3)).update(very_old_dates)
+        
+        for i, col1 in enumerate(date_columns):
+            for col2 in date_columns[i+1:]:
+                if self._should_be_chronological(col1, col2):
+                    date1, date2 = dates[col1], dates[col2]
+                    invalid_order = (date1 > date2) & date1.notna() & date2.notna()
+                    state.get(('chronological', col1, col2), lambda: ViolationCounter(3)).update(
+                        df.loc[invalid_order, [col1, col2]]
+                    )
+    
+    def _accumulate_statistical(self, state: TableSummaryState, df: pd.DataFrame):
+        for column in df.select_dtypes(include=[np.number]).columns:
+            values = df[column].dropna()
+            if len(values) == 0:
+                continue
+            
+            state.get(('moments', column), WelfordMoments).update(values.to_numpy())
+            state.get(('heavy_hitters', column), HeavyHitters).update(values)
+            state.get(('sequence', column), SequenceSketch).update(values.to_numpy())
+    
+    def _accumulate_business_rules(self, state: TableSummaryState, df: pd.DataFrame):
+        rules = [info['rule'] for info in self.business_rules.get(state.table_name, {}).values()
+                 if isinstance(info.get('rule'), DeclarativeRule)]
+        if not rules:
+            return
+        
+        evaluation = CompiledRuleSet(rules).evaluate(df)
+        for rule in rules:
+            if rule.name not in evaluation.rule_names:
+                continue
+            violations = df.loc[evaluation.mask(rule.name), rule.columns(df)]
+            state.get(('business', rule.name), ViolationCounter).update(violations)
+    
+    def _summaries(self, state: TableSummaryState, kind: str):
+        return [(key, summary) for key, summary in state.summaries.items() if key[0] == kind]
+    
+    def _finalize_format(self, state: TableSummaryState) -> List[Inconsistency]:
+        inconsistencies = []
+        
+        for (_, column, probable_format), counter in self._summaries(state, 'format'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="FORMAT_INCONSISTENCY",
+                    severity="MEDIUM",
+                    table=state.table_name,
+                    column=column,
+                    description=f"Valores que no siguen el formato esperado de {probable_format}",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Estandarizar formato o validar valores en columna {column}"
+                ))
+        
+        for (_, column, case), text_counter in self._summaries(state, 'capitalization'):
+            if case != 'text' or text_counter.count <= 10:
+                continue
+            
+            total = text_counter.count
+            cases = [state.summaries[('capitalization', column, name)].count for name in ('upper', 'lower', 'title')]
+            mixed = total - sum(cases)
+            significant_patterns = sum(1 for count in cases + [mixed] if count > total * 0.1)
+            
+            if significant_patterns > 2:
+                inconsistencies.append(Inconsistency(
+                    type="CAPITALIZATION_INCONSISTENCY",
+                    severity="LOW",
+                    table=state.table_name,
+                    column=column,
+                    description="Inconsistencias en capitalización de texto",
+                    count=mixed,
+                    examples=text_counter.examples.sample(),
+                    suggested_action=f"Estandarizar capitalización en columna {column}"
+                ))
+        
+        return inconsistencies
+    
+    def _finalize_range(self, state: TableSummaryState) -> List[Inconsistency]:
+        inconsistencies = []
+        
+        for (_, column, (min_val, max_val)), counter in self._summaries(state, 'range'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="RANGE_INCONSISTENCY",
+                    severity="HIGH",
+                    table=state.table_name,
+                    column=column,
+                    description=f"Valores fuera del rango esperado ({min_val}-{max_val})",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Verificar y corregir valores fuera de rango en {column}"
+                ))
+        
+        for (_, column), counter in self._summaries(state, 'negative'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="NEGATIVE_VALUE_INCONSISTENCY",
+                    severity="MEDIUM",
+                    table=state.table_name,
+                    column=column,
+                    description="Valores negativos en columna que debería ser positiva",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Investigar valores negativos en {column}"
+                ))
+        
+        return inconsistencies
+    
+    def _finalize_temporal(self, state: TableSummaryState) -> List[Inconsistency]:
+        inconsistencies = []
+        
+        for (_, column), counter in self._summaries(state, 'future_date'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="FUTURE_DATE_INCONSISTENCY",
+                    severity="HIGH",
+                    table=state.table_name,
+                    column=column,
+                    description="Fechas futuras en campo que debería ser histórico",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Verificar fechas futuras en {column}"
+                ))
+        
+        for (_, column), counter in self._summaries(state, 'ancient_date'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="ANCIENT_DATE_INCONSISTENCY",
+                    severity="MEDIUM",
+                    table=state.table_name,
+                    column=column,
+                    description="Fechas anteriores a 1900 (posiblemente incorrectas)",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Verificar fechas muy antiguas en {column}"
+                ))
+        
+        for (_, col1, col2), counter in self._summaries(state, 'chronological'):
+            if counter.count > 0:
+                inconsistencies.append(Inconsistency(
+                    type="CHRONOLOGICAL_INCONSISTENCY",
+                    severity="HIGH",
+                    table=state.table_name,
+                    column=f"{col1} vs {col2}",
+                    description=f"{col1} debería ser anterior a {col2}",
+                    count=counter.count,
+                    examples=counter.examples.sample(),
+                    suggested_action=f"Verificar orden cronológico entre {col1} y {col2}"
+                ))
+        
+        return inconsistencies
+    
+    def _finalize_statistical(self, state: TableSummaryState) -> List[Inconsistency]:
+        inconsistencies = []
+        
+        for (_, column), moments in self._summaries(state, 'moments'):
+            n_values = moments.count
+            
+            # Repetición excesiva (conteo estimado por Misra-Gries)
+            most_common = state.summaries[('heavy_hitters', column)].most_common()
+            if most_common:
+                most_common_value, most_common_count = most_common
+                if most_common_count > n_values * 0.5 and n_values > 20:
+                    inconsistencies.append(Inconsistency(
+                        type="EXCESSIVE_REPETITION_INCONSISTENCY",
+                        severity="MEDIUM",
+                        table=state.table_name,
+                        column=column,
+                        description=f"Valor {most_common_value} se repite excesivamente ({most_common_count}/{n_values})",
+                        count=most_common_count,
+                        examples=[most_common_value],
+                        suggested_action=f"Verificar si {most_common_value} es un valor por defecto en {column}"
+                    ))
+            
+            # Secuencias consecutivas a partir de mínimo, máximo y distintos
+            sequence = state.summaries[('sequence', column)]
+            n_distinct = sequence.n_distinct
+            if n_distinct > 5 and sequence.is_consecutive() and n_distinct > n_values * 0.8:
+                inconsistencies.append(Inconsistency(
+                    type="SEQUENTIAL_PATTERN_INCONSISTENCY",
+                    severity="LOW",
+                    table=state.table_name,
+                    column=column,
+                    description="Valores siguen patrón secuencial sospechoso",
+                    count=int(round(n_distinct)),
+                    examples=sequence.smallest[:10].tolist(),
+                    suggested_action=f"Verificar si los valores secuenciales en {column} son correctos"
+                ))
+            
+            # Coeficiente de variación con momentos de Welford
+            std = moments.std
+            if std > 0:
+                cv = std / moments.mean
+                if cv > 5:
+                    inconsistencies.append(Inconsistency(
+                        type="HIGH_VARIABILITY_INCONSISTENCY",
+                        severity="LOW",
+                        table=state.table_name,
+                        column=column,
+                        description=f"Variabilidad extremadamente alta (CV={cv:.2f})",
+                        count=n_values,
+                        examples=[f"Mean: {moments.mean:.2f}", f"Std: {std:.2f}"],
+                        suggested_action=f"Revisar la distribución de valores en {column}"
+                    ))
+        
+        return inconsistencies
+    
+    def _finalize_business_rules(self, state: TableSummaryState) -> List[Inconsistency]:
+        inconsistencies = []
+        
+        for (_, rule_name), counter in self._summaries(state, 'business'):
+            rule_info = self.business_rules.get(state.table_name, {}).get(rule_name)
+            if counter.count == 0 or rule_info is None:
+                continue
+            
+            # Los ejemplos son registros con las columnas referenciadas por la regla
+            columns = list(counter.examples.items[0]) if counter.examples.items else []
+            inconsistencies.append(Inconsistency(
+                type="BUSINESS_RULE_VIOLATION",
+                severity=rule_info['severity'],
+                table=state.table_name,
+                column=columns[0] if len(columns) == 1 else "multiple",
+                description=f"Violación de regla de negocio: {rule_name} ({rule_info['description']})",
+                count=counter.count,
+                examples=counter.examples.sample(),
+                suggested_action=f"Corregir violaciones de la regla '{rule_name}'"
+            ))
+        
+        return inconsistencies
+    
     def generate_inconsistency_report(self) -> str:
         """
         Genera un reporte detallado de todas las inconsistencias encontradas.
         """
+        return "\n".join(self._iter_report_lines())
+    
+    def write_inconsistency_report(self, path: str):
+        """
+        Escribe el reporte detallado en un fichero línea a línea, sin
+        construirlo completo en memoria.
+        
+        Args:
+            path: Ruta del fichero de texto
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for i, line in enumerate(self._iter_report_lines()):
+                f.write(line if i == 0 else "\n" + line)
+    
+    def _iter_report_lines(self) -> Iterable[str]:
+        """Líneas del reporte detallado."""
         if not self.inconsistencies:
-            return "✅ No se encontraron inconsistencias en los datos."
+            yield "✅ No se encontraron inconsistencias en los datos."
+            if self.last_run_info.get('skipped_checks'):
+                yield ""
+                yield from self._format_skipped_checks()
+            return
         
         # Agrupar por severidad
         by_severity = {}
@@ -544,7 +1654,7 @@ class InconsistencyDetector:
                 by_severity[inc.severity] = []
             by_severity[inc.severity].append(inc)
         
-        report_lines = [
+        yield from [
             "🚨 REPORTE DE INCONSISTENCIAS EN DATOS",
             "=" * 80,
             f"Fecha de análisis: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
@@ -553,33 +1663,34 @@ class InconsistencyDetector:
         ]
         
         # Resumen por severidad
-        report_lines.extend([
+        yield from [
             "📊 RESUMEN POR SEVERIDAD:",
             "-" * 40
-        ])
+        ]
         
         severity_order = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
         for severity in severity_order:
             count = len(by_severity.get(severity, []))
             if count > 0:
                 icon = {'CRITICAL': '🔴', 'HIGH': '🟠', 'MEDIUM': '🟡', 'LOW': '🟢'}[severity]
-                report_lines.append(f"{icon} {severity}: {count} inconsistencias")
+                yield f"{icon} {severity}: {count} inconsistencias"
         
-        report_lines.append("")
+        yield ""
         
         # Detalle por severidad
+        severity_icons = {'CRITICAL': '🔴', 'HIGH': '🟠', 'MEDIUM': '🟡', 'LOW': '🟢'}
         for severity in severity_order:
             inconsistencies = by_severity.get(severity, [])
             if not inconsistencies:
                 continue
                 
-            report_lines.extend([
-                f"{{'CRITICAL': '🔴', 'HIGH': '🟠', 'MEDIUM': '🟡', 'LOW': '🟢'}[severity]} INCONSISTENCIAS {severity}",
+            yield from [
+                f"{severity_icons[severity]} INCONSISTENCIAS {severity}",
                 "=" * 60
-            ])
+            ]
             
             for i, inc in enumerate(inconsistencies, 1):
-                report_lines.extend([
+                yield from [
                     f"{i}. {inc.type}",
                     f"   Tabla: {inc.table}",
                     f"   Columna: {inc.column}",
@@ -588,10 +1699,16 @@ class InconsistencyDetector:
                     f"   Ejemplos: {inc.examples}",
                     f"   Acción sugerida: {inc.suggested_action}",
                     ""
-                ])
+                ]
+        
+        # Verificaciones no ejecutadas (fail_fast / time_budget)
+        yield from self._format_skipped_checks()
+        
+        # Perfil de ejecución de reglas y detectores
+        yield from self.profiler.format_report()
         
         # Recomendaciones generales
-        report_lines.extend([
+        yield from [
             "💡 RECOMENDACIONES GENERALES:",
             "=" * 40,
             "1. Priorizar inconsistencias CRÍTICAS y ALTAS",
@@ -600,22 +1717,117 @@ class InconsistencyDetector:
             "4. Crear scripts de validación automática",
             "5. Documentar los estándares de calidad de datos",
             ""
-        ])
+        ]
+    
+    def export_results(self, directory: str, run_id: str = None,
+                       max_examples: int = 5, max_example_chars: int = 200) -> str:
+        """
+        Exporta las inconsistencias de la última ejecución a Parquet
+        (resultados y ejemplos truncados en ficheros separados).
+        
+        Args:
+            directory: Directorio del historial de resultados
+            run_id: Identificador de la ejecución (por defecto, fecha y hora)
+            max_examples: Ejemplos guardados por inconsistencia
+            max_example_chars: Longitud máxima de cada ejemplo
+            
+        Returns:
+            str: run_id usado
+        """
+        run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S')
+        paths = write_run(directory, run_id, self.inconsistencies, self.last_run_info.get('fingerprints'),
+                          max_examples, max_example_chars)
+        self.logger.info(f"💾 Resultados exportados: {paths['results']}")
+        return run_id
+    
+    @staticmethod
+    def load_results(directory: str, run_id: str, with_examples: bool = True) -> List[Inconsistency]:
+        """
+        Carga las inconsistencias de una ejecución exportada con export_results.
+        
+        Args:
+            directory: Directorio del historial de resultados
+            run_id: Identificador de la ejecución
+            with_examples: Leer también los ejemplos (truncados)
+            
+        Returns:
+            List[Inconsistency]: Inconsistencias de la ejecución
+        """
+        results = read_results(directory, run_ids=[run_id])
+        examples = read_examples(directory, run_id) if with_examples else {}
+        
+        inconsistencies = []
+        for row in results.sort_values('inconsistency_id').itertuples(index=False):
+            interval = None if pd.isna(row.rate_low) else (row.rate_low, row.rate_high)
+            inconsistencies.append(Inconsistency(
+                type=row.type, severity=row.severity, table=row.table, column=row.column,
+                description=row.description, count=int(row.count),
+                examples=examples.get(row.inconsistency_id, []),
+                suggested_action=row.suggested_action,
+                estimated=bool(row.estimated), rate_interval=interval
+            ))
+        return inconsistencies
+    
+    def _format_skipped_checks(self) -> List[str]:
+        """Líneas del reporte con las verificaciones que no llegaron a ejecutarse."""
+        skipped = self.last_run_info.get('skipped_checks', [])
+        if not skipped:
+            return []
+        
+        reason = {'fail_fast': 'rechazo anticipado', 'time_budget': 'presupuesto de tiempo agotado'}
+        lines = [f"⏭️ VERIFICACIONES NO EJECUTADAS ({reason.get(self.last_run_info['stopped_by'], '')}):",
+                 "-" * 40]
+        for check in skipped:
+            # Las referencias ya se nombran como 'tabla.columna'
+            name = check['name'] if check['kind'] == 'reference' else f"{check['table']}.{check['name']}"
+            lines.append(f"- {check['kind']} {name}")
+        lines.append("")
+        return lines
+    
+    def configure_profiling(self, enabled: bool = True, track_memory: bool = False,
+                            budget_ms: float = None, timeout_s: float = None):
+        """
+        Configura el perfilado de reglas y detectores.
         
-        return "\n".join(report_lines)
+        Args:
+            enabled: Registrar tiempos, violaciones y errores por invocación
+            track_memory: Medir memoria pico con tracemalloc (más lento)
+            budget_ms: Presupuesto por invocación; las que lo superan se marcan
+            timeout_s: Tiempo máximo por regla de negocio (None = sin límite)
+        """
+        self.profiler = RuleProfiler(enabled, track_memory, budget_ms, timeout_s)
+    
+    def get_rule_profile(self) -> pd.DataFrame:
+        """
+        Retorna el perfil de la última ejecución: una fila por invocación de
+        detector, regla o verificación referencial, de la más lenta a la más rápida.
+        """
+        return self.profiler.to_frame()
     
-    def get_inconsistencies_summary(self) -> Dict[str, int]:
+    def get_inconsistencies_summary(self, inconsistencies: List[Inconsistency] = None,
+                                    bitmaps: Dict[str, ViolationBitmap] = None,
+                                    table_rows: Dict[str, int] = None) -> Dict[str, int]:
         """
         Retorna un resumen numérico de inconsistencias por tipo y severidad.
+        
+        Args:
+            inconsistencies: Inconsistencias a resumir (por defecto las de la última ejecución)
+            bitmaps: Bitmaps de violaciones por tabla (por defecto los de la última ejecución)
+            table_rows: Filas de cada tabla evaluada, denominador de 'row_percentages'
+                (por defecto las de la última ejecución)
         """
+        inconsistencies = self.inconsistencies if inconsistencies is None else inconsistencies
+        bitmaps = self.violation_bitmaps if bitmaps is None else bitmaps
+        if table_rows is None:
+            table_rows = self.last_run_info.get('table_rows', {})
         summary = {
-            'total': len(self.inconsistencies),
+            'total': len(inconsistencies),
             'by_severity': {},
             'by_type': {},
             'by_table': {}
         }
         
-        for inc in self.inconsistencies:
+        for inc in inconsistencies:
             # Por severidad
             if inc.severity not in summary['by_severity']:
                 summary['by_severity'][inc.severity] = 0
@@ -630,6 +1842,30 @@ class InconsistencyDetector:
             if inc.table not in summary['by_table']:
                 summary['by_table'][inc.table] = 0
             summary['by_table'][inc.table] += 1
+            
+            # Intervalos de las estimaciones por muestreo (peor caso por severidad)
+            if inc.estimated:
+                rates = summary.setdefault('estimated_rates', {})
+                low, high = rates.get(inc.severity, (0.0, 0.0))
+                rates[inc.severity] = (max(low, inc.rate_interval[0]), max(high, inc.rate_interval[1]))
+        
+        # Porcentaje exacto de filas afectadas por severidad, desde los bitmaps,
+        # sobre todas las filas evaluadas (también las de tablas sin reglas)
+        rows_by_table = {table_name: bitmap.n_rows for table_name, bitmap in bitmaps.items()}
+        rows_by_table.update(table_rows)
+        total_rows = sum(rows_by_table.values())
+        if bitmaps and total_rows > 0:
+            affected = {}
+            for bitmap in bitmaps.values():
+                for severity in set(bitmap.severities.values()):
+                    affected[severity] = affected.get(severity, 0) + int(bitmap.any_mask([severity]).sum())
+                affected['TOTAL'] = affected.get('TOTAL', 0) + int(bitmap.any_mask().sum())
+            summary['row_percentages'] = {severity: 100 * rows / total_rows for severity, rows in affected.items()}
+        
+        # Verificaciones omitidas: el resultado es parcial
+        if self.last_run_info.get('skipped_checks'):
+            summary['skipped_checks'] = len(self.last_run_info['skipped_checks'])
+            summary['stopped_by'] = self.last_run_info['stopped_by']
         
         return summary
 
@@ -663,9 +1899,7 @@ def stock_coherente_con_ventas(df: pd.DataFrame) -> pd.DataFrame:
 def email_unico_por_cliente(df: pd.DataFrame) -> pd.DataFrame:
     """Regla: Cada email debe pertenecer a un único cliente."""
     if 'email' in df.columns and 'id_cliente' in df.columns:
-        email_counts = df.groupby('email')['id_cliente'].nunique()
-        emails_duplicados = email_counts[email_counts > 1].index
-        return df[df['email'].isin(emails_duplicados)]
+        return df[entity_violation_mask(df, 'email', ['id_cliente'])]
     return pd.DataFrame()
 
 def fecha_entrega_posterior_a_pedido(df: pd.DataFrame) -> pd.DataFrame:
@@ -688,23 +1922,23 @@ MEGAMERCADO_BUSINESS_RULES = {
             'severity': 'MEDIUM'
         },
         'email_unico': {
-            'function': email_unico_por_cliente,
+            'unique_per_entity': {'key': 'email', 'attributes': ['id_cliente']},
             'severity': 'HIGH'
         }
     },
     'productos': {
         'precio_vs_costo': {
-            'function': precio_mayor_que_costo,
+            'expression': 'precio > costo',
             'severity': 'HIGH'
         },
         'stock_positivo': {
-            'function': stock_coherente_con_ventas,
+            'expression': 'stock >= 0',
             'severity': 'MEDIUM'
         }
     },
     'ventas': {
         'fecha_entrega_logica': {
-            'function': fecha_entrega_posterior_a_pedido,
+            'expression': 'fecha_entrega >= fecha_pedido',
             'severity': 'HIGH'
         }
     }
@@ -0,0 +1,201 @@
+"""
+Caché de Resultados por Huella de Datos
+=======================================
+
+Permite omitir la revalidación de tablas que no han cambiado entre
+ejecuciones. Cada tabla se identifica por una huella (hash por chunks de
+su contenido más su esquema) y los resultados de cada detector o regla se
+guardan con la clave (huella, versión de la regla, configuración).
+
+La caché vive en memoria y, opcionalmente, en disco (un pickle por
+entrada), de modo que sobrevive entre ejecuciones del job nocturno. Ambas
+están acotadas: en memoria se descartan las entradas menos usadas y en
+disco las más antiguas (por número de ficheros y por antigüedad).
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import pandas as pd
+
+
+def fingerprint_table(df: pd.DataFrame, chunk_rows: int = 500_000) -> str:
+    """
+    Calcula la huella de una tabla: esquema más hash del contenido.
+
+    El contenido se recorre por chunks con ``pd.util.hash_pandas_object``
+    (vectorizado) y se acumula en un único digest blake2b.
+
+    Args:
+        df: Tabla a identificar
+        chunk_rows: Filas por chunk para acotar memoria
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    schema = '|'.join(f"{column}:{dtype}" for column, dtype in df.dtypes.items())
+    digest.update(f"{len(df)}|{schema}".encode('utf-8'))
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        digest.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+def callable_version(function) -> str:
+    """
+    Versión de una función a partir de su bytecode y constantes, de modo
+    que modificar la regla invalida sus resultados en caché.
+
+    Args:
+        function: Función o método
+
+    Returns:
+        str: Huella de la implementación
+    """
+    function = getattr(function, '__func__', function)
+    code = getattr(function, '__code__', None)
+    if code is None:
+        return repr(function)
+
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(code.co_code)
+    digest.update(repr(code.co_consts).encode('utf-8'))
+    digest.update(repr(code.co_names).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Combina las partes de una clave en un identificador estable."""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de resultados de detección, en memoria y opcionalmente en disco.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, logger: logging.Logger = None,
+                 max_memory_entries: int = 1024, max_disk_entries: int = 10_000,
+                 max_age_days: Optional[float] = 30):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_dir: Directorio para persistir resultados (None = solo memoria)
+            logger: Logger para registrar errores de lectura/escritura
+            max_memory_entries: Entradas en memoria (se descartan las menos usadas)
+            max_disk_entries: Ficheros en disco (se borran los de uso más antiguo)
+            max_age_days: Antigüedad máxima de un fichero sin usarse (None = sin límite)
+        """
+        self.cache_dir = cache_dir
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_age_days = max_age_days
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._disk_writes = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Devuelve el resultado guardado o None si no existe."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        if self.cache_dir and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = pickle.load(f)
+                # La fecha de modificación marca el último uso para la expulsión
+                os.utime(self._path(key))
+                self._remember(key, value)
+                self.hits += 1
+                return value
+            except Exception as e:
+                self.logger.warning(f"No se pudo leer la caché {key}: {e}")
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """Guarda un resultado."""
+        self._remember(key, value)
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), 'wb') as f:
+                    pickle.dump(value, f)
+            except Exception as e:
+                self.logger.warning(f"No se pudo escribir la caché {key}: {e}")
+                return
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                self.evict()
+
+    def evict(self) -> int:
+        """
+        Borra del disco los ficheros caducados y, si sobran, los de uso más antiguo.
+
+        Returns:
+            int: Ficheros borrados
+        """
+        if not self.cache_dir:
+            return 0
+
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, filename)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+
+        expired = []
+        if self.max_age_days is not None:
+            limit = time.time() - self.max_age_days * 86400
+            expired = [path for mtime, path in entries if mtime < limit]
+        remaining = len(entries) - len(expired)
+        if remaining > self.max_disk_entries:
+            expired += [path for _, path in entries[len(expired):len(expired) + remaining - self.max_disk_entries]]
+
+        for path in expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.evictions += len(expired)
+        return len(expired)
+
+    def clear(self):
+        """Elimina todos los resultados guardados."""
+        self._memory = OrderedDict()
+        if self.cache_dir:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, filename))
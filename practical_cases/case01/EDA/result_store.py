@@ -0,0 +1,181 @@
+"""
+Almacenamiento Columnar de Resultados
+=====================================
+
+Guarda el resultado de cada ejecución del detector en Parquet para
+conservar semanas de historial con poca memoria y consultarlo por columnas:
+
+- <directorio>/results/<run_id>.parquet: una fila por inconsistencia
+  (tipo, severidad, tabla, columna, conteo, run_id, huella de la tabla)
+- <directorio>/examples/<run_id>.parquet: ejemplos serializados en JSON y
+  truncados, separados para que las consultas sobre resultados no los lean
+
+Requiere pyarrow.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+RESULT_COLUMNS = ['run_id', 'inconsistency_id', 'type', 'severity', 'table', 'column', 'description',
+                  'count', 'suggested_action', 'estimated', 'rate_low', 'rate_high', 'fingerprint']
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow es necesario para exportar resultados a Parquet (pip install pyarrow)")
+
+
+def _truncate_example(example: Any, max_chars: int) -> str:
+    text = json.dumps(example, default=str, ensure_ascii=False)
+    return text if len(text) <= max_chars else text[:max_chars] + '…'
+
+
+def write_run(directory: str, run_id: str, inconsistencies: Iterable,
+              fingerprints: Optional[Dict[str, str]] = None,
+              max_examples: int = 5, max_example_chars: int = 200) -> Dict[str, str]:
+    """
+    Escribe las inconsistencias de una ejecución en Parquet.
+
+    Args:
+        directory: Directorio del historial
+        run_id: Identificador de la ejecución (nombre de los ficheros)
+        inconsistencies: Inconsistencias a guardar
+        fingerprints: Huella de cada tabla validada (opcional)
+        max_examples: Ejemplos guardados por inconsistencia
+        max_example_chars: Longitud máxima de cada ejemplo serializado
+
+    Returns:
+        Dict[str, str]: Rutas de los ficheros de resultados y ejemplos
+    """
+    _require_pyarrow()
+    fingerprints = fingerprints or {}
+
+    results = {column: [] for column in RESULT_COLUMNS}
+    examples = {'run_id': [], 'inconsistency_id': [], 'example_index': [], 'example': []}
+
+    for position, inc in enumerate(inconsistencies):
+        low, high = inc.rate_interval if inc.rate_interval is not None else (None, None)
+        row = {
+            'run_id': run_id, 'inconsistency_id': position, 'type': inc.type, 'severity': inc.severity,
+            'table': inc.table, 'column': inc.column, 'description': inc.description, 'count': int(inc.count),
+            'suggested_action': inc.suggested_action, 'estimated': inc.estimated,
+            'rate_low': low, 'rate_high': high, 'fingerprint': fingerprints.get(inc.table)
+        }
+        for column in RESULT_COLUMNS:
+            results[column].append(row[column])
+
+        for index, example in enumerate(list(inc.examples or [])[:max_examples]):
+            examples['run_id'].append(run_id)
+            examples['inconsistency_id'].append(position)
+            examples['example_index'].append(index)
+            examples['example'].append(_truncate_example(example, max_example_chars))
+
+    # Columnas repetitivas como diccionario: ocupan un entero por fila
+    schema = pa.schema([
+        ('run_id', pa.dictionary(pa.int32(), pa.string())),
+        ('inconsistency_id', pa.int32()),
+        ('type', pa.dictionary(pa.int32(), pa.string())),
+        ('severity', pa.dictionary(pa.int8(), pa.string())),
+        ('table', pa.dictionary(pa.int32(), pa.string())),
+        ('column', pa.dictionary(pa.int32(), pa.string())),
+        ('description', pa.string()),
+        ('count', pa.int64()),
+        ('suggested_action', pa.dictionary(pa.int32(), pa.string())),
+        ('estimated', pa.bool_()),
+        ('rate_low', pa.float64()),
+        ('rate_high', pa.float64()),
+        ('fingerprint', pa.dictionary(pa.int32(), pa.string()))
+    ])
+    examples_schema = pa.schema([
+        ('run_id', pa.dictionary(pa.int32(), pa.string())),
+        ('inconsistency_id', pa.int32()),
+        ('example_index', pa.int16()),
+        ('example', pa.string())
+    ])
+
+    paths = {
+        'results': os.path.join(directory, 'results', f"{run_id}.parquet"),
+        'examples': os.path.join(directory, 'examples', f"{run_id}.parquet")
+    }
+    for path in paths.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    pq.write_table(pa.Table.from_pydict(results, schema=schema), paths['results'], compression='zstd')
+    pq.write_table(pa.Table.from_pydict(examples, schema=examples_schema), paths['examples'], compression='zstd')
+    return paths
+
+
+def read_results(directory: str, columns: Optional[List[str]] = None,
+                 run_ids: Optional[List[str]] = None, severities: Optional[List[str]] = None,
+                 tables: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Consulta el historial de resultados leyendo solo las columnas y filas
+    necesarias (los filtros se aplican al leer los ficheros).
+
+    Args:
+        directory: Directorio del historial
+        columns: Columnas a leer (None = todas)
+        run_ids: Ejecuciones a incluir (None = todas)
+        severities: Severidades a incluir (None = todas)
+        tables: Tablas a incluir (None = todas)
+
+    Returns:
+        pd.DataFrame: Una fila por inconsistencia
+    """
+    _require_pyarrow()
+    results_dir = os.path.join(directory, 'results')
+    if not os.path.isdir(results_dir):
+        return pd.DataFrame(columns=columns or RESULT_COLUMNS)
+
+    dataset = ds.dataset(results_dir, format='parquet')
+    conditions = []
+    for field, values in (('run_id', run_ids), ('severity', severities), ('table', tables)):
+        if values is not None:
+            conditions.append(ds.field(field).isin(list(values)))
+
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def read_examples(directory: str, run_id: str) -> Dict[int, List[Any]]:
+    """
+    Lee los ejemplos de una ejecución.
+
+    Args:
+        directory: Directorio del historial
+        run_id: Identificador de la ejecución
+
+    Returns:
+        Dict[int, List[Any]]: Ejemplos por inconsistency_id (los truncados
+        se devuelven como texto)
+    """
+    _require_pyarrow()
+    path = os.path.join(directory, 'examples', f"{run_id}.parquet")
+    if not os.path.exists(path):
+        return {}
+
+    examples = {}
+    table = pq.read_table(path, columns=['inconsistency_id', 'example'])
+    for inconsistency_id, text in zip(table.column('inconsistency_id').to_pylist(),
+                                      table.column('example').to_pylist()):
+        try:
+            example = json.loads(text)
+        except ValueError:
+            example = text
+        examples.setdefault(inconsistency_id, []).append(example)
+    return examples
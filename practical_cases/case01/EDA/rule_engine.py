@@ -0,0 +1,754 @@
+"""
+Motor de Reglas de Negocio Declarativas
+======================================
+
+Este módulo permite expresar reglas de negocio como texto en lugar de
+funciones opacas, por ejemplo:
+
+- ``precio > costo``
+- ``fecha_entrega >= fecha_pedido``
+- ``edad between 0 and 150``
+- ``estado in ('Entregado', 'Pendiente')``
+
+También incluye reglas de consistencia por entidad ("un valor por
+entidad", ej. un único email por cliente) resueltas con un solo
+``groupby(...).nunique()``.
+
+Cada expresión describe la condición que debe cumplir un registro válido.
+Las reglas de una tabla se compilan una sola vez y se evalúan de forma
+vectorizada (con numexpr si está disponible) sobre columnas convertidas
+una única vez, devolviendo índices o bitmaps de violaciones en lugar de
+copias del DataFrame.
+
+Un registro solo viola una regla cuando todas las columnas referenciadas
+(fuera de predicados ``is null``) tienen valor y la condición es falsa.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+
+class RuleSyntaxError(ValueError):
+    """Error de sintaxis en una expresión de regla declarativa."""
+
+
+# ============================================================================
+# ANÁLISIS SINTÁCTICO
+# ============================================================================
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?) |
+        (?P<string>'[^']*'|"[^"]*") |
+        (?P<op>>=|<=|==|!=|<>|>|<|=|\+|-|\*|/|\(|\)|,) |
+        (?P<name>[^\W\d]\w*)
+    )""", re.VERBOSE | re.UNICODE)
+
+_KEYWORDS = {'and', 'or', 'not', 'between', 'is', 'null', 'in', 'today'}
+_COMPARISONS = {'>', '<', '>=', '<=', '==', '!=', '<>', '='}
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Divide una expresión en tokens (tipo, valor)."""
+    tokens = []
+    position = 0
+    expression = expression.strip()
+
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise RuleSyntaxError(f"Carácter inesperado en '{expression}' (posición {position})")
+        position = match.end()
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+
+    return tokens
+
+
+class _Parser:
+    """Parser descendente recursivo para el lenguaje de reglas."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def parse(self):
+        node = self._or()
+        if self.position != len(self.tokens):
+            raise RuleSyntaxError(f"Token inesperado '{self.tokens[self.position][1]}' en '{self.expression}'")
+        return node
+
+    def _peek(self, value: str = None) -> bool:
+        if self.position >= len(self.tokens):
+            return False
+        return value is None or self.tokens[self.position][1] == value
+
+    def _take(self, value: str = None) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise RuleSyntaxError(f"Expresión incompleta: '{self.expression}'")
+        token = self.tokens[self.position]
+        if value is not None and token[1] != value:
+            raise RuleSyntaxError(f"Se esperaba '{value}' y se encontró '{token[1]}' en '{self.expression}'")
+        self.position += 1
+        return token
+
+    def _or(self):
+        node = self._and()
+        while self._peek('or'):
+            self._take()
+            node = ('or', node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._peek('and'):
+            self._take()
+            node = ('and', node, self._not())
+        return node
+
+    def _not(self):
+        if self._peek('not'):
+            self._take()
+            return ('not', self._not())
+        return self._predicate()
+
+    def _predicate(self):
+        # Paréntesis de agrupación lógica: se intenta primero como condición
+        if self._peek('('):
+            saved = self.position
+            self._take('(')
+            try:
+                node = self._or()
+                self._take(')')
+                if not self._peek() or self.tokens[self.position][1] in ('and', 'or', ')'):
+                    return node
+            except RuleSyntaxError:
+                pass
+            self.position = saved
+
+        left = self._arith()
+
+        if self._peek('between'):
+            self._take()
+            low = self._arith()
+            self._take('and')
+            high = self._arith()
+            return ('between', left, low, high)
+
+        if self._peek('is'):
+            self._take()
+            negate = self._peek('not')
+            if negate:
+                self._take()
+            self._take('null')
+            return ('isnull', left, negate)
+
+        negate = self._peek('not')
+        if negate or self._peek('in'):
+            if negate:
+                self._take('not')
+            self._take('in')
+            self._take('(')
+            values = [self._literal()]
+            while self._peek(','):
+                self._take()
+                values.append(self._literal())
+            self._take(')')
+            return ('in', left, values, negate)
+
+        if self._peek() and self.tokens[self.position][1] in _COMPARISONS:
+            op = self._take()[1]
+            op = {'=': '==', '<>': '!='}.get(op, op)
+            return ('cmp', op, left, self._arith())
+
+        raise RuleSyntaxError(f"Se esperaba una comparación en '{self.expression}'")
+
+    def _literal(self):
+        kind, value = self._take()
+        if kind == 'number':
+            return float(value)
+        if kind == 'string':
+            return value[1:-1]
+        raise RuleSyntaxError(f"Se esperaba un literal en lista 'in' de '{self.expression}'")
+
+    def _arith(self):
+        node = self._term()
+        while self._peek('+') or self._peek('-'):
+            op = self._take()[1]
+            node = ('arith', op, node, self._term())
+        return node
+
+    def _term(self):
+        node = self._unary()
+        while self._peek('*') or self._peek('/'):
+            op = self._take()[1]
+            node = ('arith', op, node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek('-'):
+            self._take()
+            return ('neg', self._unary())
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._take()
+        if kind == 'number':
+            return ('num', float(value))
+        if kind == 'string':
+            return ('str', value[1:-1])
+        if kind == 'keyword' and value == 'today':
+            return ('today',)
+        if kind == 'name':
+            return ('col', value)
+        if value == '(':
+            node = self._arith()
+            self._take(')')
+            return node
+        raise RuleSyntaxError(f"Token inesperado '{value}' en '{self.expression}'")
+
+
+def _referenced_columns(node, nullable: bool = False, found: Dict[str, bool] = None) -> Dict[str, bool]:
+    """Devuelve {columna: requiere_valor} para todas las columnas de un nodo."""
+    if found is None:
+        found = {}
+    kind = node[0]
+
+    if kind == 'col':
+        found[node[1]] = found.get(node[1], False) or not nullable
+    elif kind == 'isnull':
+        _referenced_columns(node[1], True, found)
+    elif kind in ('and', 'or'):
+        _referenced_columns(node[1], nullable, found)
+        _referenced_columns(node[2], nullable, found)
+    elif kind in ('cmp', 'arith'):
+        _referenced_columns(node[2], nullable, found)
+        _referenced_columns(node[3], nullable, found)
+    elif kind == 'between':
+        for child in node[1:]:
+            _referenced_columns(child, nullable, found)
+    elif kind in ('not', 'neg', 'in'):
+        _referenced_columns(node[1], nullable, found)
+
+    return found
+
+
+# ============================================================================
+# EVALUACIÓN VECTORIZADA
+# ============================================================================
+
+def _is_date_like(name: str) -> bool:
+    """Determina por el nombre si una columna contiene fechas."""
+    name = name.lower()
+    return 'fecha' in name or 'date' in name
+
+
+class _ColumnCache:
+    """Convierte cada columna de una tabla una sola vez para todas las reglas."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._numeric = {}
+        self._text = {}
+        self._notna = {}
+
+    def is_date(self, name: str) -> bool:
+        dtype = self.df[name].dtype
+        return pd.api.types.is_datetime64_any_dtype(dtype) or (
+            not pd.api.types.is_numeric_dtype(dtype) and _is_date_like(name)
+        )
+
+    def is_text(self, name: str) -> bool:
+        """Columna de texto: ni numérica, ni booleana, ni de fechas."""
+        dtype = self.df[name].dtype
+        return not (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+                    or self.is_date(name))
+
+    def numeric(self, name: str) -> np.ndarray:
+        if name not in self._numeric:
+            series = self.df[name]
+            if self.is_date(name):
+                dates = pd.to_datetime(series, errors='coerce')
+                values = dates.values.astype('datetime64[ns]').astype('int64').astype('float64')
+                values[dates.isna().values] = np.nan
+            elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                values = series.to_numpy(dtype='float64', na_value=np.nan)
+            else:
+                values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            self._numeric[name] = values
+        return self._numeric[name]
+
+    def text(self, name: str) -> np.ndarray:
+        if name not in self._text:
+            # Los nulos pasan a '' para poder comparar; notna() los excluye
+            values = self.df[name].to_numpy(dtype=object)
+            self._text[name] = np.where(pd.isna(values), '', values)
+        return self._text[name]
+
+    def notna(self, name: str) -> np.ndarray:
+        # Siempre sobre la columna original: una conversión numérica fallida
+        # (ej. texto) no equivale a un valor nulo
+        if name not in self._notna:
+            self._notna[name] = self.df[name].notna().to_numpy()
+        return self._notna[name]
+
+
+class _TextComparison(Exception):
+    """Indica que una expresión necesita comparación de texto (sin numexpr)."""
+
+
+def _date_literal(value: str) -> float:
+    return float(pd.Timestamp(value).value)
+
+
+def _today() -> float:
+    return float(pd.Timestamp.now().normalize().value)
+
+
+def _compares_dates(node, cache: _ColumnCache) -> bool:
+    """True si algún lado de la comparación es una columna de fecha o 'today'."""
+    kind = node[0]
+    if kind == 'col':
+        return cache.is_date(node[1])
+    if kind == 'today':
+        return True
+    if kind in ('arith',):
+        return _compares_dates(node[2], cache) or _compares_dates(node[3], cache)
+    if kind == 'neg':
+        return _compares_dates(node[1], cache)
+    return False
+
+
+def _needs_text(node, cache: _ColumnCache) -> bool:
+    """True si el nodo compara texto contra texto."""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return _needs_text(node[1], cache) or _needs_text(node[2], cache)
+    if kind == 'not':
+        return _needs_text(node[1], cache)
+    if kind == 'isnull':
+        return True
+    if kind == 'in':
+        return any(isinstance(value, str) for value in node[2])
+    if kind in ('cmp', 'between'):
+        operands = node[2:] if kind == 'cmp' else node[1:]
+        if any(_compares_dates(operand, cache) for operand in operands):
+            return False
+        if any(operand[0] == 'str' for operand in operands):
+            return True
+        # Columna contra columna: texto si todas son de texto (ej. estado == estado_previo)
+        return all(operand[0] == 'col' and cache.is_text(operand[1]) for operand in operands)
+    return False
+
+
+def _to_numexpr(node, cache: _ColumnCache, names: Dict[str, str], constants: Dict[str, float], dates: bool = False) -> str:
+    """Traduce un nodo a una expresión numexpr sobre arrays float64."""
+    kind = node[0]
+
+    if kind == 'col':
+        if node[1] not in names:
+            names[node[1]] = f"c{len(names)}"
+        return names[node[1]]
+    if kind == 'num':
+        return repr(node[1])
+    if kind == 'str':
+        if not dates:
+            raise _TextComparison()
+        key = f"k{len(constants)}"
+        constants[key] = _date_literal(node[1])
+        return key
+    if kind == 'today':
+        key = f"k{len(constants)}"
+        constants[key] = _today()
+        return key
+    if kind == 'neg':
+        return f"(-{_to_numexpr(node[1], cache, names, constants, dates)})"
+    if kind == 'arith':
+        left = _to_numexpr(node[2], cache, names, constants, dates)
+        right = _to_numexpr(node[3], cache, names, constants, dates)
+        return f"({left} {node[1]} {right})"
+    if kind == 'cmp':
+        dates = _compares_dates(node[2], cache) or _compares_dates(node[3], cache)
+        left = _to_numexpr(node[2], cache, names, constants, dates)
+        right = _to_numexpr(node[3], cache, names, constants, dates)
+        return f"({left} {node[1]} {right})"
+    if kind == 'between':
+        dates = any(_compares_dates(child, cache) for child in node[1:])
+        value, low, high = (_to_numexpr(child, cache, names, constants, dates) for child in node[1:])
+        return f"(({value} >= {low}) & ({value} <= {high}))"
+    if kind == 'in':
+        value = _to_numexpr(node[1], cache, names, constants, dates)
+        members = ' | '.join(f"({value} == {member!r})" for member in node[2])
+        return f"(~({members}))" if node[3] else f"({members})"
+    if kind == 'and':
+        return f"({_to_numexpr(node[1], cache, names, constants)} & {_to_numexpr(node[2], cache, names, constants)})"
+    if kind == 'or':
+        return f"({_to_numexpr(node[1], cache, names, constants)} | {_to_numexpr(node[2], cache, names, constants)})"
+    if kind == 'not':
+        return f"(~{_to_numexpr(node[1], cache, names, constants)})"
+    raise _TextComparison()
+
+
+_NUMPY_COMPARISONS = {
+    '>': np.greater, '<': np.less, '>=': np.greater_equal,
+    '<=': np.less_equal, '==': np.equal, '!=': np.not_equal
+}
+_NUMPY_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+
+def _evaluate_operand(node, cache: _ColumnCache, as_text: bool, dates: bool):
+    kind = node[0]
+    if kind == 'col':
+        return cache.text(node[1]) if as_text else cache.numeric(node[1])
+    if kind == 'num':
+        return node[1]
+    if kind == 'str':
+        if as_text:
+            return node[1]
+        return _date_literal(node[1]) if dates else np.nan
+    if kind == 'today':
+        return _today()
+    if kind == 'neg':
+        return -_evaluate_operand(node[1], cache, False, dates)
+    if kind == 'arith':
+        left = _evaluate_operand(node[2], cache, False, dates)
+        right = _evaluate_operand(node[3], cache, False, dates)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _NUMPY_ARITHMETIC[node[1]](left, right)
+    raise RuleSyntaxError(f"Operando no soportado: {node[0]}")
+
+
+def _evaluate_numpy(node, cache: _ColumnCache, n_rows: int) -> np.ndarray:
+    """Evalúa la condición con operaciones numpy (soporta texto y nulos)."""
+    kind = node[0]
+
+    if kind == 'and':
+        return _evaluate_numpy(node[1], cache, n_rows) & _evaluate_numpy(node[2], cache, n_rows)
+    if kind == 'or':
+        return _evaluate_numpy(node[1], cache, n_rows) | _evaluate_numpy(node[2], cache, n_rows)
+    if kind == 'not':
+        return ~_evaluate_numpy(node[1], cache, n_rows)
+    if kind == 'isnull':
+        if node[1][0] != 'col':
+            raise RuleSyntaxError("'is null' solo admite nombres de columna")
+        present = cache.notna(node[1][1])
+        return present if node[2] else ~present
+
+    as_text = _needs_text(node, cache)
+
+    if kind == 'in':
+        values = _evaluate_operand(node[1], cache, as_text, False)
+        members = np.asarray(node[2], dtype=object if as_text else 'float64')
+        result = pd.Series(values).isin(members).to_numpy()
+        return ~result if node[3] else result
+
+    if kind == 'between':
+        dates = any(_compares_dates(child, cache) for child in node[1:])
+        value, low, high = (_evaluate_operand(child, cache, as_text, dates) for child in node[1:])
+        with np.errstate(invalid='ignore'):
+            result = (value >= low) & (value <= high)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (n_rows,))
+
+    if kind == 'cmp':
+        dates = _compares_dates(node[2], cache) or _compares_dates(node[3], cache)
+        left = _evaluate_operand(node[2], cache, as_text, dates)
+        right = _evaluate_operand(node[3], cache, as_text, dates)
+        with np.errstate(invalid='ignore'):
+            result = _NUMPY_COMPARISONS[node[1]](left, right)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (n_rows,))
+
+    raise RuleSyntaxError(f"Nodo de condición no soportado: {kind}")
+
+
+# ============================================================================
+# REGLAS Y CONJUNTOS COMPILADOS
+# ============================================================================
+
+@dataclass
+class RuleExpression:
+    """Expresión declarativa compilada."""
+    text: str
+    tree: tuple
+    columns: Dict[str, bool]
+
+    @property
+    def required_columns(self) -> List[str]:
+        """Columnas que deben tener valor para que la regla aplique."""
+        return [column for column, required in self.columns.items() if required]
+
+    def is_applicable(self, df: pd.DataFrame) -> bool:
+        return all(column in df.columns for column in self.columns)
+
+    def evaluate(self, cache: _ColumnCache, n_rows: int) -> np.ndarray:
+        """Devuelve la máscara booleana de filas que violan la expresión."""
+        truth = None
+        if NUMEXPR_AVAILABLE and not _needs_text(self.tree, cache):
+            names, constants = {}, {}
+            try:
+                text = _to_numexpr(self.tree, cache, names, constants)
+                local_dict = {alias: cache.numeric(column) for column, alias in names.items()}
+                local_dict.update(constants)
+                truth = np.broadcast_to(numexpr.evaluate(text, local_dict=local_dict), (n_rows,))
+            except (_TextComparison, KeyError, SyntaxError, ValueError, TypeError):
+                truth = None
+
+        if truth is None:
+            truth = _evaluate_numpy(self.tree, cache, n_rows)
+
+        violations = ~truth
+        for column in self.required_columns:
+            violations = violations & cache.notna(column)
+        return violations
+
+
+def compile_expression(expression: str) -> RuleExpression:
+    """
+    Compila una expresión de regla declarativa.
+
+    Args:
+        expression: Condición que deben cumplir los registros válidos
+
+    Returns:
+        RuleExpression: Expresión lista para evaluarse
+    """
+    tree = _Parser(expression).parse()
+    return RuleExpression(expression, tree, _referenced_columns(tree))
+
+
+@dataclass
+class DeclarativeRule:
+    """
+    Regla de negocio declarativa.
+
+    Si la regla define varias expresiones alternativas (por ejemplo para
+    distintos nombres de columna), un registro la viola cuando viola
+    cualquiera de las expresiones aplicables a la tabla.
+    """
+    name: str
+    expressions: List[RuleExpression]
+    severity: str = 'HIGH'
+
+    def applicable_expressions(self, df: pd.DataFrame) -> List[RuleExpression]:
+        return [expression for expression in self.expressions if expression.is_applicable(df)]
+
+    def columns(self, df: pd.DataFrame) -> List[str]:
+        """Columnas de la tabla referenciadas por la regla."""
+        columns = []
+        for expression in self.applicable_expressions(df):
+            columns.extend(column for column in expression.columns if column not in columns)
+        return columns
+
+    def evaluate(self, cache: _ColumnCache, n_rows: int) -> Optional[np.ndarray]:
+        """Máscara de violaciones, o None si la regla no aplica a la tabla."""
+        expressions = self.applicable_expressions(cache.df)
+        if not expressions:
+            return None
+
+        mask = np.zeros(n_rows, dtype=bool)
+        for expression in expressions:
+            mask |= expression.evaluate(cache, n_rows)
+        return mask
+
+
+def create_declarative_rule(name: str,
+                            expression: Union[str, List[str]],
+                            severity: str = 'HIGH') -> DeclarativeRule:
+    """
+    Crea una regla declarativa a partir de una o varias expresiones.
+
+    Args:
+        name: Nombre de la regla
+        expression: Expresión o lista de expresiones alternativas
+        severity: Severidad de las violaciones
+
+    Returns:
+        DeclarativeRule: Regla compilada
+    """
+    expressions = [expression] if isinstance(expression, str) else list(expression)
+    return DeclarativeRule(name, [compile_expression(text) for text in expressions], severity)
+
+
+# ============================================================================
+# CONSISTENCIA POR ENTIDAD
+# ============================================================================
+
+def find_inconsistent_entities(df: pd.DataFrame, key: str, attributes: List[str]) -> pd.DataFrame:
+    """
+    Encuentra entidades con más de un valor distinto en algún atributo.
+
+    Resuelve cualquier par (clave de entidad, atributos) con una única
+    pasada ``groupby(...).nunique()``; los valores nulos no cuentan.
+
+    Args:
+        df: Tabla a validar
+        key: Columna que identifica la entidad (ej. 'id_cliente')
+        attributes: Atributos que deberían tener un único valor por entidad
+
+    Returns:
+        pd.DataFrame: Número de valores distintos por atributo, solo para
+        las entidades inconsistentes (indexado por la clave)
+    """
+    attributes = [column for column in attributes if column in df.columns and column != key]
+    if key not in df.columns or not attributes:
+        return pd.DataFrame(columns=attributes)
+
+    distinct = df.groupby(key, sort=False)[attributes].nunique()
+    return distinct[(distinct > 1).any(axis=1)]
+
+
+def entity_violation_mask(df: pd.DataFrame, key: str, attributes: List[str]) -> np.ndarray:
+    """
+    Máscara de filas que pertenecen a entidades inconsistentes.
+
+    Args:
+        df: Tabla a validar
+        key: Columna que identifica la entidad
+        attributes: Atributos que deberían tener un único valor por entidad
+
+    Returns:
+        np.ndarray: Máscara booleana alineada con las filas de ``df``
+    """
+    attributes = [column for column in attributes if column in df.columns and column != key]
+    if key not in df.columns or not attributes or len(df) == 0:
+        return np.zeros(len(df), dtype=bool)
+
+    codes, _ = pd.factorize(df[key])
+    has_key = codes >= 0
+    if not has_key.any():
+        return np.zeros(len(df), dtype=bool)
+
+    distinct = df.loc[has_key, attributes].groupby(codes[has_key], sort=False).nunique()
+    offending = np.zeros(codes.max() + 1, dtype=bool)
+    offending[distinct.index.to_numpy()] = (distinct.to_numpy() > 1).any(axis=1)
+
+    return has_key & offending[np.where(has_key, codes, 0)]
+
+
+@dataclass
+class EntityConsistencyRule:
+    """
+    Regla "un valor por entidad": cada valor de ``key`` debe tener un único
+    valor (no nulo) en cada uno de los ``attributes``.
+    """
+    name: str
+    key: str
+    attributes: List[str]
+    severity: str = 'HIGH'
+
+    @property
+    def description(self) -> str:
+        return f"{', '.join(self.attributes)} único por {self.key}"
+
+    def columns(self, df: pd.DataFrame) -> List[str]:
+        """Columnas de la tabla referenciadas por la regla."""
+        return [self.key] + [column for column in self.attributes if column in df.columns and column != self.key]
+
+    def evaluate(self, cache: _ColumnCache, n_rows: int) -> Optional[np.ndarray]:
+        """Máscara de violaciones, o None si la regla no aplica a la tabla."""
+        if len(self.columns(cache.df)) < 2:
+            return None
+        return entity_violation_mask(cache.df, self.key, self.attributes)
+
+
+def create_entity_consistency_rule(name: str, key: str, attributes: Union[str, List[str]],
+                                   severity: str = 'HIGH') -> EntityConsistencyRule:
+    """
+    Crea una regla de consistencia por entidad.
+
+    Args:
+        name: Nombre de la regla
+        key: Columna que identifica la entidad
+        attributes: Atributo o lista de atributos únicos por entidad
+        severity: Severidad de las violaciones
+
+    Returns:
+        EntityConsistencyRule: Regla lista para evaluarse
+    """
+    attributes = [attributes] if isinstance(attributes, str) else list(attributes)
+    return EntityConsistencyRule(name, key, attributes, severity)
+
+
+@dataclass
+class RuleEvaluation:
+    """
+    Resultado de evaluar las reglas de una tabla.
+
+    Las violaciones se guardan como un bitmap empaquetado (un bit por fila
+    y por regla) en lugar de copias del DataFrame.
+    """
+    rule_names: List[str]
+    packed: np.ndarray
+    n_rows: int
+    counts: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)  # segundos por regla
+
+    def mask(self, rule_name: str) -> np.ndarray:
+        """Máscara booleana de filas que violan la regla."""
+        row = self.packed[self.rule_names.index(rule_name)]
+        return np.unpackbits(row, count=self.n_rows).astype(bool)
+
+    def indices(self, rule_name: str) -> np.ndarray:
+        """Posiciones de las filas que violan la regla."""
+        return np.flatnonzero(self.mask(rule_name))
+
+
+class CompiledRuleSet:
+    """
+    Conjunto de reglas declarativas de una tabla, compilado una vez y
+    evaluado en una sola pasada vectorizada. Admite también reglas de
+    consistencia por entidad.
+    """
+
+    def __init__(self, rules: List[Union[DeclarativeRule, EntityConsistencyRule]] = None):
+        self.rules = list(rules or [])
+
+    def add(self, rule: Union[DeclarativeRule, EntityConsistencyRule]):
+        self.rules = [existing for existing in self.rules if existing.name != rule.name]
+        self.rules.append(rule)
+
+    def evaluate(self, df: pd.DataFrame) -> RuleEvaluation:
+        """
+        Evalúa todas las reglas aplicables sobre el DataFrame.
+
+        Args:
+            df: Tabla a validar
+
+        Returns:
+            RuleEvaluation: Bitmap de violaciones y conteos por regla
+        """
+        n_rows = len(df)
+        cache = _ColumnCache(df)
+        names, masks, timings = [], [], {}
+
+        for rule in self.rules:
+            start = time.perf_counter()
+            mask = rule.evaluate(cache, n_rows)
+            if mask is None:
+                continue
+            timings[rule.name] = time.perf_counter() - start
+            names.append(rule.name)
+            masks.append(mask)
+
+        if masks:
+            packed = np.packbits(np.vstack(masks), axis=1)
+        else:
+            packed = np.zeros((0, (n_rows + 7) // 8), dtype=np.uint8)
+
+        counts = {name: int(mask.sum()) for name, mask in zip(names, masks)}
+        return RuleEvaluation(names, packed, n_rows, counts, timings)
@@ -0,0 +1,163 @@
+"""
+Perfilado de Reglas y Detectores
+================================
+
+Mide cada invocación de detectores, reglas de negocio y verificaciones
+referenciales: tiempo, memoria pico (opcional, con tracemalloc), filas por
+segundo, violaciones encontradas y errores. Permite marcar las reglas que
+superan un presupuesto de tiempo y limitar su ejecución con un timeout.
+"""
+
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, List, Optional
+
+import pandas as pd
+
+
+class RuleTimeoutError(Exception):
+    """La regla superó el tiempo máximo permitido."""
+
+
+@dataclass
+class ProfileRecord:
+    """Medición de una invocación."""
+    kind: str  # 'detector', 'rule', 'reference'
+    table: str
+    name: str
+    rows: int
+    seconds: float = 0.0
+    peak_memory_mb: Optional[float] = None
+    violations: Optional[int] = None
+    status: str = 'OK'  # 'OK', 'ERROR', 'TIMEOUT', 'CACHED'
+    error: Optional[str] = None
+    over_budget: bool = False
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+
+class RuleProfiler:
+    """
+    Registro de mediciones por regla y detector.
+    """
+
+    def __init__(self, enabled: bool = True, track_memory: bool = False,
+                 budget_ms: Optional[float] = None, timeout_s: Optional[float] = None):
+        """
+        Args:
+            enabled: Registrar mediciones
+            track_memory: Medir memoria pico con tracemalloc (añade sobrecarga)
+            budget_ms: Presupuesto por invocación; se marcan las que lo superan
+            timeout_s: Tiempo máximo por regla (None = sin límite)
+        """
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.budget_ms = budget_ms
+        self.timeout_s = timeout_s
+        self.records: List[ProfileRecord] = []
+        self._executor = None
+
+    def reset(self):
+        self.records = []
+
+    @contextmanager
+    def measure(self, kind: str, table: str, name: str, rows: int):
+        """
+        Mide el bloque y registra el resultado. El llamador puede completar
+        ``violations`` y ``status`` en el registro devuelto.
+        """
+        record = ProfileRecord(kind, table, name, rows)
+        started_tracing = False
+        if self.enabled and self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            if record.status == 'OK':
+                record.status = 'TIMEOUT' if isinstance(e, RuleTimeoutError) else 'ERROR'
+            record.error = record.error or str(e)
+            raise
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.enabled and self.track_memory:
+                record.peak_memory_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                if started_tracing:
+                    tracemalloc.stop()
+            self._add(record)
+
+    def add(self, kind: str, table: str, name: str, rows: int, seconds: float,
+            violations: Optional[int] = None, status: str = 'OK', error: Optional[str] = None) -> ProfileRecord:
+        """Registra una medición tomada externamente (ej. reglas compiladas)."""
+        record = ProfileRecord(kind, table, name, rows, seconds, violations=violations, status=status, error=error)
+        self._add(record)
+        return record
+
+    def _add(self, record: ProfileRecord):
+        if not self.enabled:
+            return
+        if self.budget_ms is not None and record.status != 'CACHED':
+            record.over_budget = record.seconds * 1000 > self.budget_ms
+        self.records.append(record)
+
+    def call(self, function: Callable, *args) -> Any:
+        """
+        Ejecuta una función respetando el timeout configurado.
+
+        Python no permite interrumpir un hilo: si la regla excede el tiempo,
+        su resultado se descarta y el hilo se abandona.
+        """
+        if self.timeout_s is None:
+            return function(*args)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rule')
+        future = self._executor.submit(function, *args)
+        try:
+            return future.result(timeout=self.timeout_s)
+        except FutureTimeoutError:
+            # El hilo ocupado no puede reutilizarse para las siguientes reglas
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            raise RuleTimeoutError(f"Tiempo máximo de {self.timeout_s}s superado")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Perfil como tabla, de la invocación más lenta a la más rápida."""
+        columns = ['kind', 'table', 'name', 'rows', 'seconds', 'rows_per_second', 'peak_memory_mb',
+                   'violations', 'status', 'error', 'over_budget']
+        rows = [dict(asdict(record), rows_per_second=record.rows_per_second) for record in self.records]
+        return pd.DataFrame(rows, columns=columns).sort_values('seconds', ascending=False, ignore_index=True)
+
+    def format_report(self, top: int = 15) -> List[str]:
+        """Líneas de la sección de perfil para el reporte de texto."""
+        if not self.records:
+            return []
+
+        # Las más lentas y, siempre, las que fallaron o superaron el presupuesto
+        problems = [r for r in self.records if r.over_budget or r.status in ('ERROR', 'TIMEOUT')]
+        slowest = sorted(self.records, key=lambda r: r.seconds, reverse=True)[:top]
+        shown = slowest + [r for r in problems if r not in slowest]
+
+        lines = ["⏱️ PERFIL DE EJECUCIÓN (más lentos primero):", "-" * 40]
+        for record in shown:
+            speed = f"{record.rows_per_second:,.0f} filas/s" if record.rows_per_second else "-"
+            flag = " ⚠️ SOBRE PRESUPUESTO" if record.over_budget else ""
+            violations = record.violations if record.violations is not None else '-'
+            lines.append(f"{record.kind:<9} {record.table}.{record.name}: {record.seconds * 1000:.1f} ms, "
+                         f"{speed}, violaciones: {violations}, estado: {record.status}{flag}")
+            if record.error:
+                lines.append(f"          Error: {record.error}")
+
+        if problems:
+            lines.append(f"Reglas con problemas: {len(problems)}")
+        lines.append("")
+        return lines
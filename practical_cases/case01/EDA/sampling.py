@@ -0,0 +1,90 @@
+"""
+Muestreo para Triage Rápido de Calidad
+======================================
+
+Utilidades para estimar tasas de violación sobre una muestra en lugar de
+la tabla completa:
+
+- stratified_sample: muestra estratificada por bloques de posición (por
+  defecto) o por una columna de estratos, con asignación proporcional
+- wilson_interval: intervalo de confianza de Wilson para una proporción
+"""
+
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def stratified_sample(df: pd.DataFrame, sample_size: int,
+                      strata_column: Optional[str] = None,
+                      n_blocks: int = 100,
+                      random_state: Optional[int] = 42) -> pd.DataFrame:
+    """
+    Extrae una muestra estratificada con asignación proporcional.
+
+    Sin columna de estratos, la tabla se divide en ``n_blocks`` bloques
+    contiguos (los ficheros suelen estar ordenados por fecha o por carga),
+    de modo que todas las zonas del fichero quedan representadas.
+
+    Args:
+        df: Tabla completa
+        sample_size: Número aproximado de filas de la muestra
+        strata_column: Columna para estratificar (opcional)
+        n_blocks: Bloques de posición cuando no hay columna de estratos
+        random_state: Semilla para reproducibilidad
+
+    Returns:
+        pd.DataFrame: Muestra en el orden original de la tabla
+    """
+    n_rows = len(df)
+    if sample_size >= n_rows:
+        return df
+
+    rng = np.random.default_rng(random_state)
+
+    if strata_column is not None and strata_column in df.columns:
+        codes, _ = pd.factorize(df[strata_column], use_na_sentinel=False)
+        order = np.argsort(codes, kind='stable')
+        sizes = np.bincount(codes)
+    else:
+        n_blocks = max(1, min(n_blocks, n_rows))
+        order = np.arange(n_rows)
+        sizes = np.full(n_blocks, n_rows // n_blocks)
+        sizes[:n_rows % n_blocks] += 1
+
+    allocation = np.minimum(sizes, np.maximum(1, np.round(sample_size * sizes / n_rows).astype(int)))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    positions = [
+        order[start + rng.choice(size, k, replace=False)]
+        for start, size, k in zip(starts, sizes, allocation)
+    ]
+    positions = np.sort(np.concatenate(positions))
+
+    return df.iloc[positions]
+
+
+def wilson_interval(violations: int, sample_rows: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Intervalo de confianza de Wilson para la proporción de filas con violación.
+
+    Args:
+        violations: Filas con violación en la muestra
+        sample_rows: Filas de la muestra
+        confidence: Nivel de confianza
+
+    Returns:
+        Tuple[float, float]: Límites inferior y superior (proporciones 0-1)
+    """
+    if sample_rows == 0:
+        return 0.0, 1.0
+
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = min(violations / sample_rows, 1.0)
+    denominator = 1 + z ** 2 / sample_rows
+    center = (p + z ** 2 / (2 * sample_rows)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / sample_rows + z ** 2 / (4 * sample_rows ** 2)) / denominator
+
+    return float(max(0.0, center - margin)), float(min(1.0, center + margin))
@@ -0,0 +1,301 @@
+"""
+Resúmenes Incrementales y Combinables
+=====================================
+
+Estructuras de memoria acotada para detectar inconsistencias por chunks
+sin cargar la tabla completa. Todas exponen ``update`` (acumular un chunk)
+y ``merge`` (combinar resultados parciales, por ejemplo de varios workers):
+
+- WelfordMoments: media y desviación estándar (algoritmo de Welford/Chan)
+- HeavyHitters: valores más frecuentes (sketch de Misra-Gries)
+- SequenceSketch: mínimo, máximo, distintos (exactos hasta un límite y
+  luego estimados con KMV) e integralidad, para detectar secuencias
+- ReservoirSample: muestra uniforme de tamaño fijo para los ejemplos
+- ViolationCounter: conteo exacto de violaciones más muestra de ejemplos
+"""
+
+import copy
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class WelfordMoments:
+    """Media y varianza incrementales, combinables entre chunks."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values) -> 'WelfordMoments':
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        chunk = WelfordMoments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        return self.merge(chunk)
+
+    def merge(self, other: 'WelfordMoments') -> 'WelfordMoments':
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def std(self) -> float:
+        """Desviación estándar muestral (ddof=1, como pandas)."""
+        if self.count < 2:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class HeavyHitters:
+    """
+    Sketch de Misra-Gries para valores frecuentes.
+
+    Con ``capacity`` contadores, todo valor con frecuencia mayor que
+    n / (capacity + 1) permanece en el resumen, y su conteo estimado
+    subestima el real en como mucho esa cantidad.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.total = 0
+        self.counters: Dict[Any, int] = {}
+
+    def update(self, values) -> 'HeavyHitters':
+        counts = pd.Series(values).value_counts(dropna=True)
+        if len(counts) == 0:
+            return self
+
+        chunk = HeavyHitters(self.capacity)
+        chunk.total = int(counts.sum())
+        chunk.counters = {key: int(value) for key, value in counts.items()}
+        return self.merge(chunk)
+
+    def merge(self, other: 'HeavyHitters') -> 'HeavyHitters':
+        counters = dict(self.counters)
+        for key, value in other.counters.items():
+            counters[key] = counters.get(key, 0) + value
+        self.total += other.total
+
+        if len(counters) > self.capacity:
+            # Restar el (capacity+1)-ésimo conteo mantiene la garantía de error
+            threshold = sorted(counters.values(), reverse=True)[self.capacity]
+            counters = {key: value - threshold for key, value in counters.items() if value > threshold}
+
+        self.counters = counters
+        return self
+
+    def most_common(self) -> Optional[tuple]:
+        """Devuelve (valor, conteo estimado) del valor más frecuente."""
+        if not self.counters:
+            return None
+        return max(self.counters.items(), key=lambda item: item[1])
+
+    @property
+    def error_bound(self) -> float:
+        """Máxima subestimación posible de cualquier conteo."""
+        return self.total / (self.capacity + 1)
+
+
+class SequenceSketch:
+    """
+    Resumen para detectar secuencias consecutivas (1, 2, 3, ...).
+
+    Mantiene mínimo, máximo, si todos los valores son enteros y el número
+    de distintos: exacto mientras no supere ``exact_limit`` valores y, a
+    partir de ahí, estimado con un sketch KMV (k mínimos hashes).
+    """
+
+    def __init__(self, exact_limit: int = 100_000, kmv_size: int = 1024, n_smallest: int = 10):
+        self.exact_limit = exact_limit
+        self.kmv_size = kmv_size
+        self.n_smallest = n_smallest
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.integral = True
+        self.distinct: Optional[np.ndarray] = np.array([], dtype='float64')
+        self.smallest = np.array([], dtype='float64')
+        self.hashes = np.array([], dtype='uint64')
+
+    def update(self, values) -> 'SequenceSketch':
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        chunk = SequenceSketch(self.exact_limit, self.kmv_size, self.n_smallest)
+        unique = np.unique(values)
+        chunk.count = len(values)
+        chunk.minimum = float(unique[0])
+        chunk.maximum = float(unique[-1])
+        chunk.integral = bool(np.all(np.mod(unique, 1) == 0))
+        chunk.distinct = unique if len(unique) <= self.exact_limit else None
+        chunk.smallest = unique[:self.n_smallest]
+        chunk.hashes = self._smallest_hashes(unique)
+        return self.merge(chunk)
+
+    def _smallest_hashes(self, unique: np.ndarray) -> np.ndarray:
+        hashes = np.unique(pd.util.hash_array(unique))
+        return hashes[:self.kmv_size]
+
+    def merge(self, other: 'SequenceSketch') -> 'SequenceSketch':
+        if other.count == 0:
+            return self
+
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.integral = self.integral and other.integral
+        self.smallest = np.union1d(self.smallest, other.smallest)[:self.n_smallest]
+        self.hashes = np.union1d(self.hashes, other.hashes)[:self.kmv_size]
+
+        if self.distinct is not None and other.distinct is not None:
+            merged = np.union1d(self.distinct, other.distinct)
+            self.distinct = merged if len(merged) <= self.exact_limit else None
+        else:
+            self.distinct = None
+        return self
+
+    @property
+    def n_distinct(self) -> float:
+        """Número de valores distintos (exacto o estimado)."""
+        if self.distinct is not None:
+            return float(len(self.distinct))
+        if len(self.hashes) < self.kmv_size:
+            return float(len(self.hashes))
+        kth = float(self.hashes[-1]) / 2.0 ** 64
+        return (self.kmv_size - 1) / kth
+
+    @property
+    def is_exact(self) -> bool:
+        return self.distinct is not None
+
+    def is_consecutive(self) -> bool:
+        """True si los distintos forman una secuencia de enteros sin huecos."""
+        if not self.integral or self.count == 0:
+            return False
+        span = self.maximum - self.minimum + 1
+        if self.is_exact:
+            return self.n_distinct == span
+        # Con la estimación KMV se tolera su error relativo (~1/sqrt(k))
+        return abs(self.n_distinct - span) <= span * 2 / np.sqrt(self.kmv_size)
+
+
+class ReservoirSample:
+    """
+    Muestra uniforme de tamaño fijo, combinable entre chunks.
+
+    Cada elemento recibe una prioridad aleatoria y se conservan los
+    ``capacity`` de menor prioridad (bottom-k), por lo que combinar dos
+    muestras equivale a muestrear la unión.
+    """
+
+    def __init__(self, capacity: int = 5, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.seen = 0
+        self.keys = np.array([], dtype='float64')
+        self.items: List[Any] = []
+        self._random = np.random.default_rng(seed)
+
+    def update(self, items) -> 'ReservoirSample':
+        """
+        Ofrece elementos a la muestra. Acepta listas, Series (valores) o
+        DataFrames (registros); solo se materializan los seleccionados.
+        """
+        if not isinstance(items, (pd.Series, pd.DataFrame)):
+            items = list(items)
+        if len(items) == 0:
+            return self
+
+        chunk = ReservoirSample(self.capacity)
+        chunk.seen = len(items)
+        keys = self._random.random(len(items))
+        keep = np.arange(len(items))
+        if len(items) > self.capacity:
+            keep = np.argpartition(keys, self.capacity)[:self.capacity]
+        chunk.keys = keys[keep]
+
+        if isinstance(items, pd.DataFrame):
+            chunk.items = items.iloc[keep].to_dict('records')
+        elif isinstance(items, pd.Series):
+            chunk.items = items.iloc[keep].tolist()
+        else:
+            chunk.items = [items[i] for i in keep]
+        return self.merge(chunk)
+
+    def merge(self, other: 'ReservoirSample') -> 'ReservoirSample':
+        self.seen += other.seen
+        keys = np.concatenate([self.keys, other.keys])
+        items = self.items + other.items
+        order = np.argsort(keys)[:self.capacity]
+        self.keys = keys[order]
+        self.items = [items[i] for i in order]
+        return self
+
+    def sample(self) -> List[Any]:
+        return list(self.items)
+
+
+class ViolationCounter:
+    """Conteo exacto de violaciones con una muestra acotada de ejemplos."""
+
+    def __init__(self, n_examples: int = 5):
+        self.count = 0
+        self.examples = ReservoirSample(n_examples)
+
+    def update(self, examples) -> 'ViolationCounter':
+        """Suma las violaciones de un chunk (lista, Series o DataFrame)."""
+        self.count += len(examples)
+        self.examples.update(examples)
+        return self
+
+    def merge(self, other: 'ViolationCounter') -> 'ViolationCounter':
+        self.count += other.count
+        self.examples.merge(other.examples)
+        return self
+
+
+class TableSummaryState:
+    """
+    Estado parcial de detección de una tabla: resúmenes por (chequeo, columna).
+
+    Los estados de distintos chunks o workers se combinan con ``merge``.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.rows = 0
+        self.summaries: Dict[tuple, Any] = {}
+
+    def get(self, key: tuple, factory):
+        """Devuelve el resumen de ``key``, creándolo con ``factory`` si no existe."""
+        if key not in self.summaries:
+            self.summaries[key] = factory()
+        return self.summaries[key]
+
+    def merge(self, other: 'TableSummaryState') -> 'TableSummaryState':
+        self.rows += other.rows
+        for key, summary in other.summaries.items():
+            if key in self.summaries:
+                self.summaries[key].merge(summary)
+            else:
+                # Copia: los merges posteriores no deben modificar el estado de origen
+                self.summaries[key] = copy.deepcopy(summary)
+        return self
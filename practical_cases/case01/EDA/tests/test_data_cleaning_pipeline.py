@@ -0,0 +1,123 @@
+"""
+Tests del pipeline de limpieza (data_cleaning_pipeline): separación a
+cuarentena de filas que violan reglas de negocio y proyección de columnas.
+Ejecutar desde EDA: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_cleaning_pipeline import DataCleaningPipeline
+from inconsistency_detector import InconsistencyDetector
+
+
+def make_pipeline(tmp_path, df: pd.DataFrame) -> DataCleaningPipeline:
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_positivo', 'importe > 0', severity='CRITICAL')
+    detector.add_business_rule('ventas', 'descuento_valido', 'descuento <= importe', severity='LOW')
+    detector.run_full_inconsistency_detection({'ventas': df})
+
+    pipeline = DataCleaningPipeline(str(tmp_path), log_level='WARNING')
+    pipeline.inconsistency_detector = detector
+    return pipeline
+
+
+def make_sales() -> pd.DataFrame:
+    return pd.DataFrame({'id_venta': [10, 11, 12, 13, 14],
+                         'importe': [5.0, -1.0, 8.0, 2.0, -4.0],
+                         'descuento': [1.0, 0.0, 9.0, 0.0, 0.0]},
+                        index=[100, 101, 102, 103, 104])
+
+
+def test_rows_violating_any_rule_go_to_quarantine(tmp_path):
+    df = make_sales()
+    pipeline = make_pipeline(tmp_path, df)
+
+    kept = pipeline.route_to_quarantine(df, 'ventas')
+
+    assert kept['id_venta'].tolist() == [10, 13]
+    quarantine = pipeline.quarantine_data['ventas']
+    assert quarantine['id_venta'].tolist() == [11, 12, 14]
+    # El índice original se conserva y cada fila lleva sus reglas violadas
+    assert quarantine.index.tolist() == [101, 102, 104]
+    assert quarantine['reglas_violadas'].tolist() == ['importe_positivo;descuento_valido', 'descuento_valido',
+                                                      'importe_positivo;descuento_valido']
+
+
+def test_quarantine_only_selected_severities(tmp_path):
+    df = make_sales()
+    pipeline = make_pipeline(tmp_path, df)
+
+    kept = pipeline.route_to_quarantine(df, 'ventas', severities=['CRITICAL'])
+
+    assert kept['id_venta'].tolist() == [10, 12, 13]
+    assert pipeline.quarantine_data['ventas']['id_venta'].tolist() == [11, 14]
+
+
+def test_no_routing_without_matching_bitmap(tmp_path):
+    df = make_sales()
+    pipeline = make_pipeline(tmp_path, df)
+
+    # Otra tabla, o un DataFrame distinto del validado: se devuelve tal cual
+    assert pipeline.route_to_quarantine(df, 'clientes') is df
+    shorter = df.iloc[:3]
+    assert pipeline.route_to_quarantine(shorter, 'ventas') is shorter
+    clean = df[df['importe'] > 0]
+    clean_pipeline = make_pipeline(tmp_path, clean.assign(descuento=np.zeros(len(clean))))
+    assert clean_pipeline.route_to_quarantine(clean, 'ventas') is clean
+    assert clean_pipeline.quarantine_data == {}
+
+
+# ============================================================================
+# PROYECCIÓN DE COLUMNAS
+# ============================================================================
+
+def make_products() -> pd.DataFrame:
+    return pd.DataFrame({'id_producto': [1, 2, 3], 'precio': [10.0, 12.0, 8.0], 'costo': [5.0, 6.0, 4.0],
+                         'nombre': ['a', 'b', 'c'], 'fecha_alta': ['2024-01-01', '2024-02-01', '2024-03-01'],
+                         'activo': [True, False, True], 'destacado': [False, False, True]})
+
+
+def test_detectors_declare_their_columns():
+    header = make_products().iloc[:0]
+    detector = InconsistencyDetector()
+
+    assert detector.detector_columns('format', header) == ['nombre', 'fecha_alta']
+    assert detector.detector_columns('range', header) == ['precio', 'costo']
+    assert detector.detector_columns('temporal', header) == ['fecha_alta']
+    assert detector.detector_columns('statistical', header) == ['id_producto', 'precio', 'costo']
+
+
+def test_required_columns_with_table_detectors():
+    df = make_products()
+    detector = InconsistencyDetector()
+    detector.add_business_rule('productos', 'destacado_activo', 'destacado <= activo')
+
+    # Sin tipos no se puede saber qué revisan los detectores
+    assert detector.required_columns('productos', df.columns.tolist()) is None
+    assert detector.required_columns('productos', df.columns.tolist(), dtypes=df.dtypes.to_dict()) == [
+        'nombre', 'fecha_alta', 'precio', 'costo', 'id_producto', 'destacado', 'activo']
+
+    # Una regla de función no declara sus columnas: tabla completa
+    detector.add_business_rule('productos', 'funcion', lambda table: table.iloc[:0])
+    assert detector.required_columns('productos', df.columns.tolist(), dtypes=df.dtypes.to_dict()) is None
+
+
+def test_plan_columns_projects_with_detection(tmp_path):
+    make_products().to_csv(tmp_path / 'productos.csv', index=False)
+    pipeline = DataCleaningPipeline(str(tmp_path), log_level='WARNING')
+    pipeline.inconsistency_detector = InconsistencyDetector()
+    pipeline.inconsistency_detector.add_business_rule('productos', 'precio_costo', 'precio > costo')
+
+    plan = pipeline.plan_columns({'productos': 'productos.csv'}, {'productos': {'text_columns': ['nombre']}})
+
+    # Ningún detector ni regla revisa las columnas booleanas
+    assert plan == {'productos': ['id_producto', 'precio', 'costo', 'nombre', 'fecha_alta']}
+
+    pipeline.inconsistency_detector.add_business_rule('productos', 'funcion', lambda table: table.iloc[:0])
+    assert pipeline.plan_columns({'productos': 'productos.csv'}, {'productos': {'text_columns': ['nombre']}}) == {}
@@ -0,0 +1,151 @@
+"""
+Tests del detector de inconsistencias (inconsistency_detector): resumen
+de filas afectadas y ejecución priorizada de verificaciones.
+Ejecutar desde EDA: python -m pytest tests
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from inconsistency_config import evaluate_data_quality
+from inconsistency_detector import InconsistencyDetector
+
+
+class SlowRule:
+    """Regla de función que cuenta sus llamadas y tarda ``seconds``."""
+
+    def __init__(self, seconds: float = 0.0):
+        self.seconds = seconds
+        self.calls = 0
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.calls += 1
+        time.sleep(self.seconds)
+        return df[df['importe'] > 1000]
+
+
+def make_sales() -> pd.DataFrame:
+    return pd.DataFrame({'id_venta': range(5), 'importe': [10.0, -1.0, 20.0, 30.0, 15.0],
+                         'fecha_venta': pd.date_range('2024-01-01', periods=5)})
+
+
+def test_row_percentages_use_rows_of_every_evaluated_table():
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_positivo', 'importe > 0', severity='HIGH')
+    datasets = {
+        'ventas': pd.DataFrame({'importe': [1.0, -1.0, 2.0, -3.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]}),
+        # Tabla sin reglas de negocio: sin bitmap, pero sus filas se evaluaron
+        'clientes': pd.DataFrame({'id_cliente': range(90)})
+    }
+    detector.run_full_inconsistency_detection(datasets)
+
+    summary = detector.get_inconsistencies_summary()
+
+    assert set(detector.violation_bitmaps) == {'ventas'}
+    assert summary['row_percentages'] == {'HIGH': pytest.approx(2.0), 'TOTAL': pytest.approx(2.0)}
+
+
+def test_row_percentages_with_explicit_table_rows():
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_positivo', 'importe > 0', severity='HIGH')
+    detector.run_full_inconsistency_detection({'ventas': pd.DataFrame({'importe': [-1.0, 3.0]})})
+
+    summary = detector.get_inconsistencies_summary(bitmaps=detector.violation_bitmaps,
+                                                   table_rows={'ventas': 2, 'clientes': 8})
+
+    assert summary['row_percentages']['TOTAL'] == pytest.approx(10.0)
+    # Sin bitmaps no hay porcentajes exactos
+    assert 'row_percentages' not in detector.get_inconsistencies_summary(bitmaps={})
+
+
+# ============================================================================
+# EJECUCIÓN PRIORIZADA: FAIL_FAST Y PRESUPUESTO DE TIEMPO
+# ============================================================================
+
+def test_fail_fast_stops_after_cheapest_critical_check():
+    rule = SlowRule()
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_positivo', 'importe >= 0', severity='CRITICAL')
+    detector.add_business_rule('ventas', 'importe_maximo', rule, severity='HIGH')
+
+    detector.run_full_inconsistency_detection({'ventas': make_sales()}, fail_fast=True)
+    info = detector.last_run_info
+
+    # La regla crítica vectorizada es la verificación más barata por severidad:
+    # se ejecuta primero y su violación detiene el resto
+    assert info['stopped_by'] == 'fail_fast'
+    assert [record.name for record in detector.profiler.records] == ['importe_positivo']
+    assert rule.calls == 0
+    assert {(check['kind'], check['name']) for check in info['skipped_checks']} == {
+        ('detector', 'range'), ('detector', 'temporal'), ('detector', 'statistical'),
+        ('detector', 'format'), ('rule', 'importe_maximo')}
+    assert all(check['reason'] == 'fail_fast' for check in info['skipped_checks'])
+
+    # El rechazo es definitivo aunque la evaluación sea parcial
+    quality = evaluate_data_quality(detector.get_inconsistencies_summary())
+    assert quality['action'] == 'STOP'
+    assert quality['details']['stopped_by'] == 'fail_fast'
+
+
+def test_without_fail_fast_every_check_runs():
+    rule = SlowRule()
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_positivo', 'importe >= 0', severity='CRITICAL')
+    detector.add_business_rule('ventas', 'importe_maximo', rule, severity='HIGH')
+
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    assert detector.last_run_info['stopped_by'] is None
+    assert detector.last_run_info['skipped_checks'] == []
+    assert rule.calls == 1
+
+
+def test_time_budget_skips_remaining_checks():
+    rule = SlowRule(seconds=0.2)
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_maximo', rule, severity='CRITICAL')
+
+    detector.run_full_inconsistency_detection({'ventas': make_sales()}, time_budget=0.1)
+    info = detector.last_run_info
+
+    # Orden por coste/severidad: range, temporal, la regla lenta y después el resto
+    assert rule.calls == 1
+    assert info['stopped_by'] == 'time_budget'
+    assert [check['name'] for check in info['skipped_checks']] == ['statistical', 'format']
+    assert all(check['reason'] == 'time_budget' for check in info['skipped_checks'])
+
+
+def test_exhausted_budget_runs_nothing():
+    rule = SlowRule()
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'importe_maximo', rule)
+
+    result = detector.run_full_inconsistency_detection({'ventas': make_sales()}, time_budget=0.0)
+
+    assert rule.calls == 0
+    assert result == {'ventas': []}
+    assert len(detector.last_run_info['skipped_checks']) == 5
+
+
+@pytest.mark.parametrize('stopped_by', ['time_budget', 'fail_fast'])
+def test_partial_evaluation_is_never_accepted(stopped_by):
+    detector = InconsistencyDetector()
+    detector.run_full_inconsistency_detection({'ventas': make_sales()}, time_budget=0.0)
+    detector.last_run_info['stopped_by'] = stopped_by
+
+    summary = detector.get_inconsistencies_summary()
+    quality = evaluate_data_quality(summary)
+
+    # Sin inconsistencias encontradas, pero con verificaciones omitidas
+    assert summary['total'] == 0
+    assert summary['skipped_checks'] == 4
+    assert quality['quality_level'] == 'INCOMPLETA'
+    assert quality['action'] == 'MANUAL_REVIEW'
+    assert quality['details']['partial_quality_level'] == 'EXCELENTE'
+    assert quality['details']['stopped_by'] == stopped_by
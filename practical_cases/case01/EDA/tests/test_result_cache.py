@@ -0,0 +1,207 @@
+"""
+Tests de la caché de resultados por huella de datos (result_cache) y de
+su uso en el detector de inconsistencias.
+Ejecutar desde EDA: python -m pytest tests
+"""
+
+import datetime
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import inconsistency_detector
+from inconsistency_detector import InconsistencyDetector
+from result_cache import ResultCache, callable_version, fingerprint_table
+
+
+def make_sales() -> pd.DataFrame:
+    return pd.DataFrame({'id_venta': range(6),
+                         'precio': [10.0, 20.0, -5.0, 30.0, 15.0, 8.0],
+                         'cantidad': [1, 2, 3, 0, 5, 1]})
+
+
+class CountingRule:
+    """Regla de función que cuenta cuántas veces se evalúa."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.calls += 1
+        return df[df['cantidad'] <= 0]
+
+
+def make_detector(rule: CountingRule, cache_dir: str = None) -> InconsistencyDetector:
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'cantidad_positiva', rule, version='1')
+    detector.add_business_rule('ventas', 'precio_positivo', 'precio > 0')
+    detector.enable_result_cache(cache_dir)
+    return detector
+
+
+def rule_statuses(detector: InconsistencyDetector) -> dict:
+    records = detector.profiler.records
+    return {record.name: record.status for record in records if record.kind == 'rule'}
+
+
+# ============================================================================
+# HUELLAS
+# ============================================================================
+
+def test_fingerprint_depends_on_content_and_schema():
+    df = make_sales()
+
+    assert fingerprint_table(df) == fingerprint_table(make_sales())
+    # Estable también al recorrer la tabla en varios chunks
+    assert fingerprint_table(df, chunk_rows=2) == fingerprint_table(make_sales(), chunk_rows=2)
+
+    changed = make_sales()
+    changed.loc[3, 'precio'] = 31.0
+    assert fingerprint_table(changed) != fingerprint_table(df)
+    assert fingerprint_table(df.astype({'cantidad': float})) != fingerprint_table(df)
+    assert fingerprint_table(df.rename(columns={'precio': 'importe'})) != fingerprint_table(df)
+
+
+def test_callable_version_changes_with_implementation():
+    def rule(df):
+        return df[df['precio'] < 0]
+
+    def same_rule(df):
+        return df[df['precio'] < 0]
+
+    def other_rule(df):
+        return df[df['precio'] < 1]
+
+    assert callable_version(rule) == callable_version(same_rule)
+    assert callable_version(rule) != callable_version(other_rule)
+
+
+# ============================================================================
+# USO EN EL DETECTOR
+# ============================================================================
+
+def test_unchanged_table_is_served_from_cache():
+    rule = CountingRule()
+    detector = make_detector(rule)
+
+    first = detector.run_full_inconsistency_detection({'ventas': make_sales()})
+    hits = detector.result_cache.hits
+    second = detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    assert rule.calls == 1
+    assert detector.result_cache.hits > hits
+    assert set(rule_statuses(detector).values()) == {'CACHED'}
+    assert [inc.description for inc in second['ventas']] == [inc.description for inc in first['ventas']]
+    # El bitmap por fila se reconstruye desde la caché
+    assert detector.get_violation_bitmap('ventas').mask('cantidad_positiva').tolist() == [
+        False, False, False, True, False, False]
+
+
+def test_changed_data_invalidates_cache():
+    rule = CountingRule()
+    detector = make_detector(rule)
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    changed = make_sales()
+    changed.loc[0, 'cantidad'] = -1
+    result = detector.run_full_inconsistency_detection({'ventas': changed})
+
+    assert rule.calls == 2
+    counts = {inc.description: inc.count for inc in result['ventas'] if inc.type == 'BUSINESS_RULE_VIOLATION'}
+    assert counts['Violación de regla de negocio: cantidad_positiva'] == 2
+
+
+def test_changed_rule_invalidates_cache():
+    rule = CountingRule()
+    detector = make_detector(rule)
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    # Nueva versión explícita de la función y nueva expresión
+    detector.add_business_rule('ventas', 'cantidad_positiva', rule, version='2')
+    detector.add_business_rule('ventas', 'precio_positivo', 'precio > 12')
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    assert rule.calls == 2
+    assert rule_statuses(detector) == {'cantidad_positiva': 'OK', 'precio_positivo': 'OK'}
+    assert detector.get_violation_bitmap('ventas').mask('precio_positivo').sum() == 3
+
+
+def test_function_rules_are_cached_for_one_day(monkeypatch):
+    rule = CountingRule()
+    detector = make_detector(rule)
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date.today() + datetime.timedelta(days=1)
+
+    monkeypatch.setattr(inconsistency_detector, 'date', Tomorrow)
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    # La función se reevalúa al día siguiente; la expresión sin 'today' no
+    assert rule.calls == 2
+    assert rule_statuses(detector) == {'cantidad_positiva': 'OK', 'precio_positivo': 'CACHED'}
+
+
+def test_rules_without_cache_are_always_evaluated():
+    rule = CountingRule()
+    detector = InconsistencyDetector()
+    detector.add_business_rule('ventas', 'cantidad_positiva', rule, cache=False)
+    detector.enable_result_cache()
+
+    for _ in range(2):
+        detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    assert rule.calls == 2
+
+
+def test_disk_cache_survives_between_detectors(tmp_path):
+    rule = CountingRule()
+    make_detector(rule, str(tmp_path)).run_full_inconsistency_detection({'ventas': make_sales()})
+
+    detector = make_detector(rule, str(tmp_path))
+    detector.run_full_inconsistency_detection({'ventas': make_sales()})
+
+    assert rule.calls == 1
+    assert detector.result_cache.hits > 0
+
+
+# ============================================================================
+# EXPULSIÓN
+# ============================================================================
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = ResultCache(max_memory_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1   # 'b' pasa a ser la menos usada
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_cache_evicts_oldest_and_expired_files(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_entries=1, max_disk_entries=2, max_age_days=1)
+    now = time.time()
+    for age_days, key in [(3, 'caducada'), (0.5, 'antigua'), (0.2, 'media'), (0.1, 'reciente')]:
+        cache.set(key, key)
+        os.utime(tmp_path / f"{key}.pkl", (now - age_days * 86400, now - age_days * 86400))
+
+    # 'caducada' supera la antigüedad máxima y 'antigua' sobra del límite de ficheros
+    assert cache.evict() == 2
+    assert sorted(os.listdir(tmp_path)) == ['media.pkl', 'reciente.pkl']
+    assert cache.evictions == 2
+
+    # Leer desde disco marca el uso: 'media' pasa a ser la más reciente
+    assert cache.get('media') == 'media'
+    cache.set('nueva', 'nueva')
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == ['media.pkl', 'nueva.pkl']
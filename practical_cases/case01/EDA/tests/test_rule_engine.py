@@ -0,0 +1,163 @@
+"""
+Tests del lenguaje de reglas declarativas (rule_engine): tokenizador,
+parser y evaluación vectorizada.
+Ejecutar desde EDA: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from rule_engine import (CompiledRuleSet, RuleSyntaxError, _Parser, _tokenize, compile_expression,
+                         create_declarative_rule, create_entity_consistency_rule)
+
+
+def violations(expression: str, df: pd.DataFrame) -> list:
+    """Posiciones de las filas que violan la expresión."""
+    evaluation = CompiledRuleSet([create_declarative_rule('regla', expression)]).evaluate(df)
+    return evaluation.indices('regla').tolist()
+
+
+# ============================================================================
+# TOKENIZADOR Y PARSER
+# ============================================================================
+
+def test_tokenize_classifies_tokens():
+    tokens = _tokenize("precio >= 1.5e2 and estado in ('A', \"B\") AND fecha <= today")
+
+    assert tokens == [('name', 'precio'), ('op', '>='), ('number', '1.5e2'), ('keyword', 'and'),
+                      ('name', 'estado'), ('keyword', 'in'), ('op', '('), ('string', "'A'"),
+                      ('op', ','), ('string', '"B"'), ('op', ')'), ('keyword', 'and'),
+                      ('name', 'fecha'), ('op', '<='), ('keyword', 'today')]
+
+
+def test_tokenize_rejects_unknown_characters():
+    with pytest.raises(RuleSyntaxError):
+        _tokenize('precio > 0 ; drop')
+
+
+def test_parser_builds_tree_and_normalizes_operators():
+    assert _Parser('a = b').parse() == ('cmp', '==', ('col', 'a'), ('col', 'b'))
+    assert _Parser('a <> 1').parse() == ('cmp', '!=', ('col', 'a'), ('num', 1.0))
+    assert _Parser('a * (b - 1) > -c').parse() == (
+        'cmp', '>', ('arith', '*', ('col', 'a'), ('arith', '-', ('col', 'b'), ('num', 1.0))),
+        ('neg', ('col', 'c')))
+    assert _Parser('edad between 0 and 120').parse() == ('between', ('col', 'edad'), ('num', 0.0),
+                                                         ('num', 120.0))
+    assert _Parser("not estado in ('A', 2)").parse() == ('not', ('in', ('col', 'estado'), ['A', 2.0], False))
+    assert _Parser('a is not null or (b > 1 and c < 2)').parse() == (
+        'or', ('isnull', ('col', 'a'), True),
+        ('and', ('cmp', '>', ('col', 'b'), ('num', 1.0)), ('cmp', '<', ('col', 'c'), ('num', 2.0))))
+
+
+@pytest.mark.parametrize('expression', ['precio >', 'precio > 0 and', 'a b', '(a > 1', 'a in (b)', 'precio'])
+def test_parser_rejects_invalid_expressions(expression):
+    with pytest.raises(RuleSyntaxError):
+        compile_expression(expression)
+
+
+def test_required_columns_exclude_null_checks():
+    expression = compile_expression('descuento is null or descuento <= precio')
+
+    assert set(expression.columns) == {'descuento', 'precio'}
+    assert expression.required_columns == ['descuento', 'precio']
+    assert compile_expression('fecha_baja is null').required_columns == []
+
+
+# ============================================================================
+# EVALUACIÓN
+# ============================================================================
+
+def test_numeric_and_arithmetic_comparisons():
+    df = pd.DataFrame({'precio': [10.0, 5.0, 8.0], 'costo': [4.0, 6.0, 8.0], 'cantidad': [2, 1, 3]})
+
+    assert violations('precio > costo', df) == [1, 2]
+    assert violations('precio * cantidad >= 10', df) == [1]
+    assert violations('costo between 4 and 6', df) == [2]
+
+
+def test_date_comparisons_parse_text_dates():
+    df = pd.DataFrame({'fecha_pedido': ['2024-01-10', '2024-01-10', '2024-01-10'],
+                       'fecha_entrega': pd.to_datetime(['2024-01-12', '2024-01-09', '2024-01-10'])})
+
+    assert violations('fecha_entrega >= fecha_pedido', df) == [1]
+    assert violations("fecha_entrega > '2024-01-10'", df) == [1, 2]
+    assert violations('fecha_pedido <= today', df) == []
+
+
+def test_text_literal_comparisons():
+    df = pd.DataFrame({'estado': ['A', 'B', 'C'], 'canal': ['online', 'tienda', 'online']})
+
+    assert violations("estado != 'B'", df) == [1]
+    assert violations("canal in ('online', 'tienda')", df) == []
+    assert violations("estado not in ('A', 'C')", df) == [0, 2]
+
+
+def test_column_to_column_text_comparisons():
+    df = pd.DataFrame({'estado': ['A', 'B', 'C', 'D'], 'estado_previo': ['A', 'X', 'C', 'Y']})
+
+    assert violations('estado == estado_previo', df) == [1, 3]
+    assert violations('estado <> estado_previo', df) == [0, 2]
+
+
+def test_nulls_are_not_violations_unless_checked():
+    df = pd.DataFrame({'estado': ['A', None, 'C', 'D'], 'estado_previo': ['A', 'A', np.nan, 'X'],
+                       'precio': [1.0, np.nan, 3.0, 4.0], 'costo': [0.0, 1.0, np.nan, 5.0]})
+
+    assert violations('estado == estado_previo', df) == [3]
+    assert violations('precio > costo', df) == [3]
+    assert violations('precio is not null', df) == [1]
+    assert violations('costo is null or costo < precio', df) == [3]
+
+
+def test_unparseable_values_are_not_treated_as_nulls():
+    # Un texto que no es número no es un valor nulo: la comparación numérica falla
+    df = pd.DataFrame({'cantidad': ['3', 'n/a', None]})
+
+    assert violations('cantidad > 0', df) == [1]
+
+
+def test_rule_with_missing_columns_is_not_applicable():
+    rules = CompiledRuleSet([create_declarative_rule('precio', ['precio > 0', 'precio_unitario > 0']),
+                             create_declarative_rule('otra', 'no_existe > 0')])
+    evaluation = rules.evaluate(pd.DataFrame({'precio_unitario': [1.0, -1.0]}))
+
+    assert evaluation.rule_names == ['precio']
+    assert evaluation.indices('precio').tolist() == [1]
+
+
+def test_entity_consistency_rule():
+    df = pd.DataFrame({'id_cliente': [1, 1, 2, 2, 3, None],
+                       'segmento': ['A', 'A', 'B', 'C', 'A', 'B']})
+    rules = CompiledRuleSet([create_entity_consistency_rule('segmento_unico', 'id_cliente', 'segmento')])
+
+    assert rules.evaluate(df).indices('segmento_unico').tolist() == [2, 3]
+
+
+def test_packed_bitmap_output():
+    n_rows = 21
+    df = pd.DataFrame({'valor': np.arange(n_rows, dtype=float)})
+    rules = CompiledRuleSet([create_declarative_rule('menor_diez', 'valor >= 10'),
+                             create_declarative_rule('ultima_fila', 'valor != 20')])
+    evaluation = rules.evaluate(df)
+
+    # Un bit por fila y regla, empaquetado en bytes
+    assert evaluation.packed.dtype == np.uint8
+    assert evaluation.packed.shape == (2, (n_rows + 7) // 8)
+    assert evaluation.n_rows == n_rows
+    assert evaluation.counts == {'menor_diez': 10, 'ultima_fila': 1}
+    np.testing.assert_array_equal(evaluation.mask('menor_diez'), np.arange(n_rows) < 10)
+    assert evaluation.indices('ultima_fila').tolist() == [20]
+    assert set(evaluation.timings) == {'menor_diez', 'ultima_fila'}
+
+
+def test_empty_rule_set_returns_empty_bitmap():
+    evaluation = CompiledRuleSet().evaluate(pd.DataFrame({'valor': [1, 2, 3]}))
+
+    assert evaluation.rule_names == []
+    assert evaluation.packed.shape == (0, 1)
@@ -0,0 +1,75 @@
+"""
+Tests del servicio de validación con micro-lotes (validation_service).
+Ejecutar desde EDA: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from validation_service import ValidationService, _PendingRequest
+
+
+def duplicated_orders(df: pd.DataFrame) -> pd.DataFrame:
+    """Regla no local: depende de las demás filas de la tabla."""
+    return df[df.duplicated('id_pedido', keep=False)]
+
+
+def negative_discount(df: pd.DataFrame) -> pd.DataFrame:
+    return df[df['descuento'] < 0]
+
+
+RULES = {
+    'pedidos': {
+        'pedido_duplicado': {'function': duplicated_orders, 'severity': 'HIGH'},
+        'descuento_negativo': {'function': negative_discount, 'severity': 'HIGH', 'row_local': True},
+        'importe_positivo': {'expression': 'importe > 0', 'severity': 'HIGH'}
+    }
+}
+
+
+def make_requests():
+    first = pd.DataFrame({'id_pedido': [1, 2, 3], 'importe': [10.0, -1.0, 5.0], 'descuento': [0, 0, -2]})
+    # Reutiliza los ids de la primera petición sin duplicados propios
+    second = pd.DataFrame({'id_pedido': [1, 2, 2], 'importe': [3.0, 4.0, 6.0], 'descuento': [-1, 0, 0]})
+    return [{'pedidos': first}, {'pedidos': second}]
+
+
+def rule_counts(result: dict) -> dict:
+    return {inc['description'].split(': ')[1].split(' ')[0]: inc['count']
+            for inc in result['inconsistencies'] if inc['type'] == 'BUSINESS_RULE_VIOLATION'}
+
+
+def test_micro_batch_matches_per_request_validation():
+    service = ValidationService(business_rules=RULES)
+    requests = make_requests()
+
+    batched = service._validate_micro_batch([_PendingRequest(datasets) for datasets in requests])
+    separate = [service._validate_datasets(datasets) for datasets in requests]
+
+    for batched_result, separate_result in zip(batched, separate):
+        assert rule_counts(batched_result) == rule_counts(separate_result)
+        assert batched_result['summary']['row_percentages'] == separate_result['summary']['row_percentages']
+
+    # Los ids repetidos entre peticiones no son duplicados de ninguna
+    assert rule_counts(batched[0]) == {'descuento_negativo': 1, 'importe_positivo': 1}
+    assert rule_counts(batched[1]) == {'pedido_duplicado': 2, 'descuento_negativo': 1}
+
+
+def test_only_row_local_rules_are_evaluated_on_the_merged_batch():
+    service = ValidationService(business_rules=RULES)
+    merged_rules = []
+    evaluate = service.detector._evaluate_business_rules
+
+    def spy(df, table_name, rule_names=None, masks=None):
+        if len(df) == 6:
+            merged_rules.extend(rule_names)
+        return evaluate(df, table_name, rule_names, masks)
+
+    service.detector._evaluate_business_rules = spy
+    service._validate_micro_batch([_PendingRequest(datasets) for datasets in make_requests()])
+
+    assert sorted(merged_rules) == ['descuento_negativo', 'importe_positivo']
@@ -0,0 +1,433 @@
+"""
+Servicio Residente de Validación
+================================
+
+Servicio de larga duración para validar lotes que llegan de forma continua
+(ver ``ejemplo_validacion_continua``) sin pagar en cada lote el arranque de
+Python, la importación de pandas ni la preparación de reglas.
+
+El servicio mantiene en memoria:
+- el detector con sus reglas de negocio ya compiladas
+- los índices de claves de las tablas padre (integridad referencial)
+
+Los lotes pequeños que llegan casi a la vez se agrupan en micro-lotes
+(hasta ``max_wait_ms`` de espera o ``max_batch_rows`` filas). Las reglas de
+negocio por fila (expresiones declarativas y funciones declaradas
+``row_local``) se evalúan una sola vez sobre el micro-lote y sus máscaras
+se reparten por el rango de filas de cada petición; el resto de
+verificaciones (detectores por tabla, reglas por entidad, funciones que
+pueden mirar otras filas e integridad referencial) se ejecuta sobre las
+filas de cada petición. Cada petición
+recibe el veredicto de ``evaluate_data_quality`` calculado solo con sus
+propias filas.
+
+Uso:
+    python validation_service.py --port 8765
+
+    POST /validate   {"clientes": [{"id_cliente": 1, ...}, ...]}
+    GET  /health
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from inconsistency_config import (ECOMMERCE_INCONSISTENCY_RULES, QUALITY_THRESHOLDS,
+                                  evaluate_data_quality)
+from inconsistency_detector import InconsistencyDetector
+from violation_bitmap import ViolationBitmap
+
+# Veredicto del lote según la acción recomendada por evaluate_data_quality
+VERDICTS = {
+    'STOP': 'REJECT',
+    'MANUAL_REVIEW': 'REVIEW',
+    'CLEAN_AND_PROCESS': 'ACCEPT',
+    'PROCESS': 'ACCEPT'
+}
+
+
+class _PendingRequest:
+    """Petición encolada a la espera de su micro-lote."""
+
+    def __init__(self, datasets: Dict[str, pd.DataFrame]):
+        self.datasets = datasets
+        self.rows = sum(len(df) for df in datasets.values())
+        self.tables = tuple(sorted(datasets))
+        self.received = time.perf_counter()
+        self.future = Future()
+
+
+class ValidationService:
+    """
+    Servicio de validación con detector residente y micro-lotes.
+    """
+
+    def __init__(self, business_rules: Dict = None, references: Dict = None,
+                 reference_data: Dict[str, pd.DataFrame] = None,
+                 max_wait_ms: float = 5.0, max_batch_rows: int = 10_000,
+                 thresholds: Dict = None, logger: logging.Logger = None):
+        """
+        Inicializa el servicio y prepara el detector.
+
+        Args:
+            business_rules: Reglas de negocio por tabla (por defecto las de e-commerce)
+            references: Relaciones de integridad {"hija.clave": {'parent_table', 'parent_key'}}
+            reference_data: Tablas padre que no llegan en los lotes (ej. productos)
+            max_wait_ms: Espera máxima para agrupar lotes en un micro-lote
+            max_batch_rows: Filas máximas de un micro-lote
+            thresholds: Umbrales de calidad (por defecto QUALITY_THRESHOLDS)
+            logger: Logger del servicio
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self.thresholds = thresholds or QUALITY_THRESHOLDS
+
+        self.detector = InconsistencyDetector(self.logger)
+        self.detector.add_business_rules(business_rules or ECOMMERCE_INCONSISTENCY_RULES)
+
+        for child_ref, parent_info in (references or {}).items():
+            child_table, child_key = child_ref.split('.')
+            self.detector.add_reference_mapping(
+                child_table, parent_info['parent_table'], child_key, parent_info['parent_key']
+            )
+            parent_df = (reference_data or {}).get(parent_info['parent_table'])
+            if parent_df is not None and parent_info['parent_key'] in parent_df.columns:
+                self.detector.register_parent_keys(
+                    parent_info['parent_table'], parent_info['parent_key'], parent_df[parent_info['parent_key']]
+                )
+
+        # Compilar las reglas declarativas una sola vez
+        for table in self.detector.business_rules:
+            self.detector._get_compiled_rules(table)
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._running = False
+        self._micro_batches = 0
+        self._latencies_ms = deque(maxlen=10_000)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'ValidationService':
+        """Arranca el hilo que procesa los micro-lotes."""
+        if not self._running:
+            self._running = True
+            self._worker = threading.Thread(target=self._run, name='validation-worker', daemon=True)
+            self._worker.start()
+            self.logger.info("🚀 Servicio de validación iniciado")
+        return self
+
+    def stop(self):
+        """Detiene el servicio tras procesar las peticiones pendientes."""
+        if self._running:
+            self._running = False
+            self._queue.put(None)
+            self._worker.join()
+            self.logger.info("🛑 Servicio de validación detenido")
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, datasets: Dict[str, pd.DataFrame]) -> Future:
+        """
+        Encola un lote para validación.
+
+        Args:
+            datasets: Tablas del lote
+
+        Returns:
+            Future: Se resuelve con el resultado de validación
+        """
+        if not self._running:
+            self.start()
+        request = _PendingRequest(datasets)
+        self._queue.put(request)
+        return request.future
+
+    def validate(self, datasets: Dict[str, pd.DataFrame], timeout: float = 30.0) -> Dict:
+        """Valida un lote y espera el veredicto."""
+        return self.submit(datasets).result(timeout=timeout)
+
+    def health(self) -> Dict:
+        """Estado del servicio y latencias observadas."""
+        latencies = np.array(self._latencies_ms) if self._latencies_ms else np.array([0.0])
+        return {
+            'status': 'ok' if self._running else 'stopped',
+            'pending_requests': self._queue.qsize(),
+            'micro_batches': self._micro_batches,
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max())
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Micro-lotes
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        carry = None
+        while self._running or carry is not None or not self._queue.empty():
+            request = carry or self._queue.get()
+            carry = None
+            if request is None:
+                continue
+
+            # Agrupar peticiones con las mismas tablas hasta el límite de espera/filas
+            batch = [request]
+            rows = request.rows
+            deadline = request.received + self.max_wait
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    candidate = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if candidate is None or candidate.tables != request.tables:
+                    carry = candidate
+                    break
+                batch.append(candidate)
+                rows += candidate.rows
+
+            self._process(batch)
+
+    def _process(self, batch: List[_PendingRequest]):
+        self._micro_batches += 1
+        try:
+            if len(batch) == 1:
+                results = [self._validate_datasets(batch[0].datasets)]
+            else:
+                results = self._validate_micro_batch(batch)
+        except Exception as e:
+            self.logger.error(f"Error validando micro-lote: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        micro_batch = {
+            'id': self._micro_batches,
+            'requests': len(batch),
+            'rows': sum(request.rows for request in batch)
+        }
+        finished = time.perf_counter()
+        for request, result in zip(batch, results):
+            latency_ms = (finished - request.received) * 1000
+            self._latencies_ms.append(latency_ms)
+            request.future.set_result(dict(result, micro_batch=micro_batch, latency_ms=latency_ms))
+
+    def _validate_micro_batch(self, batch: List[_PendingRequest]) -> List[Dict]:
+        """
+        Valida varias peticiones: las reglas por fila una sola vez sobre el
+        micro-lote y el veredicto de cada petición solo con sus filas.
+        """
+        detector = self.detector
+
+        # Rango de filas de cada petición en las tablas concatenadas
+        offsets = {table: np.cumsum([0] + [len(request.datasets[table]) for request in batch])
+                   for table in batch[0].tables}
+
+        # Reglas por fila: una evaluación sobre el micro-lote. Una función solo
+        # se agrupa si declara no depender de otras filas (duplicados, grupos,
+        # tamaño de la tabla...), para no mezclar peticiones distintas
+        row_masks = {}
+        for table in batch[0].tables:
+            rule_names = [name for name, info in detector.business_rules.get(table, {}).items()
+                          if 'expression' in info or info.get('row_local', False)]
+            if not rule_names:
+                continue
+            merged = pd.concat([request.datasets[table] for request in batch], ignore_index=True)
+            masks = {}
+            detector._evaluate_business_rules(merged, table, rule_names, masks)
+            row_masks[table] = {rule_name: np.unpackbits(packed, count=len(merged)).astype(bool)
+                                for rule_name, packed in masks.items()}
+
+        # El resto (por entidad, funciones no locales o sin índice) va por petición
+        own_rules = {table: [name for name in detector.business_rules.get(table, {})
+                             if name not in row_masks.get(table, {})]
+                     for table in batch[0].tables}
+
+        results = []
+        for position, request in enumerate(batch):
+            inconsistencies = detector.run_full_inconsistency_detection(request.datasets, rules=own_rules)
+            bitmaps = dict(detector.violation_bitmaps)
+
+            for table, masks in row_masks.items():
+                df = request.datasets[table]
+                start, stop = offsets[table][position], offsets[table][position + 1]
+                bitmap = bitmaps.setdefault(table, ViolationBitmap(len(df)))
+                for rule_name, mask in masks.items():
+                    own = mask[start:stop]
+                    bitmap.add(rule_name, own, detector.business_rules[table][rule_name]['severity'])
+                    if own.any():
+                        inconsistencies.setdefault(table, []).append(
+                            detector._rule_inconsistency(df, table, rule_name, np.flatnonzero(own))
+                        )
+
+            found = [inc for table_incs in inconsistencies.values() for inc in table_incs]
+            table_rows = {table: len(df) for table, df in request.datasets.items()}
+            summary = detector.get_inconsistencies_summary(found, bitmaps, table_rows)
+            results.append(self._verdict(summary, found))
+        return results
+
+    def _validate_datasets(self, datasets: Dict[str, pd.DataFrame]) -> Dict:
+        inconsistencies = self.detector.run_full_inconsistency_detection(datasets)
+        summary = self.detector.get_inconsistencies_summary()
+        return self._verdict(summary, [inc for table_incs in inconsistencies.values() for inc in table_incs])
+
+    def _verdict(self, summary: Dict, inconsistencies: List) -> Dict:
+        quality = evaluate_data_quality(summary, thresholds=self.thresholds)
+
+        return {
+            'verdict': VERDICTS[quality['action']],
+            'action': quality['action'],
+            'quality_level': quality['quality_level'],
+            'quality_score': quality['quality_score'],
+            'recommendation': quality['recommendation'],
+            'summary': summary,
+            'inconsistencies': [asdict(inc) for inc in inconsistencies]
+        }
+
+
+# ============================================================================
+# SERVIDOR HTTP LOCAL
+# ============================================================================
+
+def _to_json(payload: Dict) -> bytes:
+    return json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8')
+
+
+def _parse_datasets(body: Dict) -> Dict[str, pd.DataFrame]:
+    """Convierte {"tabla": [registros]} en DataFrames."""
+    tables = body.get('tables', body)
+    return {table: pd.DataFrame.from_records(records) for table, records in tables.items()}
+
+
+def create_http_server(service: ValidationService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Crea el servidor HTTP del servicio (solo localhost por defecto).
+
+    Args:
+        service: Servicio de validación
+        host: Interfaz de escucha
+        port: Puerto (0 = puerto libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor listo para serve_forever()
+    """
+
+    class ValidationHandler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, payload: Dict):
+            body = _to_json(payload)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, service.health())
+            else:
+                self._reply(404, {'error': 'Ruta no encontrada'})
+
+        def do_POST(self):
+            if self.path != '/validate':
+                self._reply(404, {'error': 'Ruta no encontrada'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                datasets = _parse_datasets(json.loads(self.rfile.read(length)))
+            except Exception as e:
+                self._reply(400, {'error': f'Petición inválida: {e}'})
+                return
+            try:
+                self._reply(200, service.validate(datasets))
+            except Exception as e:
+                self._reply(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            service.logger.debug(format % args)
+
+    service.start()
+    return ThreadingHTTPServer((host, port), ValidationHandler)
+
+
+class ValidationClient:
+    """
+    Cliente del servicio: en proceso (pasando el servicio) o por HTTP
+    (pasando la URL base, ej. 'http://127.0.0.1:8765').
+    """
+
+    def __init__(self, service: Optional[ValidationService] = None, url: Optional[str] = None,
+                 timeout: float = 30.0):
+        if service is None and url is None:
+            raise ValueError("Se requiere un servicio en proceso o una URL")
+        self.service = service
+        self.url = url.rstrip('/') if url else None
+        self.timeout = timeout
+
+    def validate(self, datasets: Dict[str, pd.DataFrame]) -> Dict:
+        """Envía un lote y devuelve el veredicto."""
+        if self.service is not None:
+            return self.service.validate(datasets, timeout=self.timeout)
+
+        payload = {table: json.loads(df.to_json(orient='records', date_format='iso'))
+                   for table, df in datasets.items()}
+        request = urllib.request.Request(
+            f"{self.url}/validate", data=_to_json(payload),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def health(self) -> Dict:
+        """Estado del servicio."""
+        if self.service is not None:
+            return self.service.health()
+        with urllib.request.urlopen(f"{self.url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de validación de calidad de datos")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--max-batch-rows', type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    service = ValidationService(max_wait_ms=args.max_wait_ms, max_batch_rows=args.max_batch_rows)
+    server = create_http_server(service, args.host, args.port)
+    service.logger.info(f"🌐 Escuchando en http://{args.host}:{server.server_port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Bitmaps de Violaciones por Fila
+===============================
+
+Representación compacta de qué filas violan qué reglas: un bit por regla
+y por fila (arrays numpy empaquetados, 1/8 de byte por celda). Permite al
+pipeline de limpieza separar las filas problemáticas con un único filtro
+vectorizado y calcular porcentajes exactos de filas afectadas por
+severidad sin volver a recorrer los datos.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ViolationBitmap:
+    """
+    Bitmap de violaciones de una tabla.
+    """
+
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self.rule_names: List[str] = []
+        self.severities: Dict[str, str] = {}
+        self._packed: List[np.ndarray] = []
+
+    def add(self, rule_name: str, mask: np.ndarray, severity: str):
+        """
+        Añade (o reemplaza) las violaciones de una regla.
+
+        Args:
+            rule_name: Nombre de la regla
+            mask: Máscara booleana de filas que violan la regla
+            severity: Severidad de la regla
+        """
+        self.add_packed(rule_name, np.packbits(np.asarray(mask, dtype=bool)), severity)
+
+    def add_packed(self, rule_name: str, packed: np.ndarray, severity: str):
+        """Añade una máscara ya empaquetada con np.packbits."""
+        if rule_name in self.rule_names:
+            position = self.rule_names.index(rule_name)
+            self._packed[position] = packed
+        else:
+            self.rule_names.append(rule_name)
+            self._packed.append(packed)
+        self.severities[rule_name] = severity
+
+    def packed(self, rule_name: str) -> np.ndarray:
+        return self._packed[self.rule_names.index(rule_name)]
+
+    def mask(self, rule_name: str) -> np.ndarray:
+        """Máscara booleana de filas que violan la regla."""
+        return np.unpackbits(self.packed(rule_name), count=self.n_rows).astype(bool)
+
+    def any_mask(self, severities: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Filas que violan al menos una regla (opcionalmente de ciertas severidades).
+
+        La unión se calcula sobre los bytes empaquetados y solo se
+        desempaqueta el resultado.
+        """
+        severities = set(severities) if severities is not None else None
+        combined = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for rule_name, packed in zip(self.rule_names, self._packed):
+            if severities is None or self.severities[rule_name] in severities:
+                combined |= packed
+        return np.unpackbits(combined, count=self.n_rows).astype(bool)
+
+    def counts(self) -> Dict[str, int]:
+        """Filas que violan cada regla."""
+        return {rule_name: int(np.unpackbits(packed, count=self.n_rows).sum())
+                for rule_name, packed in zip(self.rule_names, self._packed)}
+
+    def row_percentages(self) -> Dict[str, float]:
+        """
+        Porcentaje exacto de filas con al menos una violación por severidad
+        ('TOTAL' = cualquier severidad).
+        """
+        if self.n_rows == 0:
+            return {}
+        percentages = {
+            severity: 100 * self.any_mask([severity]).sum() / self.n_rows
+            for severity in sorted(set(self.severities.values()))
+        }
+        percentages['TOTAL'] = 100 * self.any_mask().sum() / self.n_rows
+        return {severity: float(value) for severity, value in percentages.items()}
+
+    def rule_labels(self, rows: np.ndarray) -> pd.Series:
+        """
+        Nombres de las reglas violadas para las filas indicadas, separados por ';'.
+
+        Args:
+            rows: Máscara booleana o posiciones de las filas
+
+        Returns:
+            pd.Series: Etiqueta por fila seleccionada
+        """
+        positions = np.flatnonzero(rows) if np.asarray(rows).dtype == bool else np.asarray(rows)
+        labels = np.full(len(positions), '', dtype=object)
+        for rule_name in self.rule_names:
+            violated = self.mask(rule_name)[positions]
+            labels[violated] = labels[violated] + rule_name + ';'
+        return pd.Series(labels, dtype=object).str.rstrip(';')
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(packed.nbytes for packed in self._packed))
@@ -70,7 +70,8 @@ class PipelineAutomation:
                             data_dir: str,
                             output_dir: str = "results",
                             environment: str = "development",
-                            models: list = None) -> dict:
+                            models: list = None,
+                            feature_store_dir: str = None) -> dict:
         """
         Ejecuta pipeline de predicción de demanda
         
@@ -79,6 +80,7 @@ class PipelineAutomation:
             output_dir: Directorio de salida
             environment: Ambiente de configuración
             models: Lista de modelos a entrenar
+            feature_store_dir: Feature store compartido (opcional)
             
         Returns:
             Diccionario con resultados
@@ -105,6 +107,8 @@ class PipelineAutomation:
         pipeline.config.MODELS_DIR = str(Path(output_dir) / "models")
         pipeline.config.REPORTS_DIR = str(Path(output_dir) / "reports")
         pipeline.config.LOGS_DIR = str(Path(output_dir) / "logs")
+        if feature_store_dir:
+            pipeline.config.FEATURE_ENGINEERING_CONFIG['feature_store_dir'] = feature_store_dir
         
         # Ejecutar pipeline
         results = pipeline.run_full_pipeline(
@@ -145,6 +149,11 @@ class PipelineAutomation:
         self.logger.info("🧪 Iniciando experimentos en lote")
         
         all_results = []
+        # Las features temporales y de lag se materializan una vez y las reutilizan
+        # los experimentos con la misma definición y los mismos datos (la versión
+        # del feature set incluye la huella de los datos de entrada). Solo se pasa
+        # con lag_unit='days': con lags por fila build_features no usa el store
+        shared_store_dir = str(Path(base_output_dir) / "feature_store")
         
         for exp_name, exp_config in experiments_config.items():
             self.logger.info(f"🔬 Ejecutando experimento: {exp_name}")
@@ -154,11 +163,17 @@ class PipelineAutomation:
                 exp_output_dir = Path(base_output_dir) / exp_name
                 
                 # Ejecutar experimento
+                environment = exp_config.get('environment', 'development')
+                fe_config = get_config(environment).FEATURE_ENGINEERING_CONFIG
+                store_dir = exp_config.get('feature_store_dir', shared_store_dir)
+                if fe_config.get('lag_unit', 'rows') != 'days':
+                    store_dir = None
                 results = self.run_demand_prediction(
                     data_dir=data_dir,
                     output_dir=str(exp_output_dir),
-                    environment=exp_config.get('environment', 'development'),
-                    models=exp_config.get('models', None)
+                    environment=environment,
+                    models=exp_config.get('models', None),
+                    feature_store_dir=store_dir
                 )
                 
                 results['experiment_name'] = exp_name
@@ -0,0 +1,168 @@
+# 📆 Calendar Dimension - Dimensión de Fechas para Features Temporales
+"""
+Dimensión calendario: las features temporales se calculan una sola vez por
+fecha distinta y se llevan a cada fila con el código entero de su fecha.
+
+Unos años de ventas tienen ~1.000 fechas distintas aunque haya decenas de
+millones de filas, así que el coste pasa a ser un ``factorize`` de la
+columna de fecha más un gather por feature. La conversión a datetime
+también se hace solo sobre las fechas distintas.
+
+Opcionalmente añade festivos (paquete ``holidays`` si está instalado, o
+las fechas oficiales de México definidas aquí) y temporadas comerciales
+mexicanas (Buen Fin, Día de las Madres, regreso a clases, Navidad).
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+try:
+    import holidays as holidays_lib
+    HOLIDAYS_AVAILABLE = True
+except ImportError:
+    HOLIDAYS_AVAILABLE = False
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-ésimo día de la semana (0 = lunes) de un mes"""
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def mexico_holidays(years: Iterable[int]) -> Set[date]:
+    """
+    Días de descanso obligatorio en México (Ley Federal del Trabajo, art. 74)
+
+    Args:
+        years: Años a cubrir
+
+    Returns:
+        Conjunto de fechas festivas
+    """
+    if HOLIDAYS_AVAILABLE:
+        return set(holidays_lib.country_holidays('MX', years=list(years)).keys())
+
+    festivos = set()
+    for year in years:
+        festivos.update({
+            date(year, 1, 1),                 # Año Nuevo
+            _nth_weekday(year, 2, 0, 1),      # Día de la Constitución
+            _nth_weekday(year, 3, 0, 3),      # Natalicio de Benito Juárez
+            date(year, 5, 1),                 # Día del Trabajo
+            date(year, 9, 16),                # Día de la Independencia
+            _nth_weekday(year, 11, 0, 3),     # Revolución Mexicana
+            date(year, 12, 25),               # Navidad
+        })
+    return festivos
+
+
+def _buen_fin(year: int) -> List[date]:
+    """El Buen Fin: de viernes a lunes del puente de la Revolución"""
+    lunes = _nth_weekday(year, 11, 0, 3)
+    return [lunes - timedelta(days=offset) for offset in range(3, -1, -1)]
+
+
+# Temporadas comerciales: nombre -> función año -> fechas de la temporada
+RETAIL_SEASONS = {
+    'buen_fin': _buen_fin,
+    'dia_madres': lambda year: [date(year, 5, day) for day in range(1, 11)],
+    'regreso_clases': lambda year: [date(year, 8, 1) + timedelta(days=offset) for offset in range(31)],
+    'navidad': lambda year: [date(year, 12, day) for day in range(1, 25)],
+}
+
+
+class CalendarDimension:
+    """
+    Features temporales calculadas por fecha distinta y unidas por código
+    """
+
+    def __init__(self, holidays: bool = False, seasons: Optional[List[str]] = None):
+        """
+        Inicializa la dimensión
+
+        Args:
+            holidays: Añadir la columna 'es_festivo'
+            seasons: Temporadas de RETAIL_SEASONS a marcar ('temporada_<nombre>')
+        """
+        unknown = set(seasons or []) - set(RETAIL_SEASONS)
+        if unknown:
+            raise ValueError(f"Temporadas desconocidas: {sorted(unknown)}. Usa {list(RETAIL_SEASONS)}")
+        self.holidays = holidays
+        self.seasons = list(seasons or [])
+
+    def build(self, dates: pd.Series) -> pd.DataFrame:
+        """
+        Tabla calendario: una fila por fecha, con las features temporales
+
+        Args:
+            dates: Fechas (datetime64); normalmente las distintas de la tabla
+
+        Returns:
+            DataFrame alineado con ``dates``
+        """
+        dates = pd.Series(pd.to_datetime(dates)).reset_index(drop=True)
+        calendar = pd.DataFrame(index=dates.index)
+
+        # Features básicas de tiempo
+        calendar['año'] = dates.dt.year
+        calendar['mes'] = dates.dt.month
+        calendar['dia'] = dates.dt.day
+        calendar['dia_semana'] = dates.dt.dayofweek
+        calendar['semana_año'] = dates.dt.isocalendar().week
+        calendar['trimestre'] = dates.dt.quarter
+
+        # Features cíclicas
+        calendar['mes_sin'] = np.sin(2 * np.pi * calendar['mes'] / 12)
+        calendar['mes_cos'] = np.cos(2 * np.pi * calendar['mes'] / 12)
+        calendar['dia_sin'] = np.sin(2 * np.pi * calendar['dia'] / 31)
+        calendar['dia_cos'] = np.cos(2 * np.pi * calendar['dia'] / 31)
+
+        # Features de estacionalidad
+        calendar['es_fin_semana'] = calendar['dia_semana'].isin([5, 6]).astype(int)
+        calendar['es_inicio_mes'] = (calendar['dia'] <= 5).astype(int)
+        calendar['es_fin_mes'] = (calendar['dia'] >= 26).astype(int)
+
+        if self.holidays or self.seasons:
+            days = dates.dt.date
+            years = dates.dt.year.dropna().astype(int).unique()
+            if self.holidays:
+                calendar['es_festivo'] = days.isin(mexico_holidays(years)).astype(int)
+            for season in self.seasons:
+                season_days = {day for year in years for day in RETAIL_SEASONS[season](year)}
+                calendar[f'temporada_{season}'] = days.isin(season_days).astype(int)
+
+        return calendar
+
+    def enrich(self, df: pd.DataFrame, date_column: str) -> pd.DataFrame:
+        """
+        Añade las features temporales a ``df`` por código de fecha
+
+        Args:
+            df: DataFrame con la columna de fecha
+            date_column: Nombre de la columna de fecha
+
+        Returns:
+            Copia superficial de ``df`` con la fecha como datetime y las features
+        """
+        # Un código por fecha distinta (los nulos también tienen su código)
+        codes, uniques = pd.factorize(df[date_column], use_na_sentinel=False)
+        dates = pd.Series(pd.to_datetime(pd.Series(uniques)))
+        calendar = self.build(dates)
+
+        enriched = df.copy(deep=False)
+        enriched[date_column] = dates.array.take(codes)
+        for column in calendar.columns:
+            enriched[column] = calendar[column].array.take(codes)
+        return enriched
+
+    def feature_names(self) -> List[str]:
+        """Columnas que añade enrich()"""
+        columns = ['año', 'mes', 'dia', 'dia_semana', 'semana_año', 'trimestre',
+                   'mes_sin', 'mes_cos', 'dia_sin', 'dia_cos',
+                   'es_fin_semana', 'es_inicio_mes', 'es_fin_mes']
+        if self.holidays:
+            columns.append('es_festivo')
+        return columns + [f'temporada_{season}' for season in self.seasons]
@@ -0,0 +1,197 @@
+# 🧩 Categorical Encoding - One-Hot Disperso y Matrices CSR de Features
+"""
+Representaciones compactas de las variables categóricas para los modelos.
+
+- ``one_hot_block`` construye el one-hot de una columna directamente como
+  CSR (un 1 por fila) a partir de sus códigos, sin pasar por un DataFrame
+  denso de dummies.
+- ``hash_block`` aplica el hashing trick a columnas de ids o de muchas
+  categorías: cada valor va a uno de ``n_buckets`` buckets con signo ±1.
+  No hay vocabulario que ajustar ni guardar, la memoria está acotada por
+  el número de buckets y los valores nuevos al predecir no fallan.
+- ``SparseFeatures`` junta las columnas numéricas, los bloques one-hot y
+  los bloques hash en una única matriz CSR, montada de una vez, conservando
+  los nombres de las columnas y el índice de filas para los reportes.
+
+Todos los modelos de ModelTrainer (sklearn, XGBoost y LightGBM) aceptan
+matrices CSR.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Modos de encode_categorical_features
+ENCODING_MODES = ('dense', 'sparse', 'native')
+# Clave fija del hash (16 caracteres): los buckets no cambian entre ejecuciones
+HASH_KEY = 'megamercado_hash'
+
+
+def one_hot_categories(series: pd.Series) -> pd.Index:
+    """
+    Categorías observadas de una columna, en el orden de ``pd.get_dummies``
+
+    Con un dtype categórico (ej. el del diccionario compartido, común a
+    todas las tablas) solo cuentan las categorías presentes en la columna,
+    para no crear dummies constantes a cero.
+
+    Args:
+        series: Columna categórica
+
+    Returns:
+        Índice de categorías (en el orden del dtype si es categórica, si no ordenadas)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.remove_unused_categories().cat.categories
+    uniques = pd.Index(series.dropna().unique())
+    try:
+        return uniques.sort_values()
+    except TypeError:
+        return uniques
+
+
+def one_hot_block(series: pd.Series, categories: Sequence,
+                  dtype=np.float32) -> Tuple[sparse.csr_matrix, List[str]]:
+    """
+    One-hot de una columna como matriz CSR
+
+    Args:
+        series: Columna a codificar
+        categories: Categorías fijadas en entrenamiento (las demás quedan a cero)
+        dtype: Tipo de los valores de la matriz
+
+    Returns:
+        Tupla (matriz CSR n_filas x n_categorías, nombres '<columna>_<categoría>')
+    """
+    codes = pd.Categorical(series, categories=categories).codes
+    present = codes >= 0
+    indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum(present, out=indptr[1:])
+    matrix = sparse.csr_matrix(
+        (np.ones(int(present.sum()), dtype=dtype), codes[present].astype(np.int32), indptr),
+        shape=(len(codes), len(categories))
+    )
+    return matrix, [f'{series.name}_{category}' for category in categories]
+
+
+def _hash_tokens(uniques: pd.Index) -> np.ndarray:
+    """
+    Hash uint64 de cada valor distinto, visto como texto (7, 7.0 y '7' coinciden)
+    """
+    values = uniques.to_numpy()
+    if values.dtype.kind == 'f' and np.all(values == np.floor(values)):
+        values = values.astype(np.int64)
+    tokens = np.asarray(values, dtype=str).astype(object)
+    return pd.util.hash_array(tokens, hash_key=HASH_KEY, categorize=False)
+
+
+def hash_block(series: pd.Series, n_buckets: int, signed: bool = True,
+               dtype=np.float32) -> Tuple[sparse.csr_matrix, List[str]]:
+    """
+    Hashing trick de una columna como matriz CSR (sin vocabulario ajustado)
+
+    Solo se calcula el hash de los valores distintos; las filas los reciben
+    por su código. Los nulos quedan como fila vacía.
+
+    Args:
+        series: Columna a codificar (texto o ids)
+        n_buckets: Número de buckets (columnas del bloque)
+        signed: Signo ±1 según otro bit del hash, para que las colisiones
+            tiendan a cancelarse en lugar de acumularse
+        dtype: Tipo de los valores de la matriz
+
+    Returns:
+        Tupla (matriz CSR n_filas x n_buckets, nombres '<columna>_hash_<i>')
+    """
+    codes, uniques = pd.factorize(series)
+    hashes = _hash_tokens(pd.Index(uniques))
+    buckets = (hashes % np.uint64(n_buckets)).astype(np.int32)
+    signs = np.where(hashes >> np.uint64(63), -1, 1).astype(dtype) if signed else np.ones(len(hashes), dtype=dtype)
+
+    present = codes >= 0
+    indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum(present, out=indptr[1:])
+    matrix = sparse.csr_matrix(
+        (signs[codes[present]], buckets[codes[present]], indptr),
+        shape=(len(codes), n_buckets)
+    )
+    return matrix, [f'{series.name}_hash_{bucket}' for bucket in range(n_buckets)]
+
+
+class SparseFeatures:
+    """
+    Matriz CSR de features con nombres de columnas e índice de filas
+    """
+
+    def __init__(self, matrix: sparse.spmatrix, columns: Sequence[str],
+                 index: Optional[pd.Index] = None):
+        """
+        Args:
+            matrix: Matriz de features (se convierte a CSR)
+            columns: Nombre de cada columna
+            index: Índice de las filas (por defecto 0..n-1)
+        """
+        self.matrix = sparse.csr_matrix(matrix)
+        self.columns = pd.Index(columns)
+        self.index = index if index is not None else pd.RangeIndex(self.matrix.shape[0])
+        if len(self.columns) != self.matrix.shape[1]:
+            raise ValueError(f"{len(self.columns)} nombres para {self.matrix.shape[1]} columnas")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, one_hot: dict, hashed: Optional[dict] = None,
+                   dtype=np.float32) -> 'SparseFeatures':
+        """
+        Columnas numéricas de ``df`` más un bloque one-hot por columna de
+        ``one_hot`` y un bloque hash por columna de ``hashed``
+
+        Args:
+            df: Features (las columnas de texto o fecha no codificadas se descartan)
+            one_hot: Columna -> categorías fijadas en entrenamiento
+            hashed: Columna -> número de buckets
+            dtype: Tipo de los valores de la matriz
+
+        Returns:
+            SparseFeatures con todos los bloques unidos en un solo hstack
+        """
+        hashed = hashed or {}
+        numeric = [column for column in df.select_dtypes(include=[np.number, 'bool']).columns
+                   if column not in one_hot and column not in hashed]
+        blocks = [sparse.csr_matrix(df[numeric].to_numpy(dtype=dtype, na_value=np.nan))]
+        names = list(numeric)
+        for column, categories in one_hot.items():
+            if column in df.columns:
+                block, block_names = one_hot_block(df[column], categories, dtype=dtype)
+                blocks.append(block)
+                names.extend(block_names)
+        for column, n_buckets in hashed.items():
+            if column in df.columns:
+                block, block_names = hash_block(df[column], n_buckets, dtype=dtype)
+                blocks.append(block)
+                names.extend(block_names)
+        return cls(sparse.hstack(blocks, format='csr'), names, df.index)
+
+    def save(self, filepath: str):
+        """Guarda matriz, nombres e índice en un .npz comprimido"""
+        np.savez_compressed(
+            filepath,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape), columns=np.array(self.columns, dtype=str),
+            index=self.index.to_numpy() if self.index.dtype.kind in 'iuf' else np.array(self.index, dtype=str)
+        )
+
+    @classmethod
+    def load(cls, filepath: str) -> 'SparseFeatures':
+        """Carga una matriz guardada con save()"""
+        with np.load(filepath, allow_pickle=False) as data:
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']),
+                                       shape=tuple(data['shape']))
+            return cls(matrix, data['columns'].tolist(), pd.Index(data['index']))
@@ -143,9 +143,36 @@ class MLConfig:
                 'create_temporal_features': True,
                 'create_lag_features': True,
                 'lag_periods': [1, 7, 30],
+                # Unidad de lags y ventanas: 'rows' (ventas anteriores) o 'days' (calendario)
+                'lag_unit': 'rows',
                 'rolling_windows': [7, 30, 90],
                 'create_interaction_features': True,
-                'polynomial_features_degree': 2
+                'polynomial_features_degree': 2,
+                # Claves sustitutas densas (key_registry.py), persistidas entre ejecuciones
+                'surrogate_keys': False,
+                'key_registry_path': os.path.join(self.MODELS_DIR, 'key_registry.pkl'),
+                # Diccionario de textos compartido (dictionary_encoding.py)
+                'shared_dictionary': False,
+                'dictionary_path': os.path.join(self.MODELS_DIR, 'string_dictionary.pkl'),
+                # Claves repetidas en una dimensión al unir: 'warn', 'error' o 'first'
+                'join_fanout': 'warn',
+                # Unión de dimensiones: 'auto' (gather si el id es denso), 'gather' o 'index'
+                'join_mode': 'auto',
+                # Dimensión calendario: festivos de México y temporadas comerciales
+                'calendar_holidays': False,
+                'calendar_seasons': [],
+                # Estado online de lags/ventanas por producto para predicción (lag_unit='days')
+                'feature_state_path': os.path.join(self.MODELS_DIR, 'feature_state.npz'),
+                # Feature store offline (feature_store.py); None = recalcular siempre
+                'feature_store_dir': None,
+                'feature_set': 'ventas',
+                # Categóricas: 'dense' (get_dummies), 'sparse' (one-hot CSR) o 'native' (dtype category)
+                'categorical_encoding': 'dense',
+                'one_hot_max_categories': 10,
+                # Hashing trick (salida dispersa) para ids y columnas de muchas categorías
+                'hash_columns': [],
+                'hash_high_cardinality': False,
+                'hash_buckets': 1024
             }
 
 # 🏭 Configuración específica por ambiente
@@ -0,0 +1,175 @@
+# 📚 Dictionary Encoding - Diccionario Compartido de Textos Repetidos
+"""
+Diccionario de cadenas compartido entre tablas para las dimensiones de texto
+de baja cardinalidad (ubicacion, categoria, genero, ...).
+
+Cada dimensión tiene un único vocabulario ordenado para todas las tablas, y
+sus columnas se convierten a ``pd.CategoricalDtype`` con ese vocabulario al
+cargar. Como todas las tablas comparten el mismo dtype, las columnas siguen
+codificadas tras merge/concat y las comparaciones se hacen sobre códigos
+enteros. El texto solo se recupera al escribir resultados (``decode``).
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Dimensiones compartidas: nombre -> columnas que la contienen en cualquier tabla
+# (tras un merge, las columnas repetidas reciben sufijos como _x/_y)
+SHARED_DIMENSIONS = {
+    'ubicacion': ['ubicacion', 'ubicacion_cliente', 'ubicacion_proveedor'],
+    'region': ['region'],
+    'categoria': ['categoria', 'categoria_producto'],
+    'genero': ['genero']
+}
+
+MERGE_SUFFIXES = ('_x', '_y')
+
+
+class StringDictionary:
+    """
+    Vocabulario compartido por dimensión y codificación categórica de tablas
+    """
+
+    def __init__(self, dimensions: Optional[Dict[str, List[str]]] = None,
+                 logger: logging.Logger = None):
+        """
+        Inicializa el diccionario
+
+        Args:
+            dimensions: Dimensión -> columnas (por defecto SHARED_DIMENSIONS)
+            logger: Logger para reportar la codificación
+        """
+        self.dimensions = dimensions or SHARED_DIMENSIONS
+        self.logger = logger or logging.getLogger(__name__)
+        self.dtypes: Dict[str, pd.CategoricalDtype] = {}
+
+    def dimension_of(self, column: str) -> Optional[str]:
+        """
+        Dimensión a la que pertenece una columna (admite sufijos de merge)
+
+        Args:
+            column: Nombre de la columna
+
+        Returns:
+            Nombre de la dimensión o None
+        """
+        for suffix in MERGE_SUFFIXES:
+            if column.endswith(suffix):
+                column = column[:-len(suffix)]
+                break
+        for dimension, columns in self.dimensions.items():
+            if column in columns:
+                return dimension
+        return None
+
+    def _columns(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Columnas de texto de ``df`` que pertenecen a alguna dimensión"""
+        found = {}
+        for column in df.columns:
+            dimension = self.dimension_of(column)
+            if dimension is not None and (df[column].dtype == object
+                                          or pd.api.types.is_string_dtype(df[column])
+                                          or isinstance(df[column].dtype, pd.CategoricalDtype)):
+                found[column] = dimension
+        return found
+
+    def fit(self, datasets: Dict[str, pd.DataFrame]) -> 'StringDictionary':
+        """
+        Construye (o amplía) el vocabulario de cada dimensión con los valores
+        de todas las tablas. Los valores ya conocidos se conservan.
+
+        Args:
+            datasets: Tablas por nombre
+
+        Returns:
+            El propio diccionario
+        """
+        values: Dict[str, List[np.ndarray]] = {}
+        for df in datasets.values():
+            for column, dimension in self._columns(df).items():
+                series = df[column]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    uniques = series.cat.categories.to_numpy(dtype=object)
+                else:
+                    uniques = series.dropna().astype(str).str.strip().unique()
+                values.setdefault(dimension, []).append(uniques)
+
+        for dimension, parts in values.items():
+            vocabulary = pd.Index(np.concatenate(parts)).unique().sort_values()
+            if dimension in self.dtypes:
+                # Los valores nuevos van al final: los códigos existentes no cambian
+                vocabulary = self.dtypes[dimension].categories.append(vocabulary).unique()
+            self.dtypes[dimension] = pd.CategoricalDtype(vocabulary)
+            self.logger.info(f"📚 {dimension}: {len(vocabulary)} valores en el diccionario compartido")
+
+        return self
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convierte las columnas de las dimensiones conocidas al dtype compartido
+
+        Args:
+            df: DataFrame a codificar
+
+        Returns:
+            DataFrame con columnas categóricas (los valores fuera del
+            diccionario quedan como NaN)
+        """
+        conversions = {}
+        for column, dimension in self._columns(df).items():
+            dtype = self.dtypes.get(dimension)
+            if dtype is None or df[column].dtype == dtype:
+                continue
+            series = df[column]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.where(series.isna(), series.astype(str).str.strip())
+            conversions[column] = series.astype(dtype)
+        return df.assign(**conversions) if conversions else df
+
+    def encode_tables(self, datasets: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Ajusta el diccionario con todas las tablas y las codifica
+
+        Args:
+            datasets: Tablas por nombre
+
+        Returns:
+            Diccionario con las tablas codificadas
+        """
+        self.fit(datasets)
+        return {name: self.encode(df) for name, df in datasets.items()}
+
+    def decode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve el texto original de las columnas codificadas (para salida)
+
+        Args:
+            df: DataFrame codificado
+
+        Returns:
+            DataFrame con las dimensiones como texto
+        """
+        conversions = {column: df[column].astype(object)
+                       for column, dimension in self._columns(df).items()
+                       if dimension in self.dtypes and isinstance(df[column].dtype, pd.CategoricalDtype)}
+        return df.assign(**conversions) if conversions else df
+
+    def save(self, filepath: str):
+        """Guarda los vocabularios para reutilizar los mismos códigos"""
+        joblib.dump({dimension: dtype.categories.to_numpy(dtype=object)
+                     for dimension, dtype in self.dtypes.items()}, filepath)
+        self.logger.info(f"💾 Diccionario compartido guardado en: {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str, dimensions: Optional[Dict[str, List[str]]] = None,
+             logger: logging.Logger = None) -> 'StringDictionary':
+        """Carga un diccionario guardado con save()"""
+        dictionary = cls(dimensions, logger)
+        dictionary.dtypes = {dimension: pd.CategoricalDtype(pd.Index(values))
+                             for dimension, values in joblib.load(filepath).items()}
+        dictionary.logger.info(f"📂 Diccionario compartido cargado desde: {filepath}")
+        return dictionary
@@ -0,0 +1,179 @@
+# 🎯 Dimension Lookup - Uniones por Gather sobre Ids Densos
+"""
+Unión de dimensiones pequeñas con ids enteros densos (1..N, o las claves
+sustitutas 0..N-1 de key_registry.py) sin merge.
+
+Cada columna de la dimensión se guarda como un array numpy indexado por el
+id, con una posición extra al final (centinela) que contiene el valor nulo.
+Enriquecer la tabla de hechos es un ``np.take`` por columna: los ids fuera
+de rango o ausentes apuntan al centinela, no se construye ninguna tabla
+hash y las columnas existentes de la tabla de hechos no se copian.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Ids por fila de la dimensión a partir de los cuales el array sería demasiado disperso
+MAX_SPARSITY = 4
+MIN_ARRAY_SIZE = 1024
+
+
+def integer_keys(values) -> Optional[np.ndarray]:
+    """
+    Convierte una columna de ids a int64; los nulos y no enteros pasan a -1.
+
+    Args:
+        values: Series o array de ids
+
+    Returns:
+        np.ndarray int64, o None si la columna no es numérica
+    """
+    values = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.astype(np.int64, copy=False)
+    if values.dtype.kind != 'f':
+        return None
+    valid = np.isfinite(values) & (values == np.floor(values))
+    return np.where(valid, values, -1).astype(np.int64)
+
+
+class DimensionLookup:
+    """
+    Dimensión indexada por id entero denso para uniones por gather
+    """
+
+    def __init__(self, dimension: pd.DataFrame, key: str,
+                 columns: Optional[List[str]] = None):
+        """
+        Construye los arrays de la dimensión
+
+        Args:
+            dimension: Tabla de dimensión (clave única)
+            key: Columna con el id entero
+            columns: Columnas a exponer (por defecto todas salvo la clave)
+
+        Raises:
+            ValueError: Si los ids no son enteros únicos, no negativos y densos
+        """
+        keys = integer_keys(dimension[key])
+        if keys is None:
+            raise ValueError(f"{key}: los ids deben ser numéricos")
+        valid = keys >= 0
+        if not self.is_dense(keys[valid], len(dimension)):
+            raise ValueError(f"{key}: ids demasiado dispersos para un lookup por array")
+        if pd.Index(keys[valid]).has_duplicates:
+            raise ValueError(f"{key}: ids repetidos")
+
+        self.key = key
+        self.columns = columns or [column for column in dimension.columns if column != key]
+        # Último índice válido; la posición size es el centinela
+        self.size = int(keys[valid].max()) + 1 if valid.any() else 0
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, pd.CategoricalDtype] = {}
+
+        rows = keys[valid]
+        for column in self.columns:
+            series = dimension[column][valid]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Se guardan los códigos: el resultado sigue siendo categórico
+                self.categories[column] = series.dtype
+                values = series.cat.codes.to_numpy()
+            else:
+                values = series.to_numpy()
+            array = np.full(self.size + 1, self._null_value(values.dtype, column in self.categories),
+                            dtype=values.dtype)
+            array[rows] = values
+            self.arrays[column] = array
+
+        # Ids del rango que existen en la dimensión (el centinela y los huecos no)
+        self.present = np.zeros(self.size + 1, dtype=bool)
+        self.present[rows] = True
+
+    @staticmethod
+    def is_dense(keys: np.ndarray, n_rows: int) -> bool:
+        """Si un array indexado por id compensa frente a una tabla hash"""
+        if len(keys) == 0:
+            return False
+        return keys.min() >= 0 and keys.max() < max(MAX_SPARSITY * n_rows, MIN_ARRAY_SIZE)
+
+    @staticmethod
+    def _null_value(dtype: np.dtype, codes: bool = False):
+        """Valor del centinela para un dtype"""
+        if codes:
+            return -1
+        if dtype.kind in 'Mm':
+            return dtype.type('NaT')
+        if dtype.kind in 'fO':
+            return np.nan
+        # Enteros y booleanos no tienen nulo: se resuelve en gather()
+        return 0
+
+    def positions(self, fact_keys) -> np.ndarray:
+        """
+        Posición en los arrays de cada id de la tabla de hechos
+
+        Args:
+            fact_keys: Ids de la tabla de hechos
+
+        Returns:
+            np.ndarray int64 (el centinela para ids nulos, fuera de rango o huecos)
+        """
+        positions = integer_keys(fact_keys)
+        if positions is None:
+            raise ValueError(f"{self.key}: los ids de la tabla de hechos deben ser numéricos")
+        out_of_range = (positions < 0) | (positions >= self.size)
+        positions = np.where(out_of_range, self.size, positions)
+        return positions
+
+    def gather(self, fact_keys, columns: Optional[List[str]] = None) -> Dict[str, object]:
+        """
+        Valores de la dimensión para cada fila de la tabla de hechos
+
+        Args:
+            fact_keys: Ids de la tabla de hechos
+            columns: Columnas a traer (por defecto todas)
+
+        Returns:
+            Columna -> array (o Categorical) alineado con ``fact_keys``
+        """
+        positions = self.positions(fact_keys)
+        missing = ~self.present[positions]
+        gathered = {}
+        for column in columns or self.columns:
+            values = np.take(self.arrays[column], positions)
+            if column in self.categories:
+                values = pd.Categorical.from_codes(values, dtype=self.categories[column])
+            elif values.dtype.kind == 'b' and missing.any():
+                # Como merge: booleanos con faltantes pasan a object con NaN
+                values = values.astype(object)
+                values[missing] = np.nan
+            elif values.dtype.kind in 'iu' and missing.any():
+                # Como merge: enteros con faltantes pasan a float con NaN
+                values = values.astype(np.float64)
+                values[missing] = np.nan
+            gathered[column] = values
+        return gathered
+
+    def enrich(self, fact: pd.DataFrame, fact_key: Optional[str] = None,
+               columns: Optional[List[str]] = None,
+               rename: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Añade columnas de la dimensión a la tabla de hechos sin merge
+
+        Args:
+            fact: Tabla de hechos
+            fact_key: Columna con el id en la tabla de hechos (por defecto la clave)
+            columns: Columnas a añadir (por defecto todas)
+            rename: Nombre de salida de columnas concretas
+
+        Returns:
+            Copia superficial de ``fact`` (comparte sus columnas) con las nuevas columnas
+        """
+        gathered = self.gather(fact[fact_key or self.key], columns)
+        rename = rename or {}
+        enriched = fact.copy(deep=False)
+        for column, values in gathered.items():
+            enriched[rename.get(column, column)] = values
+        return enriched
@@ -16,6 +16,14 @@ from datetime import datetime
 pipeline_dir = Path(__file__).parent
 sys.path.append(str(pipeline_dir))
 
+# Lectura unificada de ficheros (data-cleaning-project/src/utils/file_handlers.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'data-cleaning-project' / 'src' / 'utils'))
+try:
+    from file_handlers import read_table
+    FILE_HANDLERS_AVAILABLE = True
+except ImportError:
+    FILE_HANDLERS_AVAILABLE = False
+
 def verificar_datos():
     """Verifica que los archivos de datos existan"""
     print("🔍 Verificando archivos de datos...")
@@ -50,7 +58,7 @@ def cargar_y_explorar_datos(archivos):
     
     for nombre, ruta in archivos.items():
         try:
-            df = pd.read_csv(ruta)
+            df = read_table(ruta) if FILE_HANDLERS_AVAILABLE else pd.read_csv(ruta)
             datos[nombre] = df
             print(f"📈 {nombre}: {df.shape[0]} filas, {df.shape[1]} columnas")
             
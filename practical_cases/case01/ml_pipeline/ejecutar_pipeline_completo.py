@@ -15,6 +15,18 @@ from datetime import datetime
 pipeline_dir = Path(__file__).parent
 sys.path.append(str(pipeline_dir))
 
+# Lectura unificada de ficheros (data-cleaning-project/src/utils/file_handlers.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'data-cleaning-project' / 'src' / 'utils'))
+try:
+    from file_handlers import read_table
+    FILE_HANDLERS_AVAILABLE = True
+except ImportError:
+    FILE_HANDLERS_AVAILABLE = False
+
+def cargar_tabla(ruta):
+    """Carga una tabla con el lector unificado si está disponible"""
+    return read_table(ruta) if FILE_HANDLERS_AVAILABLE else pd.read_csv(ruta)
+
 def ejecutar_pipeline_completo():
     """Ejecuta el pipeline completo de ML"""
     print("=== PIPELINE ML MEGAMERCADO ===")
@@ -43,12 +55,12 @@ def ejecutar_pipeline_completo():
         print("\nCargando datos...")
         
         # Cargar ventas (principal)
-        df_ventas = pd.read_csv(archivos_validos['ventas'])
+        df_ventas = cargar_tabla(archivos_validos['ventas'])
         print(f"Ventas cargadas: {df_ventas.shape[0]} filas, {df_ventas.shape[1]} columnas")
         
         # Fusionar con productos
         if 'productos' in archivos_validos:
-            df_productos = pd.read_csv(archivos_validos['productos'])
+            df_productos = cargar_tabla(archivos_validos['productos'])
             df_main = df_ventas.merge(df_productos, on='producto_id', how='left')
             print(f"Fusionado con productos: {df_main.shape}")
         else:
@@ -56,7 +68,7 @@ def ejecutar_pipeline_completo():
         
         # Fusionar con clientes
         if 'clientes' in archivos_validos:
-            df_clientes = pd.read_csv(archivos_validos['clientes'])
+            df_clientes = cargar_tabla(archivos_validos['clientes'])
             df_main = df_main.merge(df_clientes, on='cliente_id', how='left')
             print(f"Fusionado con clientes: {df_main.shape}")
         
@@ -0,0 +1,277 @@
+# 🔁 Feature State - Estado Online de Lags y Ventanas para Predicción
+"""
+Estado incremental por producto para calcular las features de lag y de
+ventanas móviles al predecir, sin recorrer toda la historia.
+
+Por producto se guarda:
+- un buffer circular con los totales de los últimos ``max(lags, windows)``
+  días (float32, una fila por producto),
+- la suma y la suma de cuadrados de cada ventana, actualizadas al avanzar
+  cada día (se suma el día nuevo y se resta el que sale),
+- el día de la primera venta, para recortar las ventanas igual que en
+  entrenamiento.
+
+La semántica es la de ``lag_unit='days'`` (lag_kernels.calendar_lag_features):
+los días sin ventas cuentan como 0. ``features()`` devuelve las features
+del día siguiente al último actualizado: ``lag_1`` es el total de ese día
+y las ventanas terminan en él. Actualizar un día cuesta O(productos) y
+consultar es un acceso por fila.
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class OnlineFeatureState:
+    """
+    Buffers circulares y sumas móviles por producto
+    """
+
+    def __init__(self, lags: List[int], windows: List[int], prefix: str = 'cantidad_vendida',
+                 logger: logging.Logger = None):
+        """
+        Inicializa un estado vacío
+
+        Args:
+            lags: Lags en días (ej. lag_periods de la configuración)
+            windows: Ventanas en días (ej. rolling_windows)
+            prefix: Prefijo de los nombres de las features (la columna objetivo)
+            logger: Logger del pipeline
+        """
+        self.lags = list(lags)
+        self.windows = list(windows)
+        self.prefix = prefix
+        self.logger = logger or logging.getLogger(__name__)
+        self.length = max(self.lags + self.windows)
+
+        self.product_index = pd.Index([])
+        self.buffer = np.zeros((0, self.length), dtype=np.float32)
+        self.sums = np.zeros((0, len(self.windows)), dtype=np.float64)
+        self.squares = np.zeros((0, len(self.windows)), dtype=np.float64)
+        self.first_day = np.zeros(0, dtype=np.int64)
+        self.current_day: Optional[pd.Timestamp] = None
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def _day_number(self, day) -> int:
+        return int(np.datetime64(pd.Timestamp(day).normalize(), 'D').astype(np.int64))
+
+    def _slots(self, product_ids, day_number: int) -> np.ndarray:
+        """Filas de los productos, dando de alta los nuevos"""
+        product_ids = pd.Index(product_ids)
+        new = product_ids.difference(self.product_index)
+        if len(new):
+            n_new = len(new)
+            self.product_index = self.product_index.append(new) if len(self.product_index) else new
+            self.buffer = np.vstack([self.buffer, np.zeros((n_new, self.length), dtype=np.float32)])
+            self.sums = np.vstack([self.sums, np.zeros((n_new, len(self.windows)))])
+            self.squares = np.vstack([self.squares, np.zeros((n_new, len(self.windows)))])
+            self.first_day = np.append(self.first_day, np.full(n_new, day_number, dtype=np.int64))
+        return self.product_index.get_indexer(product_ids)
+
+    def _advance(self, values: np.ndarray, day_number: int):
+        """Añade un día (totales de todos los productos) al buffer y a las ventanas"""
+        column = day_number % self.length
+        for position, window in enumerate(self.windows):
+            leaving = self.buffer[:, (day_number - window) % self.length].astype(np.float64)
+            # El día que sale solo cuenta si era posterior a la primera venta
+            leaving = np.where(day_number - window >= self.first_day, leaving, 0.0)
+            self.sums[:, position] += values - leaving
+            self.squares[:, position] += values * values - leaving * leaving
+        self.buffer[:, column] = values
+
+    def update(self, day, product_ids, quantities) -> 'OnlineFeatureState':
+        """
+        Incorpora las ventas de un día. Los días intermedios sin datos se
+        avanzan con ventas 0.
+
+        Args:
+            day: Fecha de las ventas (posterior al último día actualizado)
+            product_ids: Producto de cada venta
+            quantities: Cantidad de cada venta
+
+        Returns:
+            El propio estado
+        """
+        day_number = self._day_number(day)
+        if self.current_day is not None:
+            last = self._day_number(self.current_day)
+            if day_number <= last:
+                raise ValueError(f"El día {pd.Timestamp(day).date()} ya está incorporado "
+                                 f"(último: {self.current_day.date()})")
+            if day_number - last >= self.length:
+                # El hueco vacía el buffer entero: todas las ventanas quedan a 0
+                self.buffer[:] = 0
+                self.sums[:] = 0
+                self.squares[:] = 0
+            else:
+                # Días sin ventas entre el último y este: ceros
+                for gap_day in range(last + 1, day_number):
+                    self._advance(np.zeros(len(self.product_index)), gap_day)
+
+        quantities = np.nan_to_num(np.asarray(quantities, dtype=np.float64))
+        slots = self._slots(product_ids, day_number)
+        values = np.bincount(slots, weights=quantities, minlength=len(self.product_index))
+        self._advance(values, day_number)
+        self.current_day = pd.Timestamp(day).normalize()
+        return self
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, product_column: str, date_column: str,
+                     value_column: str, lags: List[int], windows: List[int],
+                     logger: logging.Logger = None) -> 'OnlineFeatureState':
+        """
+        Construye el estado a partir de la historia en una sola pasada
+
+        Args:
+            df: Ventas históricas
+            product_column: Columna de producto
+            date_column: Columna de fecha
+            value_column: Cantidad vendida
+            lags: Lags en días
+            windows: Ventanas en días
+            logger: Logger del pipeline
+
+        Returns:
+            Estado al último día de la historia
+        """
+        state = cls(lags, windows, prefix=value_column, logger=logger)
+        dates = pd.to_datetime(df[date_column]).to_numpy(dtype='datetime64[D]')
+        valid = ~np.isnat(dates) & df[product_column].notna().to_numpy()
+        days = dates[valid].astype(np.int64)
+        codes, products = pd.factorize(df[product_column][valid])
+        values = np.nan_to_num(df[value_column].to_numpy(dtype=np.float64, na_value=np.nan)[valid])
+
+        last_day = int(days.max())
+        state.product_index = pd.Index(products)
+        state.first_day = np.full(len(products), last_day, dtype=np.int64)
+        np.minimum.at(state.first_day, codes, days)
+
+        # Solo los últimos ``length`` días entran en el buffer
+        recent = days > last_day - state.length
+        buffer = np.zeros((len(products), state.length), dtype=np.float64)
+        np.add.at(buffer, (codes[recent], days[recent] % state.length), values[recent])
+        state.buffer = buffer.astype(np.float32)
+
+        state.sums = np.zeros((len(products), len(windows)))
+        state.squares = np.zeros((len(products), len(windows)))
+        for position, window in enumerate(windows):
+            for day_number in range(last_day - window + 1, last_day + 1):
+                column = buffer[:, day_number % state.length]
+                state.sums[:, position] += column
+                state.squares[:, position] += column * column
+
+        state.current_day = pd.Timestamp(np.datetime64(last_day, 'D'))
+        return state
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def features(self, product_ids) -> pd.DataFrame:
+        """
+        Features del día siguiente al último actualizado
+
+        Args:
+            product_ids: Productos a consultar
+
+        Returns:
+            DataFrame float32 indexado por producto (NaN para productos sin historia)
+        """
+        product_ids = pd.Index(product_ids)
+        slots = self.product_index.get_indexer(product_ids)
+        known = slots >= 0
+        rows = np.where(known, slots, 0)
+        today = self._day_number(self.current_day) if self.current_day is not None else 0
+        first = self.first_day[rows] if len(self.first_day) else np.zeros(len(rows), dtype=np.int64)
+
+        result = {}
+        for lag in self.lags:
+            day_number = today + 1 - lag
+            values = self.buffer[rows, day_number % self.length] if len(self.buffer) else np.zeros(len(rows))
+            values = np.where(day_number >= first, values, np.nan)
+            result[f'{self.prefix}_lag_{lag}'] = np.where(known, values, np.nan)
+
+        for position, window in enumerate(self.windows):
+            n_days = np.minimum(window, today - first + 1).astype(np.float64)
+            total = self.sums[rows, position] if len(self.sums) else np.zeros(len(rows))
+            squares = self.squares[rows, position] if len(self.squares) else np.zeros(len(rows))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = total / n_days
+                variance = (squares - total * total / n_days) / (n_days - 1)
+                std = np.where(n_days > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+            result[f'{self.prefix}_rolling_mean_{window}'] = np.where(known, mean, np.nan)
+            result[f'{self.prefix}_rolling_std_{window}'] = np.where(known, std, np.nan)
+
+        return pd.DataFrame(result, index=product_ids).astype(np.float32)
+
+    def lookup(self, product_id) -> Optional[np.ndarray]:
+        """
+        Features de un solo producto sin construir un DataFrame (orden de feature_names)
+
+        Args:
+            product_id: Producto a consultar
+
+        Returns:
+            np.ndarray float32, o None si el producto no tiene historia
+        """
+        if product_id not in self.product_index:
+            return None
+        row = self.product_index.get_loc(product_id)
+        today = self._day_number(self.current_day)
+        first = self.first_day[row]
+        buffer = self.buffer[row]
+        values = [buffer[(today + 1 - lag) % self.length] if today + 1 - lag >= first else np.nan
+                  for lag in self.lags]
+        for position, window in enumerate(self.windows):
+            n_days = min(window, today - first + 1)
+            total = self.sums[row, position]
+            values.append(total / n_days)
+            if n_days > 1:
+                variance = (self.squares[row, position] - total * total / n_days) / (n_days - 1)
+                values.append(np.sqrt(max(variance, 0.0)))
+            else:
+                values.append(np.nan)
+        return np.array(values, dtype=np.float32)
+
+    def feature_names(self) -> List[str]:
+        """Nombres de las columnas que devuelve features()"""
+        return ([f'{self.prefix}_lag_{lag}' for lag in self.lags]
+                + [f'{self.prefix}_rolling_{stat}_{window}' for window in self.windows
+                   for stat in ('mean', 'std')])
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def save(self, filepath: str):
+        """Guarda el estado en un .npz comprimido"""
+        np.savez_compressed(
+            filepath,
+            lags=np.array(self.lags), windows=np.array(self.windows), prefix=np.array(self.prefix),
+            products=self.product_index.to_numpy(dtype=object).astype(str)
+            if self.product_index.dtype == object else self.product_index.to_numpy(),
+            buffer=self.buffer, sums=self.sums, squares=self.squares, first_day=self.first_day,
+            current_day=np.array(str(self.current_day.date()) if self.current_day is not None else '')
+        )
+        self.logger.info(f"💾 Estado de features guardado en: {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str, logger: logging.Logger = None) -> 'OnlineFeatureState':
+        """Carga un estado guardado con save()"""
+        with np.load(filepath, allow_pickle=False) as data:
+            state = cls(data['lags'].tolist(), data['windows'].tolist(), str(data['prefix']), logger)
+            state.product_index = pd.Index(data['products'])
+            state.buffer = data['buffer']
+            state.sums = data['sums']
+            state.squares = data['squares']
+            state.first_day = data['first_day']
+            current_day = str(data['current_day'])
+            state.current_day = pd.Timestamp(current_day) if current_day else None
+        state.logger.info(f"📂 Estado de features cargado desde: {filepath}")
+        return state
@@ -0,0 +1,336 @@
+# 🗄️ Feature Store - Features Materializadas en Parquet con Consultas Point-in-Time
+"""
+Feature store offline en disco local para no recalcular las features
+temporales y de lag en cada experimento.
+
+Estructura:
+
+    <raíz>/<feature_set>/<versión>/_metadata.json
+    <raíz>/<feature_set>/<versión>/particion_fecha=AAAA-MM-DD/part-0.parquet
+
+- Las filas se identifican por (id_producto, id_cliente, fecha).
+- La versión es un hash de la definición del feature set (lags, ventanas,
+  unidad, calendario...) y de la huella de los datos de entrada
+  (``data_fingerprint``): cambiar la configuración o los datos crea otra
+  versión en lugar de mezclar features incompatibles o calculadas con otra
+  historia.
+- Hay una partición por día: reescribir un día sustituye solo su partición.
+- ``join`` une las features por clave y día exactos (features de una fila
+  ya materializadas); ``point_in_time_join`` une a cada fila la última
+  versión de sus features con fecha <= la de la fila, para features de
+  entidad que cambian con el tiempo, sin ver nunca features posteriores.
+- Una fila por (claves, día): las features por fila (lags en filas, varias
+  ventas de la misma clave el mismo día) no caben en el store.
+
+Necesita ``pyarrow``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Claves de entidad de las filas (además de la fecha)
+ENTITY_KEYS = ['id_producto', 'id_cliente']
+# Columna de partición (día) en disco
+PARTITION_COLUMN = 'particion_fecha'
+METADATA_FILE = '_metadata.json'
+
+
+def feature_set_version(definition: Dict) -> str:
+    """
+    Versión de un feature set: hash estable de su definición
+
+    Args:
+        definition: Parámetros que determinan las features
+
+    Returns:
+        Identificador corto ('v' + 10 caracteres hexadecimales)
+    """
+    payload = json.dumps(definition, sort_keys=True, default=str)
+    return 'v' + hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+
+
+def data_fingerprint(df: pd.DataFrame, columns: List[str]) -> str:
+    """
+    Huella de los datos de los que dependen unas features (independiente
+    del orden de las filas)
+
+    Args:
+        df: Datos de entrada
+        columns: Columnas que determinan las features (claves, fecha, objetivo)
+
+    Returns:
+        16 caracteres hexadecimales
+    """
+    columns = [column for column in dict.fromkeys(columns) if column in df.columns]
+    hashes = np.sort(pd.util.hash_pandas_object(df[columns], index=False).to_numpy())
+    digest = hashlib.sha1(json.dumps(columns).encode('utf-8'))
+    digest.update(hashes.tobytes())
+    return digest.hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    Feature store offline particionado por día
+    """
+
+    def __init__(self, root: str, logger: logging.Logger = None):
+        """
+        Inicializa el feature store
+
+        Args:
+            root: Directorio raíz
+            logger: Logger del pipeline
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("El feature store necesita pyarrow: pip install pyarrow")
+        self.root = root
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _path(self, feature_set: str, version: str) -> str:
+        return os.path.join(self.root, feature_set, version)
+
+    def versions(self, feature_set: str) -> List[str]:
+        """Versiones materializadas de un feature set"""
+        directory = os.path.join(self.root, feature_set)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory)
+                      if os.path.exists(os.path.join(directory, name, METADATA_FILE)))
+
+    def metadata(self, feature_set: str, version: str) -> Optional[Dict]:
+        """Metadatos de una versión (None si no existe)"""
+        path = os.path.join(self._path(feature_set, version), METADATA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def materialized_days(self, feature_set: str, version: str) -> pd.DatetimeIndex:
+        """Días con partición escrita"""
+        directory = self._path(feature_set, version)
+        prefix = f'{PARTITION_COLUMN}='
+        if not os.path.isdir(directory):
+            return pd.DatetimeIndex([])
+        days = [name[len(prefix):] for name in os.listdir(directory) if name.startswith(prefix)]
+        return pd.DatetimeIndex(pd.to_datetime(days)).sort_values()
+
+    def write(self, feature_set: str, version: str, features: pd.DataFrame,
+              date_column: str, keys: Optional[List[str]] = None,
+              definition: Optional[Dict] = None) -> int:
+        """
+        Materializa features; los días presentes en ``features`` se reescriben
+
+        Args:
+            feature_set: Nombre del feature set
+            version: Versión (ver feature_set_version)
+            features: Claves, fecha y columnas de features
+            date_column: Columna de fecha
+            keys: Claves de entidad (por defecto ENTITY_KEYS presentes)
+            definition: Definición del feature set, guardada en los metadatos
+
+        Returns:
+            Filas escritas
+        """
+        keys = [key for key in (keys or ENTITY_KEYS) if key in features.columns]
+        dates = pd.to_datetime(features[date_column])
+        valid = dates.notna().to_numpy()
+        table = features.loc[valid].copy()
+        table[date_column] = dates[valid].dt.normalize()
+
+        # Una fila por (claves, día): las features por día son iguales en las
+        # filas repetidas; si no lo son (features por fila) se conserva la última
+        duplicated = table.duplicated(keys + [date_column], keep='last')
+        if duplicated.any():
+            self.logger.warning(f"⚠️ {feature_set}: {int(duplicated.sum())} filas con clave repetida, "
+                                f"se conserva la última")
+            table = table.loc[~duplicated.to_numpy()]
+        table[PARTITION_COLUMN] = table[date_column].dt.strftime('%Y-%m-%d')
+
+        directory = self._path(feature_set, version)
+        os.makedirs(directory, exist_ok=True)
+        pa_dataset.write_dataset(
+            pa.Table.from_pandas(table, preserve_index=False),
+            directory,
+            format='parquet',
+            partitioning=pa_dataset.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]),
+                                                 flavor='hive'),
+            basename_template='part-{i}.parquet',
+            existing_data_behavior='delete_matching'
+        )
+
+        metadata = self.metadata(feature_set, version) or {
+            'feature_set': feature_set,
+            'version': version,
+            'created_at': datetime.now().isoformat()
+        }
+        metadata.update({
+            'keys': keys,
+            'date_column': date_column,
+            'features': [column for column in table.columns
+                         if column not in keys + [date_column, PARTITION_COLUMN]],
+            'definition': definition if definition is not None else metadata.get('definition'),
+            'updated_at': datetime.now().isoformat()
+        })
+        with open(os.path.join(directory, METADATA_FILE), 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, indent=2, default=str)
+
+        self.logger.info(f"🗄️ {feature_set}/{version}: {len(table):,} filas en "
+                         f"{table[PARTITION_COLUMN].nunique()} días materializados")
+        return len(table)
+
+    def read(self, feature_set: str, version: str, start=None, end=None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Lee features de un rango de días (solo se abren esas particiones)
+
+        Args:
+            feature_set: Nombre del feature set
+            version: Versión
+            start: Primer día incluido (opcional)
+            end: Último día incluido (opcional)
+            columns: Features a leer (por defecto todas); claves y fecha siempre
+
+        Returns:
+            DataFrame con claves, fecha y features
+        """
+        metadata = self.metadata(feature_set, version)
+        if metadata is None:
+            raise FileNotFoundError(f"No existe el feature set {feature_set}/{version} en {self.root}")
+        keys, date_column = metadata['keys'], metadata['date_column']
+        selected = keys + [date_column] + [column for column in (columns or metadata['features'])
+                                            if column not in keys and column != date_column]
+
+        dataset = pa_dataset.dataset(self._path(feature_set, version), format='parquet',
+                                     partitioning='hive', exclude_invalid_files=True)
+        condition = None
+        partition = pa_dataset.field(PARTITION_COLUMN)
+        # Las fechas AAAA-MM-DD se ordenan igual como texto
+        if start is not None:
+            condition = partition >= pd.Timestamp(start).strftime('%Y-%m-%d')
+        if end is not None:
+            upper = partition <= pd.Timestamp(end).strftime('%Y-%m-%d')
+            condition = upper if condition is None else condition & upper
+        return dataset.to_table(columns=selected, filter=condition).to_pandas()
+
+    def join(self, entity_df: pd.DataFrame, feature_set: str, version: str,
+             date_column: str, keys: Optional[List[str]] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Une a cada fila las features de su misma clave y día (sin as-of:
+        una clave o día que falta en el store nunca recibe features de otra fecha)
+
+        Args:
+            entity_df: Filas (claves + fecha) a enriquecer
+            feature_set: Nombre del feature set
+            version: Versión
+            date_column: Columna de fecha de ``entity_df``
+            keys: Claves de entidad (por defecto las de la versión)
+            columns: Features a unir (por defecto todas)
+
+        Returns:
+            ``entity_df`` en su orden original con las features añadidas
+
+        Raises:
+            LookupError: Si alguna fila con fecha no tiene features en el store
+        """
+        metadata = self.metadata(feature_set, version)
+        if metadata is None:
+            raise FileNotFoundError(f"No existe el feature set {feature_set}/{version} en {self.root}")
+        keys = keys or [key for key in metadata['keys'] if key in entity_df.columns]
+
+        event_day = pd.to_datetime(entity_df[date_column]).dt.normalize().astype('datetime64[ns]')
+        features = self.read(feature_set, version, start=event_day.min(), end=event_day.max(), columns=columns)
+        features = features.rename(columns={metadata['date_column']: '_dia_feature'})
+        feature_columns = [column for column in features.columns
+                           if column not in keys and column != '_dia_feature']
+        for key in keys:
+            features[key] = features[key].astype(entity_df[key].dtype)
+        features['_dia_feature'] = pd.to_datetime(features['_dia_feature']).astype('datetime64[ns]')
+
+        # Las features del store sustituyen a columnas homónimas de entity_df
+        left = entity_df.drop(columns=[column for column in feature_columns if column in entity_df.columns])
+        left = left.assign(_dia_feature=event_day.to_numpy())
+        joined = left.merge(features, on=keys + ['_dia_feature'], how='left',
+                            validate='many_to_one', indicator='_origen')
+
+        missing = int(((joined['_origen'] == 'left_only') & joined['_dia_feature'].notna()).sum())
+        if missing:
+            raise LookupError(f"{missing:,} filas sin features en {feature_set}/{version}")
+
+        joined = joined.drop(columns=['_dia_feature', '_origen'])
+        joined.index = entity_df.index
+        return joined
+
+    def point_in_time_join(self, entity_df: pd.DataFrame, feature_set: str, version: str,
+                           date_column: str, keys: Optional[List[str]] = None,
+                           columns: Optional[List[str]] = None,
+                           allow_exact_matches: bool = True,
+                           tolerance: Optional[pd.Timedelta] = None) -> pd.DataFrame:
+        """
+        Une a cada fila las features más recientes con fecha <= su fecha
+
+        Args:
+            entity_df: Filas (claves + fecha del evento) a enriquecer
+            feature_set: Nombre del feature set
+            version: Versión
+            date_column: Columna de fecha de ``entity_df``
+            keys: Claves de entidad (por defecto las de la versión)
+            columns: Features a unir (por defecto todas)
+            allow_exact_matches: Usar features del mismo día del evento; con False
+                solo se usan días estrictamente anteriores
+            tolerance: Antigüedad máxima de las features (opcional)
+
+        Returns:
+            ``entity_df`` en su orden original con las features añadidas
+            (NaN donde no hay features anteriores)
+        """
+        metadata = self.metadata(feature_set, version)
+        if metadata is None:
+            raise FileNotFoundError(f"No existe el feature set {feature_set}/{version} en {self.root}")
+        keys = keys or [key for key in metadata['keys'] if key in entity_df.columns]
+
+        event_time = pd.to_datetime(entity_df[date_column])
+        features = self.read(feature_set, version, end=event_time.max(), columns=columns)
+        stored_date = metadata['date_column']
+        features = features.rename(columns={stored_date: '_fecha_feature'})
+        feature_columns = [column for column in features.columns
+                           if column not in keys and column != '_fecha_feature']
+        features = features[keys + ['_fecha_feature'] + feature_columns]
+        for key in keys:
+            features[key] = features[key].astype(entity_df[key].dtype)
+        features = features.sort_values('_fecha_feature', kind='stable')
+
+        # Las features del store sustituyen a columnas homónimas de entity_df
+        left = entity_df.drop(columns=[column for column in feature_columns if column in entity_df.columns])
+        left = left.assign(**{date_column: event_time, '_fila': np.arange(len(left))})
+        valid = left[date_column].notna().to_numpy()
+        joined = pd.merge_asof(
+            left.loc[valid].sort_values(date_column, kind='stable'),
+            features,
+            left_on=date_column,
+            right_on='_fecha_feature',
+            by=keys or None,
+            direction='backward',
+            allow_exact_matches=allow_exact_matches,
+            tolerance=tolerance
+        )
+        if not valid.all():
+            joined = pd.concat([joined, left.loc[~valid]], ignore_index=True)
+
+        joined = joined.sort_values('_fila').drop(columns=['_fila', '_fecha_feature'])
+        joined.index = entity_df.index
+        return joined
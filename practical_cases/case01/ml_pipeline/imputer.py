@@ -0,0 +1,191 @@
+# 🩹 Imputer - Imputación de Faltantes con Estadísticas Persistidas
+"""
+Imputador con fit/transform para que entrenamiento y predicción rellenen
+los faltantes con los mismos valores.
+
+- Numéricas: mediana (todas las columnas en una sola llamada a ``median``).
+- Categóricas y texto: moda, con un ``value_counts`` por columna.
+- ``partial_fit`` acumula chunks para datos que no caben en memoria: los
+  conteos de las categóricas son exactos y la mediana se aproxima con una
+  muestra uniforme acotada por columna (cuantil aproximado).
+- ``transform`` rellena todas las columnas con un único ``fillna``.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Valor de relleno de una categórica sin ningún valor observado
+UNKNOWN_VALUE = 'Unknown'
+
+
+def _mode(counts: pd.Series):
+    """Valor más frecuente de un conteo; en empate el menor, como ``Series.mode``"""
+    counts = counts[counts > 0]
+    if not len(counts):
+        return UNKNOWN_VALUE
+    top = counts.index[counts.to_numpy() == counts.max()]
+    try:
+        return top.sort_values()[0]
+    except TypeError:
+        return top[0]
+
+
+class MissingValueImputer:
+    """
+    Imputador mediana/moda con estadísticas ajustadas una vez
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 sample_size: int = 100_000, random_state: Optional[int] = 42,
+                 logger: logging.Logger = None):
+        """
+        Inicializa el imputador
+
+        Args:
+            columns: Columnas a imputar (por defecto todas las vistas en fit)
+            exclude: Columnas que nunca se imputan (ej. la fecha o el objetivo)
+            sample_size: Valores por columna numérica que guarda partial_fit
+                para aproximar la mediana
+            random_state: Semilla del muestreo
+            logger: Logger del preprocesador
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.exclude = set(exclude or [])
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.fill_values: Dict[str, object] = {}
+        self._rng = np.random.default_rng(random_state)
+        self._samples: Dict[str, tuple] = {}           # columna -> (valores, claves aleatorias)
+        self._counts: Dict[str, pd.Series] = {}        # columna -> conteo de categorías
+        self._rows_seen = 0
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.fill_values)
+
+    def _split_columns(self, df: pd.DataFrame):
+        """Columnas numéricas y categóricas a imputar"""
+        columns = [column for column in (self.columns or df.columns)
+                   if column in df.columns and column not in self.exclude]
+        numeric = [column for column in columns
+                   if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+        numeric_set = set(numeric)
+        categorical = [column for column in columns if column not in numeric_set]
+        return numeric, categorical
+
+    def fit(self, df: pd.DataFrame) -> 'MissingValueImputer':
+        """
+        Calcula medianas y modas de un DataFrame completo
+
+        Args:
+            df: Datos de entrenamiento
+
+        Returns:
+            El propio imputador
+        """
+        numeric, categorical = self._split_columns(df)
+        fill_values = {}
+
+        if numeric:
+            fill_values.update(df[numeric].median().dropna().to_dict())
+
+        for column in categorical:
+            fill_values[column] = _mode(df[column].value_counts(sort=False))
+
+        self.fill_values = fill_values
+        self._rows_seen = len(df)
+        return self
+
+    def partial_fit(self, chunk: pd.DataFrame) -> 'MissingValueImputer':
+        """
+        Acumula un chunk; las estadísticas se recalculan al final de cada llamada
+
+        Args:
+            chunk: Chunk de datos
+
+        Returns:
+            El propio imputador
+        """
+        numeric, categorical = self._split_columns(chunk)
+        self._rows_seen += len(chunk)
+
+        for column in numeric:
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            keys = self._rng.random(len(values))
+            if column in self._samples:
+                previous_values, previous_keys = self._samples[column]
+                values = np.concatenate([previous_values, values])
+                keys = np.concatenate([previous_keys, keys])
+            # Muestra uniforme acotada: los valores con las claves aleatorias más pequeñas
+            if len(values) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+                values, keys = values[keep], keys[keep]
+            self._samples[column] = (values, keys)
+
+        for column in categorical:
+            counts = chunk[column].value_counts(sort=False)
+            if column in self._counts:
+                counts = self._counts[column].add(counts, fill_value=0)
+            self._counts[column] = counts
+
+        for column, (values, _) in self._samples.items():
+            if len(values):
+                self.fill_values[column] = float(np.median(values))
+        for column, counts in self._counts.items():
+            self.fill_values[column] = _mode(counts)
+        return self
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Rellena los faltantes de todas las columnas a la vez
+
+        Args:
+            df: DataFrame a imputar
+            inplace: Modificar ``df`` en lugar de devolver una copia
+
+        Returns:
+            DataFrame imputado
+        """
+        if not self.is_fitted:
+            raise ValueError("El imputador no está ajustado: llama a fit() o partial_fit() primero")
+
+        target = df if inplace else df.copy()
+        missing = target.columns[target.isna().any().to_numpy()]
+        fill_values = {column: self.fill_values[column] for column in missing if column in self.fill_values}
+
+        # Las categóricas solo admiten valores de sus categorías
+        for column, value in fill_values.items():
+            dtype = target[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype) and value not in dtype.categories:
+                target[column] = target[column].cat.add_categories([value])
+
+        if fill_values:
+            target.fillna(value=fill_values, inplace=True)
+        return target
+
+    def fit_transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """Ajusta y transforma el mismo DataFrame"""
+        return self.fit(df).transform(df, inplace=inplace)
+
+    def get_state(self) -> Dict:
+        """Estado serializable (para save_preprocessor)"""
+        return {
+            'columns': self.columns,
+            'exclude': sorted(self.exclude),
+            'fill_values': self.fill_values,
+            'rows_seen': self._rows_seen
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict, logger: logging.Logger = None) -> 'MissingValueImputer':
+        """Reconstruye un imputador guardado con get_state()"""
+        imputer = cls(columns=state['columns'], exclude=state['exclude'], logger=logger)
+        imputer.fill_values = dict(state['fill_values'])
+        imputer._rows_seen = state['rows_seen']
+        return imputer
@@ -0,0 +1,295 @@
+# 🧭 Join Planner - Planificación de Uniones por Coste
+"""
+Planificador de las uniones de merge_datasets.
+
+Antes de unir nada:
+- Proyecta cada dimensión a sus claves y a las columnas que se van a usar.
+- Mide cada unión: filas, bytes que añade por fila, fracción de filas de
+  ventas con pareja (selectividad) y multiplicidad de la clave (fan-out).
+- Ordena las uniones: primero las de clave única con menos bytes añadidos y
+  al final las que multiplican filas, respetando que algunas claves (ej.
+  id_proveedor) solo existen después de unir otra tabla.
+
+Las dimensiones con id entero denso se unen por gather sobre arrays
+(dimension_lookup.py), el resto de las de clave única por índice
+(``DataFrame.join`` sobre la clave indexada); las uniones muchos-a-muchos se detectan antes de
+ejecutarlas y se avisan, fallan o se deduplican según ``fanout_policy``.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from dimension_lookup import DimensionLookup
+
+FANOUT_POLICIES = ('warn', 'error', 'first')
+JOIN_MODES = ('auto', 'gather', 'index')
+
+
+class JoinFanoutError(ValueError):
+    """Una unión multiplicaría las filas de la tabla principal"""
+
+
+class JoinPlanner:
+    """
+    Planifica y ejecuta las uniones izquierdas de una tabla de hechos con
+    sus dimensiones
+    """
+
+    def __init__(self, merge_keys: Dict[str, List[str]], fanout_policy: str = 'warn',
+                 join_mode: str = 'auto', logger: logging.Logger = None):
+        """
+        Inicializa el planificador
+
+        Args:
+            merge_keys: Tabla -> claves con las que se une a la tabla principal
+            fanout_policy: Qué hacer si una clave está repetida en la dimensión:
+                'warn' (unir y avisar), 'error' (JoinFanoutError) o 'first'
+                (quedarse con la primera fila de cada clave)
+            join_mode: 'auto' (gather si el id es entero y denso, índice si no),
+                'gather' (igual, avisando cuando no se puede) o 'index'
+            logger: Logger del preprocesador
+        """
+        if fanout_policy not in FANOUT_POLICIES:
+            raise ValueError(f"fanout_policy debe ser uno de {FANOUT_POLICIES}")
+        if join_mode not in JOIN_MODES:
+            raise ValueError(f"join_mode debe ser uno de {JOIN_MODES}")
+        self.join_mode = join_mode
+        self.merge_keys = merge_keys
+        self.fanout_policy = fanout_policy
+        self.logger = logger or logging.getLogger(__name__)
+        self.last_plan: List[Dict] = []
+
+    @staticmethod
+    def _key_index(df: pd.DataFrame, keys: List[str]) -> pd.Index:
+        """Índice con las claves de unión de cada fila"""
+        if len(keys) == 1:
+            return pd.Index(df[keys[0]])
+        return pd.MultiIndex.from_frame(df[keys])
+
+    def project(self, name: str, df: pd.DataFrame,
+                columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reduce una dimensión a las claves de unión (propias o de otras
+        tablas, ej. id_proveedor en productos) y a las columnas necesarias
+
+        Args:
+            name: Nombre de la tabla
+            df: Dimensión
+            columns: Columnas necesarias (None = todas)
+
+        Returns:
+            DataFrame proyectado (sin copiar datos si no hay proyección)
+        """
+        if columns is None:
+            return df
+        keys = {key for table_keys in self.merge_keys.values() for key in table_keys}
+        keep = [column for column in df.columns if column in keys or column in columns]
+        return df[keep] if len(keep) < df.shape[1] else df
+
+    def _measure(self, name: str, fact: pd.DataFrame, dimension: pd.DataFrame) -> Dict:
+        """Estadísticas de una unión posible"""
+        keys = self.merge_keys[name]
+        key_counts = dimension.groupby(keys, sort=False, observed=True).size()
+        duplicated = int((key_counts > 1).sum())
+        value_columns = [column for column in dimension.columns if column not in keys]
+        bytes_per_row = (dimension[value_columns].memory_usage(index=False).sum() / max(len(dimension), 1)
+                         if value_columns else 0.0)
+
+        step = {
+            'table': name,
+            'keys': keys,
+            'rows': len(dimension),
+            'bytes_per_row': float(bytes_per_row),
+            'duplicated_keys': duplicated,
+            'selectivity': None,
+            'output_rows': None
+        }
+
+        if all(key in fact.columns for key in keys):
+            # Conteo exacto: filas de salida = suma de la multiplicidad de cada clave
+            matches = key_counts.reindex(self._key_index(fact, keys))
+            step['selectivity'] = float(matches.notna().mean()) if len(fact) else 0.0
+            step['output_rows'] = int(matches.fillna(1).sum())
+        elif duplicated:
+            # La clave aparece tras otra unión: estimación por multiplicidad media
+            step['output_rows'] = int(len(fact) * len(dimension) / max(len(key_counts), 1))
+        else:
+            step['output_rows'] = len(fact)
+        step['fanout'] = step['output_rows'] > len(fact) or (duplicated > 0 and step['selectivity'] is None)
+        return step
+
+    def plan(self, fact: pd.DataFrame, dimensions: Dict[str, pd.DataFrame]) -> List[Dict]:
+        """
+        Orden de las uniones
+
+        Args:
+            fact: Tabla principal (ventas)
+            dimensions: Dimensiones ya proyectadas
+
+        Returns:
+            Lista de pasos con sus estadísticas, en orden de ejecución
+        """
+        available = set(fact.columns)
+        pending = dict(dimensions)
+        plan = []
+
+        while pending:
+            candidates = [self._measure(name, fact, df) for name, df in pending.items()
+                          if all(key in available for key in self.merge_keys[name])]
+            if not candidates:
+                for name in pending:
+                    self.logger.warning(f"⚠️ {name}: claves {self.merge_keys[name]} no disponibles, no se une")
+                break
+
+            # Primero las que no multiplican filas, luego las más estrechas
+            step = min(candidates, key=lambda s: (s['fanout'], s['output_rows'], s['bytes_per_row']))
+            plan.append(step)
+            available.update(pending.pop(step['table']).columns)
+
+        self.last_plan = plan
+        return plan
+
+    def _output_names(self, fact: pd.DataFrame, dimensions: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, str]]:
+        """
+        Nombres finales de las columnas repetidas entre tablas.
+
+        Reproduce los sufijos _x/_y que daría la cadena de merges en el orden
+        de ``merge_keys``, para que el resultado no dependa del orden elegido
+        por el plan.
+
+        Returns:
+            Tabla ('' = principal) -> renombrado de columnas
+        """
+        owners = {column: ('', column) for column in fact.columns}
+        for name in self.merge_keys:
+            if name not in dimensions:
+                continue
+            keys = self.merge_keys[name]
+            for column in dimensions[name].columns:
+                if column in keys and column in owners:
+                    continue
+                if column in owners:
+                    owner, original = owners.pop(column)
+                    owners[f'{column}_x'] = (owner, original)
+                    owners[f'{column}_y'] = (name, column)
+                else:
+                    owners[column] = (name, column)
+
+        renames: Dict[str, Dict[str, str]] = {}
+        for final, (owner, original) in owners.items():
+            if final != original:
+                renames.setdefault(owner, {})[original] = final
+        return renames
+
+    def _lookup(self, name: str, keys: List[str], dimension: pd.DataFrame,
+                fact: pd.DataFrame) -> Optional[DimensionLookup]:
+        """DimensionLookup de la dimensión si admite unión por gather"""
+        if self.join_mode == 'index':
+            return None
+        reason = None
+        if len(keys) != 1:
+            reason = 'clave compuesta'
+        elif fact[keys[0]].dtype.kind not in 'iuf':
+            reason = 'id no numérico en la tabla principal'
+        else:
+            try:
+                return DimensionLookup(dimension, keys[0])
+            except ValueError as e:
+                reason = str(e)
+        if self.join_mode == 'gather':
+            self.logger.warning(f"⚠️ {name}: sin unión por gather ({reason}), se usa el índice")
+        return None
+
+    def _check_fanout(self, step: Dict, dimension: pd.DataFrame) -> pd.DataFrame:
+        """Aplica fanout_policy a una unión muchos-a-muchos"""
+        message = (f"{step['table']}: {step['duplicated_keys']} claves repetidas en {step['keys']}, "
+                   f"la unión pasaría a ~{step['output_rows']} filas")
+        if self.fanout_policy == 'error':
+            raise JoinFanoutError(message)
+        if self.fanout_policy == 'first':
+            self.logger.warning(f"⚠️ {message}; se usa la primera fila de cada clave")
+            return dimension.drop_duplicates(step['keys'], keep='first')
+        self.logger.warning(f"⚠️ {message}")
+        return dimension
+
+    def execute(self, fact: pd.DataFrame, dimensions: Dict[str, pd.DataFrame],
+                columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Proyecta, planifica y ejecuta las uniones izquierdas
+
+        Args:
+            fact: Tabla principal (ventas)
+            dimensions: Tabla -> DataFrame a unir
+            columns: Columnas necesarias del resultado (None = todas)
+
+        Returns:
+            DataFrame unificado
+        """
+        projected = {name: self.project(name, df, columns)
+                     for name, df in dimensions.items() if name in self.merge_keys}
+        if columns is not None:
+            keys = {key for name in projected for key in self.merge_keys[name]}
+            fact = fact[[column for column in fact.columns if column in columns or column in keys]]
+
+        plan = self.plan(fact, projected)
+
+        # Uniones necesarias: las que aportan columnas pedidas o claves para otra necesaria
+        needed = {step['table'] for step in plan}
+        if columns is not None:
+            wanted = set(columns)
+            for step in reversed(plan):
+                if wanted & (set(projected[step['table']].columns) - set(step['keys'])):
+                    wanted.update(step['keys'])
+                else:
+                    needed.discard(step['table'])
+
+        # Fan-out: se resuelve antes de ejecutar ninguna unión
+        for step in plan:
+            if step['duplicated_keys'] and step['table'] in needed:
+                projected[step['table']] = self._check_fanout(step, projected[step['table']])
+
+        # Columnas repetidas: se renombran antes de unir, como lo haría merge
+        renames = self._output_names(fact, projected)
+        for name, rename in renames.items():
+            if name:
+                projected[name] = projected[name].rename(columns=rename)
+
+        result = fact.rename(columns=renames['']) if '' in renames else fact
+        joined = set()
+        for step in plan:
+            name, keys = step['table'], step['keys']
+            dimension = projected[name]
+            if name not in needed:
+                self.logger.info(f"  {name}: no aporta columnas necesarias, no se une")
+                continue
+
+            joined.add(name)
+            selectivity = '-' if step['selectivity'] is None else f"{step['selectivity']:.1%}"
+            self.logger.info(f"  {name}: {step['rows']} filas, selectividad {selectivity}, "
+                             f"{step['bytes_per_row']:.0f} bytes/fila")
+
+            if step['duplicated_keys'] and dimension[keys].duplicated().any():
+                # Muchos-a-muchos (política 'warn'): merge ordinario
+                result = result.merge(dimension, on=keys, how='left')
+            else:
+                lookup = self._lookup(name, keys, dimension, result)
+                step['method'] = 'gather' if lookup is not None else 'index'
+                if lookup is not None:
+                    # Id denso: np.take por columna, sin copiar las columnas existentes
+                    result = lookup.enrich(result)
+                else:
+                    # Clave única: unión por índice, sin ordenar ni re-hashear la tabla principal
+                    result = result.join(dimension.set_index(keys), on=keys, how='left')
+
+        # Columnas en el orden de la cadena de merges de merge_keys, como _output_names
+        order = list(result.columns[:fact.shape[1]])
+        for name in self.merge_keys:
+            if name in joined:
+                order.extend(column for column in projected[name].columns if column not in order)
+        order.extend(column for column in result.columns if column not in order)
+        if order != list(result.columns):
+            result = result[order]
+
+        return result
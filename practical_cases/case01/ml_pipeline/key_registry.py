@@ -0,0 +1,244 @@
+# 🔑 Key Registry - Claves Sustitutas Densas para Entidades
+"""
+Registro global de claves sustitutas: cada clave natural de una entidad
+(cliente, producto, proveedor, venta) se asigna una sola vez a un entero
+denso int32 (0..N-1), el mismo en todas las tablas y entre ejecuciones.
+
+Con claves densas las uniones se resuelven indexando arrays, la integridad
+referencial es una comprobación de rango más una máscara, y los groupby
+trabajan sobre códigos enteros en lugar de volver a hashear los ids.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Entidades: tabla padre (donde se registran las claves) y nombres de la
+# columna de clave en cualquier tabla
+ENTITY_KEYS = {
+    'cliente': {'parent': 'clientes', 'columns': ['id_cliente', 'cliente_id']},
+    'producto': {'parent': 'productos', 'columns': ['id_producto', 'producto_id']},
+    'proveedor': {'parent': 'proveedores', 'columns': ['id_proveedor', 'proveedor_id']},
+    'venta': {'parent': 'ventas', 'columns': ['id_venta', 'venta_id']}
+}
+
+# Código de las claves nulas o no registradas
+MISSING_CODE = -1
+
+# Textos que representan una clave nula (ej. NaN escrito como texto)
+NULL_TOKENS = ['', 'nan', 'NaN', 'None', 'null', 'NULL']
+
+
+def normalize_keys(values) -> pd.Index:
+    """
+    Normaliza claves naturales para que 1, 1.0 y '1.0' sean la misma clave.
+
+    Args:
+        values: Array o Series de claves
+
+    Returns:
+        pd.Index con enteros si todas las claves son numéricas enteras, o
+        con texto sin espacios en otro caso
+    """
+    series = pd.Series(values, copy=False)
+    if series.dtype == object or pd.api.types.is_string_dtype(series):
+        series = series.where(~series.isin(NULL_TOKENS))
+        try:
+            # astype(float) parsea como float() de Python: '0.1' == 0.1 exacto
+            series = series.astype(np.float64)
+        except (TypeError, ValueError):
+            return pd.Index(series.where(series.isna(), series.astype(str).str.strip()))
+
+    if pd.api.types.is_float_dtype(series):
+        valid = series.dropna()
+        if (valid == np.floor(valid)).all():
+            return pd.Index(series.astype('Int64'))
+    return pd.Index(series)
+
+
+class KeyRegistry:
+    """
+    Diccionario global clave natural -> clave sustituta int32 por entidad
+    """
+
+    def __init__(self, logger: logging.Logger = None):
+        """
+        Inicializa un registro vacío
+
+        Args:
+            logger: Logger para reportar claves huérfanas
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self._keys: Dict[str, pd.Index] = {}
+
+    def size(self, entity: str) -> int:
+        """Número de claves registradas de una entidad"""
+        return len(self._keys.get(entity, ()))
+
+    def register(self, entity: str, values) -> np.ndarray:
+        """
+        Registra las claves nuevas de una entidad y devuelve sus códigos.
+        Las claves ya registradas conservan su código.
+
+        Args:
+            entity: Nombre de la entidad
+            values: Claves naturales (normalmente de la tabla padre)
+
+        Returns:
+            np.ndarray int32 con el código de cada valor
+        """
+        keys = normalize_keys(values)
+        known = self._keys.get(entity)
+        if known is None:
+            known = pd.Index(keys.dropna().unique()[:0])
+
+        new = keys.dropna().unique()
+        new = new[known.get_indexer(new) < 0] if len(known) else new
+        if len(new):
+            # Los nuevos códigos se añaden al final: los existentes no cambian
+            self._keys[entity] = known.append(pd.Index(new))
+        else:
+            self._keys[entity] = known
+
+        return self.encode(entity, keys)
+
+    def encode(self, entity: str, values) -> np.ndarray:
+        """
+        Códigos de claves existentes (MISSING_CODE si no están registradas)
+
+        Args:
+            entity: Nombre de la entidad
+            values: Claves naturales
+
+        Returns:
+            np.ndarray int32
+        """
+        keys = values if isinstance(values, pd.Index) else normalize_keys(values)
+        known = self._keys.get(entity)
+        if known is None or len(known) == 0:
+            return np.full(len(keys), MISSING_CODE, dtype=np.int32)
+        return known.get_indexer(keys).astype(np.int32)
+
+    def decode(self, entity: str, codes) -> np.ndarray:
+        """
+        Claves naturales de unos códigos (None para MISSING_CODE)
+
+        Args:
+            entity: Nombre de la entidad
+            codes: Códigos sustitutos
+
+        Returns:
+            np.ndarray de claves naturales
+        """
+        codes = np.asarray(codes)
+        keys = self._keys[entity].to_numpy(dtype=object)
+        decoded = np.empty(len(codes), dtype=object)
+        valid = codes >= 0
+        decoded[valid] = keys[codes[valid]]
+        return decoded
+
+    def presence_mask(self, entity: str, codes) -> np.ndarray:
+        """
+        Máscara por código de las claves presentes en ``codes`` (ej. las de
+        la tabla padre de esta ejecución)
+
+        Args:
+            entity: Nombre de la entidad
+            codes: Códigos presentes
+
+        Returns:
+            np.ndarray bool de longitud size(entity)
+        """
+        codes = np.asarray(codes)
+        mask = np.zeros(self.size(entity), dtype=bool)
+        mask[codes[codes >= 0]] = True
+        return mask
+
+    def orphan_mask(self, entity: str, child_codes, parent_codes=None) -> np.ndarray:
+        """
+        Filas hijas cuya clave no existe en el padre: comprobación de rango
+        y, si se indican los códigos del padre actual, consulta a su máscara
+
+        Args:
+            entity: Nombre de la entidad
+            child_codes: Códigos de la tabla hija
+            parent_codes: Códigos de la tabla padre (None = todo el registro)
+
+        Returns:
+            np.ndarray bool alineado con ``child_codes``
+        """
+        child_codes = np.asarray(child_codes)
+        orphans = (child_codes < 0) | (child_codes >= self.size(entity))
+        if parent_codes is not None:
+            present = self.presence_mask(entity, parent_codes)
+            orphans |= ~present[np.where(orphans, 0, child_codes)]
+        return orphans
+
+    def encode_tables(self, datasets: Dict[str, pd.DataFrame],
+                      entities: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Sustituye las columnas de clave de todas las tablas por sus códigos.
+
+        Las claves se registran desde la tabla padre de cada entidad y las
+        tablas hijas solo se codifican (las claves huérfanas quedan con
+        MISSING_CODE).
+
+        Args:
+            datasets: Tablas por nombre
+            entities: Entidades a codificar (por defecto todas las de ENTITY_KEYS)
+
+        Returns:
+            Diccionario con las tablas codificadas (copias superficiales)
+        """
+        encoded = dict(datasets)
+        for entity in entities or list(ENTITY_KEYS):
+            parent = ENTITY_KEYS[entity]['parent']
+            columns = ENTITY_KEYS[entity]['columns']
+
+            if parent in encoded:
+                parent_column = next((column for column in columns if column in encoded[parent].columns), None)
+                if parent_column is not None:
+                    encoded[parent] = encoded[parent].assign(
+                        **{parent_column: self.register(entity, encoded[parent][parent_column])}
+                    )
+
+            for name, df in encoded.items():
+                if name == parent:
+                    continue
+                for column in columns:
+                    if column in df.columns:
+                        keys = normalize_keys(df[column])
+                        codes = self.encode(entity, keys)
+                        orphans = int(((codes < 0) & keys.notna()).sum())
+                        if orphans:
+                            self.logger.warning(f"⚠️ {name}.{column}: {orphans} claves sin {entity} registrado")
+                        df = df.assign(**{column: codes})
+                encoded[name] = df
+
+        return encoded
+
+    def get_state(self) -> Dict:
+        """Estado serializable (para save() y save_preprocessor)"""
+        return {entity: keys.to_numpy(dtype=object) for entity, keys in self._keys.items()}
+
+    @classmethod
+    def from_state(cls, state: Dict, logger: logging.Logger = None) -> 'KeyRegistry':
+        """Reconstruye un registro guardado con get_state()"""
+        registry = cls(logger)
+        registry._keys = {entity: normalize_keys(keys) for entity, keys in state.items()}
+        return registry
+
+    def save(self, filepath: str):
+        """Guarda el registro para reutilizar los mismos códigos en otra ejecución"""
+        joblib.dump(self.get_state(), filepath)
+        self.logger.info(f"💾 Registro de claves guardado en: {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str, logger: logging.Logger = None) -> 'KeyRegistry':
+        """Carga un registro guardado con save()"""
+        registry = cls.from_state(joblib.load(filepath), logger)
+        registry.logger.info(f"📂 Registro de claves cargado desde: {filepath}")
+        return registry
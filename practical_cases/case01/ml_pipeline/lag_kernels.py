@@ -0,0 +1,315 @@
+# ⚡ Lag Kernels - Lags y Ventanas Móviles por Grupo en una Pasada
+"""
+Kernel vectorizado para las features de lag y ventanas móviles por grupo.
+
+En lugar de un ``groupby().shift`` por lag y un ``groupby().rolling`` por
+ventana y estadístico, se ordena una sola vez por (grupo, orden) y se
+trabaja sobre segmentos contiguos de cada grupo:
+
+- lag k: el valor k posiciones antes, si sigue en el mismo grupo.
+- media/desviación móvil: diferencias de sumas acumuladas (valores, valores
+  al cuadrado y conteo de no nulos) entre el inicio de la ventana, recortado
+  al inicio del grupo, y la fila actual. Equivale a
+  ``rolling(window, min_periods=1)`` con ddof=1 para la desviación.
+
+Los valores se centran restando el primer valor de cada grupo, de modo que
+con cantidades enteras las sumas son exactas y una ventana constante da
+desviación 0. El resultado son arrays float32 alineados con las filas de
+entrada, sin reindexar.
+
+``calendar_lag_features`` mide lags y ventanas en días de calendario en vez
+de filas: agrega las ventas por (grupo, día) y trata los días sin ventas
+como 0 desde la primera venta de cada grupo, sin construir el panel denso
+(solo se guardan los días con ventas). Sus ventanas terminan el día
+anterior al de la fila, así que el objetivo del día nunca entra en sus
+propias features y coinciden con las que sirve ``OnlineFeatureState``. ``build_calendar_panel`` materializa
+ese panel (grupo x día, float32) cuando hace falta explícitamente.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Versión de la semántica de los kernels (forma parte de la versión del
+# feature set: cambiarla invalida las features ya materializadas)
+KERNEL_VERSION = 2
+
+
+def group_segments(group_codes: np.ndarray, order: np.ndarray):
+    """
+    Posición de cada fila (ordenada) dentro de su grupo
+
+    Args:
+        group_codes: Código de grupo por fila (-1 = sin grupo)
+        order: Permutación que ordena las filas por (grupo, orden)
+
+    Returns:
+        Tupla (códigos ordenados, índice de inicio del grupo de cada fila ordenada)
+    """
+    codes = group_codes[order]
+    n_rows = len(codes)
+    is_start = np.ones(n_rows, dtype=bool)
+    if n_rows > 1:
+        is_start[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(is_start)
+    start_of_row = np.repeat(starts, np.diff(np.append(starts, n_rows)))
+    return codes, start_of_row
+
+
+def grouped_lag_features(values, group_codes: Optional[np.ndarray] = None,
+                         sort_key=None, lags: List[int] = (), windows: List[int] = (),
+                         prefix: str = 'valor') -> Dict[str, np.ndarray]:
+    """
+    Lags y medias/desviaciones móviles por grupo en una sola ordenación
+
+    Args:
+        values: Valores (Series o array numérico)
+        group_codes: Código entero de grupo por fila (None = un único grupo;
+            -1 = fila sin grupo, sus features quedan NaN)
+        sort_key: Orden dentro del grupo (ej. fecha); None = orden de las filas
+        lags: Desplazamientos a calcular
+        windows: Tamaños de ventana para media y desviación
+        prefix: Prefijo de los nombres de columna
+
+    Returns:
+        Nombre -> array float32 alineado con las filas de entrada
+        ({prefix}_lag_{k}, {prefix}_rolling_mean_{w}, {prefix}_rolling_std_{w})
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n_rows = len(x)
+    if group_codes is None:
+        group_codes = np.zeros(n_rows, dtype=np.int64)
+    group_codes = np.asarray(group_codes)
+
+    # Una sola ordenación estable por (grupo, orden)
+    if sort_key is None:
+        order = np.argsort(group_codes, kind='stable')
+    else:
+        order = np.lexsort((np.asarray(sort_key), group_codes))
+    codes, start = group_segments(group_codes, order)
+    xs = x[order]
+    position = np.arange(n_rows) - start
+    no_group = codes < 0
+
+    features = {}
+    for lag in lags:
+        shifted = np.full(n_rows, np.nan)
+        valid = (position >= lag) & ~no_group
+        shifted[valid] = xs[np.flatnonzero(valid) - lag]
+        features[f'{prefix}_lag_{lag}'] = shifted
+
+    if windows:
+        observed = ~np.isnan(xs)
+        # Centrado por grupo: primer valor observado del segmento
+        first = xs[start]
+        offsets = np.where(np.isnan(first), 0.0, first)
+        centered = np.where(observed, xs - offsets, 0.0)
+
+        zero = np.zeros(1)
+        sum_cs = np.concatenate([zero, np.cumsum(centered)])
+        sq_cs = np.concatenate([zero, np.cumsum(centered * centered)])
+        count_cs = np.concatenate([zero, np.cumsum(observed)])
+        end = np.arange(1, n_rows + 1)
+
+        for window in windows:
+            begin = np.maximum(end - window, start)
+            count = count_cs[end] - count_cs[begin]
+            total = sum_cs[end] - sum_cs[begin]
+            squares = sq_cs[end] - sq_cs[begin]
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count > 0, total / count, np.nan) + offsets
+                variance = (squares - total * total / count) / (count - 1)
+                std = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+            mean[no_group] = np.nan
+            std[no_group] = np.nan
+            features[f'{prefix}_rolling_mean_{window}'] = mean
+            features[f'{prefix}_rolling_std_{window}'] = std
+
+    # Vuelta al orden de entrada, en float32
+    aligned = {}
+    for name, column in features.items():
+        out = np.empty(n_rows, dtype=np.float32)
+        out[order] = column
+        aligned[name] = out
+    return aligned
+
+
+def group_codes_of(df: pd.DataFrame, group_cols: Optional[List[str]]) -> Optional[np.ndarray]:
+    """
+    Códigos enteros de grupo para ``grouped_lag_features``
+
+    Args:
+        df: DataFrame
+        group_cols: Columnas de agrupación (None = un único grupo)
+
+    Returns:
+        np.ndarray con -1 en filas con alguna clave nula, o None
+    """
+    if not group_cols:
+        return None
+    # ngroup devuelve NaN en las filas con clave nula
+    codes = df.groupby(group_cols, sort=False, observed=True).ngroup()
+    return codes.fillna(-1).to_numpy(dtype=np.int64)
+
+
+class _DailySeries:
+    """
+    Totales diarios por grupo en formato disperso: solo los días con datos,
+    ordenados por (grupo, día), con sumas acumuladas para consultas de rango
+    """
+
+    def __init__(self, values: np.ndarray, group_codes: np.ndarray, days: np.ndarray):
+        self.span = int(days.max()) + 1
+        keys = group_codes * self.span + days
+        self.keys, self.inverse = np.unique(keys, return_inverse=True)
+        self.daily = np.bincount(self.inverse, weights=np.nan_to_num(values), minlength=len(self.keys))
+
+        self.groups = self.keys // self.span
+        self.days = self.keys % self.span
+        n_groups = int(self.groups.max()) + 1 if len(self.groups) else 0
+        # Primera posición y primer día de cada grupo
+        self.group_start = np.searchsorted(self.groups, np.arange(n_groups), side='left')
+        self.group_end = np.searchsorted(self.groups, np.arange(n_groups), side='right')
+        self.first_day = self.days[np.minimum(self.group_start, len(self.days) - 1)]
+
+        zero = np.zeros(1)
+        self.sum_cs = np.concatenate([zero, np.cumsum(self.daily)])
+        self.sq_cs = np.concatenate([zero, np.cumsum(self.daily * self.daily)])
+
+    def prefix(self, groups: np.ndarray, last_day: np.ndarray, cumulative: np.ndarray) -> np.ndarray:
+        """Suma de ``cumulative`` del grupo hasta ``last_day`` incluido"""
+        start = self.group_start[groups]
+        position = np.searchsorted(self.keys, groups * self.span + last_day, side='right')
+        position = np.clip(position, start, self.group_end[groups])
+        return cumulative[position] - cumulative[start]
+
+    def value_at(self, groups: np.ndarray, day: np.ndarray) -> np.ndarray:
+        """Total del día (0 si no hubo ventas, NaN antes de la primera venta)"""
+        target = groups * self.span + day
+        position = np.minimum(np.searchsorted(self.keys, target, side='left'), len(self.keys) - 1)
+        found = self.keys[position] == target
+        values = np.where(found, self.daily[position], 0.0)
+        return np.where(day >= self.first_day[groups], values, np.nan)
+
+
+def _day_numbers(dates) -> np.ndarray:
+    """Días desde la primera fecha (-1 para fechas nulas)"""
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(dates)
+    days = np.full(len(dates), -1, dtype=np.int64)
+    if valid.any():
+        numbers = dates[valid].astype(np.int64)
+        days[valid] = numbers - numbers.min()
+    return days
+
+
+def calendar_lag_features(values, dates, group_codes: Optional[np.ndarray] = None,
+                          lags: List[int] = (), windows: List[int] = (),
+                          prefix: str = 'valor') -> Dict[str, np.ndarray]:
+    """
+    Lags y ventanas móviles en días de calendario, con los días sin ventas a 0
+
+    Cada fila recibe las features de su (grupo, día): ``lag_k`` es el total
+    del grupo k días antes (0 si ese día no hubo ventas, NaN si es anterior a
+    su primera venta) y las ventanas abarcan los ``w`` días anteriores al de
+    la fila (de D-w a D-1), recortadas a la primera venta del grupo. El día
+    de la primera venta no tiene historia: sus ventanas son NaN.
+
+    Args:
+        values: Cantidades por fila (los nulos cuentan como 0)
+        dates: Fecha de cada fila
+        group_codes: Código entero de grupo (None = un único grupo; -1 = sin grupo)
+        lags: Desplazamientos en días
+        windows: Ventanas en días para media y desviación
+        prefix: Prefijo de los nombres de columna
+
+    Returns:
+        Nombre -> array float32 alineado con las filas de entrada
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n_rows = len(x)
+    days = _day_numbers(dates)
+    if group_codes is None:
+        group_codes = np.zeros(n_rows, dtype=np.int64)
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    valid = (group_codes >= 0) & (days >= 0)
+
+    names = ([f'{prefix}_lag_{lag}' for lag in lags]
+             + [f'{prefix}_rolling_{stat}_{window}' for window in windows for stat in ('mean', 'std')])
+    if not valid.any():
+        return {name: np.full(n_rows, np.nan, dtype=np.float32) for name in names}
+
+    series = _DailySeries(x[valid], group_codes[valid], days[valid])
+    groups, day = series.groups, series.days
+    features = {}
+
+    for lag in lags:
+        features[f'{prefix}_lag_{lag}'] = series.value_at(groups, day - lag)
+
+    first = series.first_day[groups]
+    # Las ventanas terminan el día anterior: sin el objetivo de la propia fila
+    end = day - 1
+    for window in windows:
+        begin = np.maximum(day - window, first)
+        n_days = (end - begin + 1).astype(np.float64)
+        total = series.prefix(groups, end, series.sum_cs) - series.prefix(groups, begin - 1, series.sum_cs)
+        squares = series.prefix(groups, end, series.sq_cs) - series.prefix(groups, begin - 1, series.sq_cs)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n_days > 0, total / n_days, np.nan)
+            variance = (squares - total * total / n_days) / (n_days - 1)
+            std = np.where(n_days > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        features[f'{prefix}_rolling_mean_{window}'] = mean
+        features[f'{prefix}_rolling_std_{window}'] = std
+
+    # Del (grupo, día) a cada fila
+    aligned = {}
+    for name in names:
+        out = np.full(n_rows, np.nan, dtype=np.float32)
+        out[valid] = features[name][series.inverse]
+        aligned[name] = out
+    return aligned
+
+
+def build_calendar_panel(df: pd.DataFrame, group_cols: List[str], date_column: str,
+                         value_column: str) -> pd.DataFrame:
+    """
+    Panel denso (grupo x día) con los días sin ventas a 0, solo entre la
+    primera y la última venta de cada grupo
+
+    Args:
+        df: Ventas
+        group_cols: Columnas de grupo (ej. ['id_producto'])
+        date_column: Columna de fecha
+        value_column: Cantidad a totalizar por día
+
+    Returns:
+        DataFrame con las columnas de grupo, la fecha y el total diario (float32)
+    """
+    codes = group_codes_of(df, group_cols)
+    days = _day_numbers(df[date_column])
+    valid = (codes >= 0) & (days >= 0)
+    series = _DailySeries(df[value_column].to_numpy(dtype=np.float64, na_value=np.nan)[valid],
+                          codes[valid], days[valid])
+
+    present = series.group_end > series.group_start
+    group_ids = np.flatnonzero(present)
+    first = series.first_day[group_ids]
+    last = series.days[series.group_end[group_ids] - 1]
+    lengths = last - first + 1
+
+    panel_groups = np.repeat(group_ids, lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    panel_days = np.repeat(first, lengths) + offsets
+    panel_values = series.value_at(panel_groups, panel_days).astype(np.float32)
+
+    # Valores de las columnas de grupo y fechas reales
+    first_row = pd.Series(np.flatnonzero(valid)).groupby(codes[valid]).first()
+    group_values = df[group_cols].iloc[first_row.reindex(panel_groups).to_numpy()].reset_index(drop=True)
+    origin = pd.to_datetime(df[date_column]).min().normalize()
+    panel = group_values.assign(**{
+        date_column: origin + pd.to_timedelta(panel_days, unit='D'),
+        value_column: panel_values
+    })
+    return panel
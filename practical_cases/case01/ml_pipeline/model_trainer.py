@@ -10,8 +10,6 @@ import joblib
 import json
 from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -22,8 +20,25 @@ from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.svm import SVR
 from sklearn.neighbors import KNeighborsRegressor
 from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
-from lightgbm import LGBMRegressor
+
+# Librerías opcionales: sin ellas esos modelos (o las gráficas) no están disponibles
+try:
+    from xgboost import XGBRegressor
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+try:
+    from lightgbm import LGBMRegressor
+    LIGHTGBM_AVAILABLE = True
+except ImportError:
+    LIGHTGBM_AVAILABLE = False
+
+try:
+    import matplotlib.pyplot as plt
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
 
 # Evaluación y validación
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, cross_val_score
@@ -34,7 +49,16 @@ from sklearn.metrics import (
 
 # Utilidades
 from sklearn.inspection import permutation_importance
-import shap
+
+# Importar módulos del pipeline
+from categorical_encoding import SparseFeatures
+
+# Modelos que usan directamente las columnas category (el resto recibe sus códigos)
+NATIVE_CATEGORICAL_MODELS = ()
+if XGBOOST_AVAILABLE:
+    NATIVE_CATEGORICAL_MODELS += (XGBRegressor,)
+if LIGHTGBM_AVAILABLE:
+    NATIVE_CATEGORICAL_MODELS += (LGBMRegressor,)
 
 class ModelTrainer:
     """
@@ -74,6 +98,10 @@ class ModelTrainer:
     
     def _initialize_models(self):
         """Inicializa el diccionario de modelos disponibles"""
+        # XGBoost solo acepta columnas category con enable_categorical (y el método hist)
+        native = self.config.FEATURE_ENGINEERING_CONFIG.get('categorical_encoding') == 'native'
+        xgb_categorical = {'enable_categorical': True, 'tree_method': 'hist'} if native else {}
+        
         self.models = {
             'linear_regression': LinearRegression(),
             'ridge_regression': Ridge(random_state=self.config.RANDOM_STATE),
@@ -85,18 +113,41 @@ class ModelTrainer:
                 n_jobs=self.config.N_JOBS
             ),
             'gradient_boosting': GradientBoostingRegressor(random_state=self.config.RANDOM_STATE),
-            'xgboost': XGBRegressor(
+            'svr': SVR(),
+            'knn': KNeighborsRegressor(n_jobs=self.config.N_JOBS)
+        }
+        if XGBOOST_AVAILABLE:
+            self.models['xgboost'] = XGBRegressor(
                 random_state=self.config.RANDOM_STATE,
-                n_jobs=self.config.N_JOBS
-            ),
-            'lightgbm': LGBMRegressor(
+                n_jobs=self.config.N_JOBS,
+                **xgb_categorical
+            )
+        if LIGHTGBM_AVAILABLE:
+            self.models['lightgbm'] = LGBMRegressor(
                 random_state=self.config.RANDOM_STATE,
                 n_jobs=self.config.N_JOBS,
                 verbose=-1
-            ),
-            'svr': SVR(),
-            'knn': KNeighborsRegressor(n_jobs=self.config.N_JOBS)
-        }
+            )
+    
+    def model_input(self, model, X):
+        """
+        Adapta las features a lo que acepta cada modelo
+        
+        Args:
+            model: Modelo (sin entrenar o entrenado)
+            X: DataFrame o SparseFeatures
+        
+        Returns:
+            Matriz CSR para SparseFeatures; para columnas category, el DataFrame
+            tal cual en XGBoost/LightGBM y sus códigos enteros en el resto
+        """
+        if isinstance(X, SparseFeatures):
+            return X.matrix
+        if isinstance(X, pd.DataFrame) and not isinstance(model, NATIVE_CATEGORICAL_MODELS):
+            categorical = X.select_dtypes(include=['category']).columns
+            if len(categorical):
+                return X.assign(**{col: X[col].cat.codes for col in categorical})
+        return X
     
     def calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
         """
@@ -163,6 +214,8 @@ class ModelTrainer:
         
         model = self.models[model_name]
         results = {'model_name': model_name}
+        X_fit = self.model_input(model, X_train)
+        X_eval = self.model_input(model, X_val) if X_val is not None else None
         
         try:
             # Búsqueda de hiperparámetros si está habilitada
@@ -198,7 +251,7 @@ class ModelTrainer:
                             verbose=0
                         )
                     
-                    search.fit(X_train, y_train)
+                    search.fit(X_fit, y_train)
                     model = search.best_estimator_
                     results['best_params'] = search.best_params_
                     results['cv_score'] = search.best_score_
@@ -206,28 +259,28 @@ class ModelTrainer:
                     self.logger.info(f"✅ Mejores parámetros: {search.best_params_}")
                 else:
                     # Entrenar con parámetros por defecto
-                    model.fit(X_train, y_train)
+                    model.fit(X_fit, y_train)
                     results['best_params'] = model.get_params()
             else:
                 # Entrenar sin búsqueda de hiperparámetros
-                model.fit(X_train, y_train)
+                model.fit(X_fit, y_train)
                 results['best_params'] = model.get_params()
             
             # Predicciones en conjunto de entrenamiento
-            y_train_pred = model.predict(X_train)
+            y_train_pred = model.predict(X_fit)
             train_metrics = self.calculate_metrics(y_train, y_train_pred)
             results['train_metrics'] = train_metrics
             
             # Predicciones en conjunto de validación (si existe)
             if X_val is not None and y_val is not None:
-                y_val_pred = model.predict(X_val)
+                y_val_pred = model.predict(X_eval)
                 val_metrics = self.calculate_metrics(y_val, y_val_pred)
                 results['val_metrics'] = val_metrics
                 results['val_predictions'] = y_val_pred
             
             # Validación cruzada
             cv_scores = cross_val_score(
-                model, X_train, y_train,
+                model, X_fit, y_train,
                 cv=self.config.CV_FOLDS,
                 scoring=self.config.CV_SCORING,
                 n_jobs=self.config.N_JOBS
@@ -343,7 +396,7 @@ class ModelTrainer:
         self.logger.info(f"📊 Evaluando modelo: {model_name}")
         
         # Predicciones
-        y_pred = model.predict(X_test)
+        y_pred = model.predict(self.model_input(model, X_test))
         
         # Calcular métricas
         metrics = self.calculate_metrics(y_test, y_pred)
@@ -434,6 +487,9 @@ class ModelTrainer:
         if comparison_df.empty:
             self.logger.warning("⚠️ No hay resultados de modelos para visualizar")
             return
+        if not MATPLOTLIB_AVAILABLE:
+            self.logger.warning("⚠️ matplotlib no está instalado: no se generan gráficas")
+            return
         
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle('Comparación de Modelos ML - MegaMercado', fontsize=16, fontweight='bold')
@@ -486,7 +542,11 @@ class ModelTrainer:
             model_name: Nombre del modelo
             save_path: Ruta para guardar la gráfica
         """
-        y_pred = model.predict(X_test)
+        if not MATPLOTLIB_AVAILABLE:
+            self.logger.warning("⚠️ matplotlib no está instalado: no se generan gráficas")
+            return
+        
+        y_pred = model.predict(self.model_input(model, X_test))
         
         fig, axes = plt.subplots(1, 2, figsize=(15, 6))
         
@@ -20,6 +20,7 @@ import numpy as np
 from config import MLConfig, get_config, create_directories
 from preprocessor import DataPreprocessor
 from model_trainer import ModelTrainer
+from categorical_encoding import SparseFeatures
 
 class MLPipeline:
     """
@@ -145,10 +146,13 @@ class MLPipeline:
                 processed_dir = Path(self.config.PROCESSED_DATA_DIR)
                 processed_dir.mkdir(parents=True, exist_ok=True)
                 
-                # Guardar datasets
-                X_train.to_csv(processed_dir / 'X_train.csv', index=False)
-                X_val.to_csv(processed_dir / 'X_val.csv', index=False)
-                X_test.to_csv(processed_dir / 'X_test.csv', index=False)
+                # Guardar datasets (las matrices CSR en .npz; el texto del
+                # diccionario compartido se recupera al escribir)
+                for name, X in (('X_train', X_train), ('X_val', X_val), ('X_test', X_test)):
+                    if isinstance(X, SparseFeatures):
+                        X.save(processed_dir / f'{name}.npz')
+                    else:
+                        self.preprocessor.string_dictionary.decode(X).to_csv(processed_dir / f'{name}.csv', index=False)
                 y_train.to_csv(processed_dir / 'y_train.csv', index=False)
                 y_val.to_csv(processed_dir / 'y_val.csv', index=False)
                 y_test.to_csv(processed_dir / 'y_test.csv', index=False)
@@ -443,8 +447,15 @@ class MLPipeline:
             else:
                 raise ValueError("No hay modelo disponible para predicciones")
             
+            # Lags y ventanas que falten: del estado online (O(productos), sin historia)
+            new_data = self.preprocessor.add_online_features(new_data)
+            
             # Procesar nuevos datos (simplificado, asume que ya están procesados)
-            predictions = model.predict(new_data)
+            # Los faltantes se rellenan con las medianas/modas de entrenamiento
+            if self.preprocessor.imputer.is_fitted:
+                new_data = self.preprocessor.imputer.transform(new_data)
+            new_data = self.preprocessor.prepare_features(new_data)
+            predictions = model.predict(self.trainer.model_input(model, new_data))
             
             self.logger.info(f"✅ Predicciones completadas: {len(predictions)} muestras")
             return predictions
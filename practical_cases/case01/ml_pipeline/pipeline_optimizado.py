@@ -3,12 +3,35 @@
 Pipeline optimizado que maneja datasets grandes con muestreo
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 from datetime import datetime
 
+# Lectura unificada de ficheros (data-cleaning-project/src/utils/file_handlers.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'data-cleaning-project' / 'src' / 'utils'))
+try:
+    from file_handlers import read_table
+    FILE_HANDLERS_AVAILABLE = True
+except ImportError:
+    FILE_HANDLERS_AVAILABLE = False
+
+# Columnas que usa el pipeline de cada tabla: el resto no se parsea
+COLUMNAS_NECESARIAS = {
+    'ventas': ['producto_id', 'cliente_id', 'fecha', 'precio_unitario', 'cantidad'],
+    'productos': ['producto_id', 'categoria', 'precio_base'],
+    'clientes': ['cliente_id', 'edad']
+}
+
+def cargar_tabla(ruta, columnas=None):
+    """Carga solo las columnas indicadas con el lector unificado si está disponible"""
+    if FILE_HANDLERS_AVAILABLE:
+        return read_table(str(ruta), columns=columnas, standardization={})
+    usecols = (lambda columna: columna in columnas) if columnas is not None else None
+    return pd.read_csv(ruta, usecols=usecols)
+
 def ejecutar_pipeline_optimizado(sample_size=10000):
     """Ejecuta pipeline con muestreo para manejar memoria limitada"""
     
@@ -22,7 +45,7 @@ def ejecutar_pipeline_optimizado(sample_size=10000):
         print("\nCargando datos con muestreo...")
         
         # Cargar ventas con muestreo
-        df_ventas = pd.read_csv(base_dir / 'ventas.csv')
+        df_ventas = cargar_tabla(base_dir / 'ventas.csv', COLUMNAS_NECESARIAS['ventas'])
         print(f"Ventas originales: {len(df_ventas):,} registros")
         
         # Muestreo aleatorio
@@ -31,8 +54,8 @@ def ejecutar_pipeline_optimizado(sample_size=10000):
             print(f"Muestra de ventas: {len(df_ventas):,} registros")
         
         # Cargar otros datasets
-        df_productos = pd.read_csv(base_dir / 'productos.csv')
-        df_clientes = pd.read_csv(base_dir / 'clientes.csv')
+        df_productos = cargar_tabla(base_dir / 'productos.csv', COLUMNAS_NECESARIAS['productos'])
+        df_clientes = cargar_tabla(base_dir / 'clientes.csv', COLUMNAS_NECESARIAS['clientes'])
         
         print(f"Productos: {len(df_productos):,} registros")
         print(f"Clientes: {len(df_clientes):,} registros")
@@ -41,16 +64,11 @@ def ejecutar_pipeline_optimizado(sample_size=10000):
         print("\nFusionando datos...")
         
         # Solo fusionar productos (más pequeño)
-        df_main = df_ventas.merge(
-            df_productos[['producto_id', 'categoria', 'precio_base']], 
-            on='producto_id', 
-            how='left'
-        )
+        df_main = df_ventas.merge(df_productos, on='producto_id', how='left')
         print(f"Después de fusionar productos: {df_main.shape}")
         
-        # Fusionar solo información básica de clientes  
-        df_clientes_small = df_clientes[['cliente_id', 'edad']].copy()
-        df_main = df_main.merge(df_clientes_small, on='cliente_id', how='left')
+        # Fusionar solo información básica de clientes (ya leída así)
+        df_main = df_main.merge(df_clientes, on='cliente_id', how='left')
         print(f"Después de fusionar clientes: {df_main.shape}")
         
         # 3. Ingeniería de características
@@ -4,6 +4,9 @@ Clase para el preprocesamiento completo de datos de MegaMercado
 Incluye limpieza, transformación y feature engineering
 """
 
+import os
+import sys
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import logging
@@ -18,6 +21,32 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Lectura unificada de ficheros (data-cleaning-project/src/utils/file_handlers.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'data-cleaning-project' / 'src' / 'utils'))
+try:
+    from file_handlers import read_table
+    FILE_HANDLERS_AVAILABLE = True
+except ImportError:
+    FILE_HANDLERS_AVAILABLE = False
+
+from key_registry import KeyRegistry
+from dictionary_encoding import StringDictionary
+from join_planner import JoinPlanner
+from imputer import MissingValueImputer
+from calendar_dimension import CalendarDimension
+from lag_kernels import KERNEL_VERSION, calendar_lag_features, group_codes_of, grouped_lag_features
+from feature_state import OnlineFeatureState
+from feature_store import ENTITY_KEYS, FeatureStore, data_fingerprint, feature_set_version
+from categorical_encoding import ENCODING_MODES, SparseFeatures, one_hot_categories
+
+# Claves con las que merge_datasets une cada tabla a ventas
+MERGE_KEYS = {
+    'productos': ['id_producto'],
+    'clientes': ['id_cliente'],
+    'proveedores': ['id_proveedor'],
+    'logistica': ['id_producto', 'fecha_venta']
+}
+
 class DataPreprocessor:
     """
     Clase principal para el preprocesamiento de datos
@@ -35,7 +64,15 @@ class DataPreprocessor:
         self.scalers = {}
         self.encoders = {}
         self.imputers = {}
+        self.imputer = MissingValueImputer(logger=self.logger)
         self.preprocessor_pipeline = None
+        self.key_registry = KeyRegistry(self.logger)
+        self.string_dictionary = StringDictionary(logger=self.logger)
+        self.join_plan = []
+        self.feature_state = None
+        self.one_hot_categories = {}
+        self.categorical_dtypes = {}
+        self.hashed_columns = {}
         
     def _setup_logger(self) -> logging.Logger:
         """Configura el logger"""
@@ -50,12 +87,34 @@ class DataPreprocessor:
         
         return logger
     
-    def load_data(self, file_paths: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    def required_columns(self) -> List[str]:
+        """
+        Columnas que usa el pipeline según la configuración: objetivo,
+        fecha, identificadores, features y claves de unión
+        
+        Returns:
+            Lista de columnas sin duplicados
+        """
+        columns = [self.config.TARGET_COLUMN, self.config.DATE_COLUMN]
+        columns += list(self.config.ID_COLUMNS or [])
+        columns += list(self.config.NUMERICAL_FEATURES or [])
+        columns += list(self.config.CATEGORICAL_FEATURES or [])
+        for keys in MERGE_KEYS.values():
+            columns += keys
+        return list(dict.fromkeys(columns))
+    
+    def load_data(self, file_paths: Dict[str, str], columns=None,
+                  standardization: Dict[str, List[str]] = None) -> Dict[str, pd.DataFrame]:
         """
         Carga múltiples archivos de datos
         
         Args:
             file_paths: Diccionario con nombres y rutas de archivos
+            columns: Columnas a leer: None (todas), 'auto' (required_columns),
+                una lista común a todas las tablas o un dict por tabla. Solo
+                se parsean las columnas presentes en cada archivo
+            standardization: Nombre estándar -> alias, para renombrar al leer
+                (ej. COLUMN_NAME_STANDARDIZATION del módulo EDA)
         
         Returns:
             Diccionario con DataFrames cargados
@@ -63,12 +122,23 @@ class DataPreprocessor:
         self.logger.info("🔄 Cargando datos...")
         data = {}
         
+        if columns == 'auto':
+            columns = self.required_columns()
+        
         for name, path in file_paths.items():
+            table_columns = columns.get(name) if isinstance(columns, dict) else columns
             try:
-                if path.endswith('.csv'):
-                    df = pd.read_csv(path)
+                if FILE_HANDLERS_AVAILABLE:
+                    # csv, csv.gz, zip, parquet, feather o xlsx
+                    if table_columns is None and standardization is None:
+                        df = read_table(path)
+                    else:
+                        df = read_table(path, columns=table_columns, standardization=standardization or {})
+                elif path.endswith('.csv'):
+                    usecols = (lambda column: column in table_columns) if table_columns is not None else None
+                    df = pd.read_csv(path, usecols=usecols)
                 elif path.endswith('.xlsx'):
-                    df = pd.read_excel(path)
+                    df = pd.read_excel(path, usecols=table_columns)
                 else:
                     raise ValueError(f"Formato de archivo no soportado: {path}")
                 
@@ -81,12 +151,70 @@ class DataPreprocessor:
         
         return data
     
-    def merge_datasets(self, datasets: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    def apply_key_registry(self, datasets: Dict[str, pd.DataFrame],
+                           registry_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Sustituye los ids de todas las tablas por claves sustitutas int32.
+        
+        Si existe un registro guardado en ``registry_path`` se reutiliza, de
+        modo que los códigos son los mismos entre ejecuciones; las claves
+        nuevas se añaden al final y el registro se vuelve a guardar.
+        
+        Args:
+            datasets: Diccionario con los datasets cargados
+            registry_path: Ruta del registro persistido (None = solo en memoria)
+        
+        Returns:
+            Diccionario con los datasets codificados
+        """
+        if registry_path and os.path.exists(registry_path):
+            self.key_registry = KeyRegistry.load(registry_path, self.logger)
+        
+        encoded = self.key_registry.encode_tables(datasets)
+        
+        if registry_path:
+            os.makedirs(os.path.dirname(registry_path) or '.', exist_ok=True)
+            self.key_registry.save(registry_path)
+        
+        self.logger.info("🔑 Ids sustituidos por claves densas int32")
+        return encoded
+    
+    def apply_string_dictionary(self, datasets: Dict[str, pd.DataFrame],
+                                dictionary_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Codifica las dimensiones de texto repetidas (ubicacion, categoria,
+        genero) con un diccionario común a todas las tablas.
+        
+        Args:
+            datasets: Diccionario con los datasets cargados
+            dictionary_path: Ruta del diccionario persistido (None = solo en memoria)
+        
+        Returns:
+            Diccionario con los datasets codificados
+        """
+        if dictionary_path and os.path.exists(dictionary_path):
+            self.string_dictionary = StringDictionary.load(dictionary_path, logger=self.logger)
+        
+        encoded = self.string_dictionary.encode_tables(datasets)
+        
+        if dictionary_path:
+            os.makedirs(os.path.dirname(dictionary_path) or '.', exist_ok=True)
+            self.string_dictionary.save(dictionary_path)
+        
+        return encoded
+    
+    def merge_datasets(self, datasets: Dict[str, pd.DataFrame],
+                       columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Une múltiples datasets en uno principal
         
+        Las uniones las planifica JoinPlanner: proyección previa, orden por
+        tamaño y selectividad, detección de fan-out y unión por gather
+        (ids densos) o por índice.
+        
         Args:
             datasets: Diccionario con DataFrames a unir
+            columns: Columnas necesarias del resultado (None = todas)
         
         Returns:
             DataFrame unificado
@@ -95,32 +223,15 @@ class DataPreprocessor:
         
         # Estrategia de unión basada en las tablas disponibles
         if 'ventas' in datasets and 'productos' in datasets:
-            main_df = datasets['ventas'].merge(
-                datasets['productos'], 
-                on='id_producto', 
-                how='left'
+            planner = JoinPlanner(
+                MERGE_KEYS,
+                fanout_policy=self.config.FEATURE_ENGINEERING_CONFIG.get('join_fanout', 'warn'),
+                join_mode=self.config.FEATURE_ENGINEERING_CONFIG.get('join_mode', 'auto'),
+                logger=self.logger
             )
-            
-            if 'clientes' in datasets:
-                main_df = main_df.merge(
-                    datasets['clientes'], 
-                    on='id_cliente', 
-                    how='left'
-                )
-            
-            if 'proveedores' in datasets:
-                main_df = main_df.merge(
-                    datasets['proveedores'], 
-                    on='id_proveedor', 
-                    how='left'
-                )
-            
-            if 'logistica' in datasets:
-                main_df = main_df.merge(
-                    datasets['logistica'], 
-                    on=['id_producto', 'fecha_venta'], 
-                    how='left'
-                )
+            dimensions = {table: df for table, df in datasets.items() if table in MERGE_KEYS}
+            main_df = planner.execute(datasets['ventas'], dimensions, columns)
+            self.join_plan = planner.last_plan
         else:
             # Si solo hay un dataset, usarlo directamente
             main_df = list(datasets.values())[0]
@@ -128,21 +239,24 @@ class DataPreprocessor:
         self.logger.info(f"✅ Dataset unificado: {main_df.shape[0]} filas, {main_df.shape[1]} columnas")
         return main_df
     
-    def handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
+    def handle_missing_values(self, df: pd.DataFrame, fit: bool = True,
+                              inplace: bool = False) -> pd.DataFrame:
         """
-        Maneja valores faltantes
+        Maneja valores faltantes con el MissingValueImputer del preprocesador
         
         Args:
             df: DataFrame a procesar
+            fit: Recalcular medianas y modas con ``df`` (False = usar las
+                ajustadas en entrenamiento, ej. al predecir)
+            inplace: Rellenar ``df`` directamente en lugar de una copia
         
         Returns:
             DataFrame sin valores faltantes
         """
         self.logger.info("🔍 Manejando valores faltantes...")
         
-        df_clean = df.copy()
-        missing_report = df_clean.isnull().sum()
-        missing_pct = (missing_report / len(df_clean)) * 100
+        missing_report = df.isnull().sum()
+        missing_pct = (missing_report / len(df)) * 100
         
         # Reportar valores faltantes
         if missing_report.sum() > 0:
@@ -150,17 +264,10 @@ class DataPreprocessor:
             for col, count in missing_report[missing_report > 0].items():
                 self.logger.info(f"  {col}: {count} ({missing_pct[col]:.2f}%)")
         
-        # Estrategias por tipo de columna
-        for col in df_clean.columns:
-            if df_clean[col].isnull().sum() > 0:
-                if df_clean[col].dtype in ['int64', 'float64']:
-                    # Variables numéricas: imputar con mediana
-                    median_val = df_clean[col].median()
-                    df_clean[col].fillna(median_val, inplace=True)
-                else:
-                    # Variables categóricas: imputar con moda
-                    mode_val = df_clean[col].mode().iloc[0] if not df_clean[col].mode().empty else 'Unknown'
-                    df_clean[col].fillna(mode_val, inplace=True)
+        # Numéricas: mediana; categóricas: moda
+        if fit or not self.imputer.is_fitted:
+            self.imputer.fit(df)
+        df_clean = self.imputer.transform(df, inplace=inplace)
         
         self.logger.info("✅ Valores faltantes procesados")
         return df_clean
@@ -218,30 +325,15 @@ class DataPreprocessor:
         """
         self.logger.info("📅 Creando features temporales...")
         
-        df_temporal = df.copy()
+        df_temporal = df
         
         if self.config.DATE_COLUMN in df_temporal.columns:
-            # Asegurar que la columna sea datetime
-            df_temporal[self.config.DATE_COLUMN] = pd.to_datetime(df_temporal[self.config.DATE_COLUMN])
-            
-            # Features básicas de tiempo
-            df_temporal['año'] = df_temporal[self.config.DATE_COLUMN].dt.year
-            df_temporal['mes'] = df_temporal[self.config.DATE_COLUMN].dt.month
-            df_temporal['dia'] = df_temporal[self.config.DATE_COLUMN].dt.day
-            df_temporal['dia_semana'] = df_temporal[self.config.DATE_COLUMN].dt.dayofweek
-            df_temporal['semana_año'] = df_temporal[self.config.DATE_COLUMN].dt.isocalendar().week
-            df_temporal['trimestre'] = df_temporal[self.config.DATE_COLUMN].dt.quarter
-            
-            # Features cíclicas
-            df_temporal['mes_sin'] = np.sin(2 * np.pi * df_temporal['mes'] / 12)
-            df_temporal['mes_cos'] = np.cos(2 * np.pi * df_temporal['mes'] / 12)
-            df_temporal['dia_sin'] = np.sin(2 * np.pi * df_temporal['dia'] / 31)
-            df_temporal['dia_cos'] = np.cos(2 * np.pi * df_temporal['dia'] / 31)
-            
-            # Features de estacionalidad
-            df_temporal['es_fin_semana'] = df_temporal['dia_semana'].isin([5, 6]).astype(int)
-            df_temporal['es_inicio_mes'] = (df_temporal['dia'] <= 5).astype(int)
-            df_temporal['es_fin_mes'] = (df_temporal['dia'] >= 26).astype(int)
+            # Features por fecha distinta, unidas por código de fecha
+            calendar = CalendarDimension(
+                holidays=self.config.FEATURE_ENGINEERING_CONFIG.get('calendar_holidays', False),
+                seasons=self.config.FEATURE_ENGINEERING_CONFIG.get('calendar_seasons')
+            )
+            df_temporal = calendar.enrich(df_temporal, self.config.DATE_COLUMN)
             
             self.logger.info("✅ Features temporales creadas")
         else:
@@ -265,7 +357,7 @@ class DataPreprocessor:
         
         self.logger.info("🔄 Creando features de lag...")
         
-        df_lag = df.copy()
+        df_lag = df
         target_col = self.config.TARGET_COLUMN
         lag_periods = self.config.FEATURE_ENGINEERING_CONFIG['lag_periods']
         
@@ -275,47 +367,143 @@ class DataPreprocessor:
         
         # Ordenar por fecha
         if self.config.DATE_COLUMN in df_lag.columns:
-            df_lag = df_lag.sort_values(self.config.DATE_COLUMN)
+            df_lag = df_lag.sort_values(self.config.DATE_COLUMN, kind='stable')
         
-        # Crear lags por grupo si se especifica
-        if group_cols:
-            for period in lag_periods:
-                df_lag[f'{target_col}_lag_{period}'] = df_lag.groupby(group_cols)[target_col].shift(period)
-        else:
-            for period in lag_periods:
-                df_lag[f'{target_col}_lag_{period}'] = df_lag[target_col].shift(period)
-        
-        # Rolling features
+        # Lags y ventanas móviles de todos los grupos en una pasada (float32)
         rolling_windows = self.config.FEATURE_ENGINEERING_CONFIG['rolling_windows']
-        for window in rolling_windows:
-            if group_cols:
-                df_lag[f'{target_col}_rolling_mean_{window}'] = (
-                    df_lag.groupby(group_cols)[target_col]
-                    .rolling(window=window, min_periods=1)
-                    .mean()
-                    .reset_index(0, drop=True)
-                )
-                df_lag[f'{target_col}_rolling_std_{window}'] = (
-                    df_lag.groupby(group_cols)[target_col]
-                    .rolling(window=window, min_periods=1)
-                    .std()
-                    .reset_index(0, drop=True)
-                )
-            else:
-                df_lag[f'{target_col}_rolling_mean_{window}'] = (
-                    df_lag[target_col].rolling(window=window, min_periods=1).mean()
-                )
-                df_lag[f'{target_col}_rolling_std_{window}'] = (
-                    df_lag[target_col].rolling(window=window, min_periods=1).std()
+        lag_unit = self.config.FEATURE_ENGINEERING_CONFIG.get('lag_unit', 'rows')
+        values = df_lag[target_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        if lag_unit == 'days' and self.config.DATE_COLUMN in df_lag.columns:
+            # En días de calendario: los días sin ventas cuentan como 0
+            features = calendar_lag_features(
+                values,
+                df_lag[self.config.DATE_COLUMN],
+                group_codes=group_codes_of(df_lag, group_cols),
+                lags=lag_periods,
+                windows=rolling_windows,
+                prefix=target_col
+            )
+            # Estado al último día para calcular estas features al predecir sin la historia
+            if group_cols and len(group_cols) == 1:
+                self.feature_state = OnlineFeatureState.from_history(
+                    df_lag, group_cols[0], self.config.DATE_COLUMN, target_col,
+                    lags=lag_periods, windows=rolling_windows, logger=self.logger
                 )
+        else:
+            features = grouped_lag_features(
+                values,
+                group_codes=group_codes_of(df_lag, group_cols),
+                lags=lag_periods,
+                windows=rolling_windows,
+                prefix=target_col
+            )
+        df_lag = df_lag.assign(**features)
         
         self.logger.info("✅ Features de lag creadas")
         return df_lag
     
+    def feature_set_definition(self, group_cols: List[str]) -> Dict:
+        """Parámetros que determinan las features temporales y de lag (versión del feature store)"""
+        fe_config = self.config.FEATURE_ENGINEERING_CONFIG
+        return {
+            'target': self.config.TARGET_COLUMN,
+            'date_column': self.config.DATE_COLUMN,
+            'group_cols': list(group_cols),
+            'kernel_version': KERNEL_VERSION,
+            **{key: fe_config.get(key) for key in (
+                'create_temporal_features', 'create_lag_features', 'lag_periods', 'lag_unit',
+                'rolling_windows', 'calendar_holidays', 'calendar_seasons')}
+        }
+    
+    def build_features(self, df: pd.DataFrame, group_cols: List[str] = None) -> pd.DataFrame:
+        """
+        Features temporales y de lag, leídas del feature store si ya están
+        materializadas para los mismos datos (la versión incluye su huella)
+        
+        Las features se unen por clave y día exactos. Con lag_unit='rows'
+        las features son por fila y no se usa el store.
+        
+        Args:
+            df: DataFrame unido e imputado
+            group_cols: Columnas para agrupar los lags
+        
+        Returns:
+            DataFrame con features temporales y de lag
+        """
+        group_cols = group_cols or ['id_producto']
+        store_dir = self.config.FEATURE_ENGINEERING_CONFIG.get('feature_store_dir')
+        date_col = self.config.DATE_COLUMN
+        row_lags = (self.config.FEATURE_ENGINEERING_CONFIG['create_lag_features']
+                    and self.config.FEATURE_ENGINEERING_CONFIG.get('lag_unit', 'rows') != 'days')
+        if store_dir and row_lags:
+            self.logger.warning("⚠️ Feature store desactivado: con lag_unit='rows' las features son por fila "
+                                "y el store guarda una fila por clave y día")
+        if not store_dir or row_lags or date_col not in df.columns:
+            return self.create_lag_features(self.create_temporal_features(df), group_cols=group_cols)
+        
+        # La fecha como datetime64 en los dos caminos (create_temporal_features ya la convierte)
+        if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            df = df.assign(**{date_col: pd.to_datetime(df[date_col])})
+        
+        store = FeatureStore(store_dir, self.logger)
+        feature_set = self.config.FEATURE_ENGINEERING_CONFIG.get('feature_set', 'ventas')
+        keys = list(dict.fromkeys([key for key in ENTITY_KEYS if key in df.columns] + list(group_cols)))
+        definition = self.feature_set_definition(group_cols)
+        # Las features de un día dependen de la historia: la versión incluye la huella de los datos
+        definition['data_fingerprint'] = data_fingerprint(
+            df, keys + [date_col, self.config.TARGET_COLUMN])
+        version = feature_set_version(definition)
+        days = pd.DatetimeIndex(df[date_col].dropna().dt.normalize().unique())
+        materialized = store.materialized_days(feature_set, version)
+        
+        df_features = None
+        if len(days) and days.isin(materialized).all():
+            try:
+                df_features = store.join(df.sort_values(date_col, kind='stable'), feature_set, version, date_col,
+                                         keys=keys)
+                self.logger.info(f"🗄️ Features leídas del feature store ({feature_set}/{version})")
+            except LookupError as e:
+                self.logger.warning(f"⚠️ {e}: se recalculan y se reescriben todos los días")
+                materialized = pd.DatetimeIndex([])
+        
+        if df_features is not None:
+            if (self.config.FEATURE_ENGINEERING_CONFIG.get('lag_unit') == 'days'
+                    and len(group_cols) == 1 and self.config.TARGET_COLUMN in df_features.columns):
+                self.feature_state = OnlineFeatureState.from_history(
+                    df_features, group_cols[0], date_col, self.config.TARGET_COLUMN,
+                    lags=self.config.FEATURE_ENGINEERING_CONFIG['lag_periods'],
+                    windows=self.config.FEATURE_ENGINEERING_CONFIG['rolling_windows'],
+                    logger=self.logger
+                )
+            return df_features
+        
+        columns_before = set(df.columns)
+        df_features = self.create_lag_features(self.create_temporal_features(df), group_cols=group_cols)
+        
+        # Solo se escriben los días que faltan; los ya materializados no cambian
+        new_columns = [column for column in df_features.columns if column not in columns_before]
+        new_days = ~df_features[date_col].dt.normalize().isin(materialized).to_numpy()
+        if new_columns and new_days.any():
+            store.write(feature_set, version, df_features.loc[new_days, keys + [date_col] + new_columns],
+                        date_col, keys=keys, definition=definition)
+        return df_features
+    
     def encode_categorical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Codifica variables categóricas
         
+        Según FEATURE_ENGINEERING_CONFIG['categorical_encoding']:
+        - 'dense': one-hot con get_dummies (pocas categorías) o Label Encoding
+        - 'sparse': las columnas de pocas categorías se dejan tal cual y
+          prepare_features las convierte en bloques one-hot CSR
+        - 'native': todas pasan a dtype category con categorías fijas
+          (LightGBM/XGBoost las usan directamente, el resto de modelos sus códigos)
+        
+        Las columnas de 'hash_columns' (y, con 'hash_high_cardinality', las de
+        muchas categorías) se codifican con el hashing trick en lugar de
+        LabelEncoder: sin vocabulario y sin fallos con valores nuevos.
+        
         Args:
             df: DataFrame a procesar
         
@@ -324,8 +512,22 @@ class DataPreprocessor:
         """
         self.logger.info("🏷️ Codificando variables categóricas...")
         
+        mode = self.config.FEATURE_ENGINEERING_CONFIG.get('categorical_encoding', 'dense')
+        if mode not in ENCODING_MODES:
+            raise ValueError(f"categorical_encoding debe ser uno de {ENCODING_MODES}, no '{mode}'")
+        max_one_hot = self.config.FEATURE_ENGINEERING_CONFIG.get('one_hot_max_categories', 10)
+        hash_columns = self.config.FEATURE_ENGINEERING_CONFIG.get('hash_columns') or []
+        hash_high_cardinality = self.config.FEATURE_ENGINEERING_CONFIG.get('hash_high_cardinality', False)
+        n_buckets = self.config.FEATURE_ENGINEERING_CONFIG.get('hash_buckets', 1024)
+        if mode == 'native' and (hash_columns or hash_high_cardinality):
+            raise ValueError("El hashing produce una matriz dispersa: no se combina con categorical_encoding='native'")
+        
         df_encoded = df.copy()
-        categorical_cols = df_encoded.select_dtypes(include=['object']).columns
+        categorical_cols = df_encoded.select_dtypes(include=['object', 'category']).columns
+        # Las columnas de ids numéricas solo se codifican si se piden en hash_columns
+        categorical_cols = list(categorical_cols) + [col for col in hash_columns
+                                                     if col in df_encoded.columns and col not in categorical_cols]
+        dummies = []
         
         for col in categorical_cols:
             if col == self.config.DATE_COLUMN:
@@ -334,20 +536,103 @@ class DataPreprocessor:
             # Usar Label Encoding para variables con muchas categorías
             n_unique = df_encoded[col].nunique()
             
-            if n_unique > 10:
+            if mode == 'native':
+                # Categorías fijas: entrenamiento y predicción comparten los códigos
+                dtype = pd.CategoricalDtype(one_hot_categories(df_encoded[col]))
+                df_encoded[col] = df_encoded[col].astype(dtype)
+                self.categorical_dtypes[col] = dtype
+                self.logger.info(f"  {col}: categórica nativa ({n_unique} categorías)")
+            elif col in hash_columns or (hash_high_cardinality and n_unique > max_one_hot):
+                self.hashed_columns[col] = n_buckets
+                self.logger.info(f"  {col}: Hashing ({n_unique} categorías en {n_buckets} buckets)")
+            elif n_unique > max_one_hot:
                 le = LabelEncoder()
-                df_encoded[f'{col}_encoded'] = le.fit_transform(df_encoded[col].astype(str))
+                if isinstance(df_encoded[col].dtype, pd.CategoricalDtype):
+                    # Columna del diccionario compartido: se traducen sus códigos
+                    categories = df_encoded[col].cat.categories.astype(str)
+                    mapping = le.fit(categories).transform(categories)
+                    df_encoded[f'{col}_encoded'] = mapping[df_encoded[col].cat.codes.to_numpy()]
+                else:
+                    df_encoded[f'{col}_encoded'] = le.fit_transform(df_encoded[col].astype(str))
                 self.encoders[col] = le
                 self.logger.info(f"  {col}: Label Encoding ({n_unique} categorías)")
+            elif mode == 'sparse':
+                self.one_hot_categories[col] = one_hot_categories(df_encoded[col])
+                self.logger.info(f"  {col}: One-Hot disperso ({n_unique} categorías)")
             else:
-                # One-Hot Encoding para pocas categorías
-                encoded_cols = pd.get_dummies(df_encoded[col], prefix=col)
-                df_encoded = pd.concat([df_encoded, encoded_cols], axis=1)
+                # One-Hot Encoding para pocas categorías (solo las observadas)
+                observed = pd.CategoricalDtype(one_hot_categories(df_encoded[col]))
+                dummies.append(pd.get_dummies(df_encoded[col].astype(observed), prefix=col))
                 self.logger.info(f"  {col}: One-Hot Encoding ({n_unique} categorías)")
         
+        # Todas las dummies en una sola concatenación
+        if dummies:
+            df_encoded = pd.concat([df_encoded] + dummies, axis=1)
+        
         self.logger.info("✅ Variables categóricas codificadas")
         return df_encoded
     
+    def prepare_features(self, X: pd.DataFrame):
+        """
+        Representación de las features que reciben los modelos
+        
+        Args:
+            X: Features (salida de split_data o datos nuevos ya procesados)
+        
+        Returns:
+            SparseFeatures en modo 'sparse' o si hay columnas con hashing;
+            DataFrame (con las categorías de entrenamiento en modo 'native') en los demás
+        """
+        mode = self.config.FEATURE_ENGINEERING_CONFIG.get('categorical_encoding', 'dense')
+        if mode == 'sparse' or self.hashed_columns:
+            return SparseFeatures.from_frame(X, self.one_hot_categories, self.hashed_columns)
+        if mode == 'native' and self.categorical_dtypes:
+            return X.astype({col: dtype for col, dtype in self.categorical_dtypes.items() if col in X.columns})
+        return X
+    
+    def add_online_features(self, df: pd.DataFrame, product_col: str = 'id_producto') -> pd.DataFrame:
+        """
+        Añade los lags y ventanas que falten desde el estado online
+        (O(productos), sin la historia), escalados como en entrenamiento
+        
+        El estado se indexa con la clave de producto anterior al escalado
+        (la sustituta si se usó el registro de claves): si la columna de
+        producto se escaló, se deshace el escalado para consultarlo; si
+        llegan las claves naturales, se codifican con el registro.
+        
+        Args:
+            df: Datos ya procesados (escalados) sin las features de lag
+            product_col: Columna de producto
+        
+        Returns:
+            DataFrame con las features del estado añadidas
+        """
+        state = self.feature_state
+        if state is None or product_col not in df.columns:
+            return df
+        missing = [name for name in state.feature_names() if name not in df.columns]
+        if not missing:
+            return df
+        
+        scaler = self.scalers.get('numerical')
+        scaled = list(getattr(scaler, 'feature_names_in_', []))
+        products = df[product_col]
+        if product_col in scaled and pd.api.types.is_numeric_dtype(products):
+            position = scaled.index(product_col)
+            products = np.rint(products.to_numpy(dtype=np.float64) * scaler.scale_[position]
+                               + scaler.mean_[position]).astype(np.int64)
+        elif self.key_registry.size('producto'):
+            products = self.key_registry.encode('producto', products)
+        
+        online = state.features(products)[missing]
+        for name in missing:
+            values = online[name].to_numpy(dtype=np.float64)
+            if name in scaled:
+                position = scaled.index(name)
+                values = (values - scaler.mean_[position]) / scaler.scale_[position]
+            online[name] = values
+        return df.assign(**{name: online[name].to_numpy() for name in missing})
+    
     def scale_numerical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Escala variables numéricas
@@ -363,8 +648,9 @@ class DataPreprocessor:
         df_scaled = df.copy()
         numerical_cols = df_scaled.select_dtypes(include=[np.number]).columns
         
-        # Excluir columnas que no deben escalarse
-        exclude_cols = [self.config.TARGET_COLUMN] + ['año', 'mes', 'dia']
+        # Excluir columnas que no deben escalarse (las de hashing se codifican
+        # por su valor original en prepare_features)
+        exclude_cols = [self.config.TARGET_COLUMN] + ['año', 'mes', 'dia'] + list(self.hashed_columns)
         numerical_cols = [col for col in numerical_cols if col not in exclude_cols]
         
         if numerical_cols:
@@ -420,45 +706,77 @@ class DataPreprocessor:
         preprocessing_objects = {
             'scalers': self.scalers,
             'encoders': self.encoders,
+            'key_registry': self.key_registry.get_state(),
+            'string_dictionary': self.string_dictionary.dtypes,
+            'imputer': self.imputer.get_state(),
+            'one_hot_categories': self.one_hot_categories,
+            'categorical_dtypes': self.categorical_dtypes,
+            'hashed_columns': self.hashed_columns,
             'config': self.config
         }
         joblib.dump(preprocessing_objects, filepath)
         self.logger.info(f"💾 Preprocesador guardado en: {filepath}")
+        
+        state_path = self.config.FEATURE_ENGINEERING_CONFIG.get('feature_state_path')
+        if self.feature_state is not None and state_path:
+            self.feature_state.save(state_path)
     
     def load_preprocessor(self, filepath: str):
         """Carga un preprocesador previamente entrenado"""
         preprocessing_objects = joblib.load(filepath)
         self.scalers = preprocessing_objects['scalers']
         self.encoders = preprocessing_objects['encoders']
+        if 'key_registry' in preprocessing_objects:
+            self.key_registry = KeyRegistry.from_state(preprocessing_objects['key_registry'], self.logger)
+        if 'string_dictionary' in preprocessing_objects:
+            self.string_dictionary.dtypes = preprocessing_objects['string_dictionary']
+        if 'imputer' in preprocessing_objects:
+            self.imputer = MissingValueImputer.from_state(preprocessing_objects['imputer'], self.logger)
+        self.one_hot_categories = preprocessing_objects.get('one_hot_categories', {})
+        self.categorical_dtypes = preprocessing_objects.get('categorical_dtypes', {})
+        self.hashed_columns = preprocessing_objects.get('hashed_columns', {})
+        state_path = self.config.FEATURE_ENGINEERING_CONFIG.get('feature_state_path')
+        if state_path and os.path.exists(state_path):
+            self.feature_state = OnlineFeatureState.load(state_path, self.logger)
         self.logger.info(f"📂 Preprocesador cargado desde: {filepath}")
     
-    def full_preprocessing_pipeline(self, file_paths: Dict[str, str], target_col: str) -> Tuple:
+    def full_preprocessing_pipeline(self, file_paths: Dict[str, str], target_col: str,
+                                    columns=None, standardization: Dict[str, List[str]] = None) -> Tuple:
         """
         Pipeline completo de preprocesamiento
         
         Args:
             file_paths: Rutas de archivos de datos
             target_col: Columna objetivo
+            columns: Columnas a leer (ver load_data; 'auto' = solo las configuradas)
+            standardization: Renombrado de columnas al leer (ver load_data)
         
         Returns:
             Tupla con datos procesados y divididos
         """
         self.logger.info("🚀 Iniciando pipeline completo de preprocesamiento")
         
-        # 1. Cargar datos
-        datasets = self.load_data(file_paths)
+        # 1. Cargar datos (solo las columnas necesarias si se indican)
+        datasets = self.load_data(file_paths, columns, standardization)
+        
+        # 1b. Claves sustitutas: las uniones y agrupaciones trabajan con int32
+        if self.config.FEATURE_ENGINEERING_CONFIG.get('surrogate_keys'):
+            datasets = self.apply_key_registry(
+                datasets, self.config.FEATURE_ENGINEERING_CONFIG.get('key_registry_path'))
+        
+        # 1c. Textos repetidos como categorías compartidas (siguen codificados tras el merge)
+        if self.config.FEATURE_ENGINEERING_CONFIG.get('shared_dictionary'):
+            datasets = self.apply_string_dictionary(
+                datasets, self.config.FEATURE_ENGINEERING_CONFIG.get('dictionary_path'))
         
         # 2. Unir datasets
         df = self.merge_datasets(datasets)
         
         # 3. Manejar valores faltantes
-        df = self.handle_missing_values(df)
+        df = self.handle_missing_values(df, inplace=True)
         
-        # 4. Crear features temporales
-        df = self.create_temporal_features(df)
-        
-        # 5. Crear features de lag
-        df = self.create_lag_features(df, group_cols=['id_producto'])
+        # 4-5. Features temporales y de lag (del feature store si ya están materializadas)
+        df = self.build_features(df, group_cols=['id_producto'])
         
         # 6. Remover outliers
         df = self.remove_outliers(df)
@@ -472,6 +790,9 @@ class DataPreprocessor:
         # 9. Dividir datos
         X_train, X_val, X_test, y_train, y_val, y_test = self.split_data(df, target_col)
         
+        # 10. Representación para los modelos (denso, CSR o categórico nativo)
+        X_train, X_val, X_test = (self.prepare_features(X) for X in (X_train, X_val, X_test))
+        
         self.logger.info("✅ Pipeline de preprocesamiento completado")
         
         return X_train, X_val, X_test, y_train, y_val, y_test, df
\ No newline at end of file
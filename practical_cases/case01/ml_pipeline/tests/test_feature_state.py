@@ -0,0 +1,174 @@
+"""
+Tests de paridad entre las features de lag offline (lag_kernels) y el
+estado online que las sirve al predecir (feature_state).
+Ejecutar desde ml_pipeline: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import MLConfig
+from feature_state import OnlineFeatureState
+from lag_kernels import calendar_lag_features
+from pipeline import MLPipeline
+from preprocessor import DataPreprocessor
+
+LAGS = [1, 2, 7]
+WINDOWS = [3, 7, 14]
+
+
+def make_sales(n_days: int = 60, seed: int = 0) -> pd.DataFrame:
+    """Ventas con días sin ventas, varias ventas por día y productos que empiezan tarde."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2024-01-01', periods=n_days, freq='D')
+    rows = []
+    for product, (start, density) in {'A': (0, 0.9), 'B': (10, 0.5), 'C': (n_days - 3, 1.0),
+                                      'D': (0, 0.2)}.items():
+        for day in days[start:]:
+            for _ in range(rng.poisson(2) if rng.random() < density else 0):
+                rows.append({'id_producto': product, 'fecha': day,
+                             'cantidad_vendida': int(rng.integers(1, 10))})
+    return pd.DataFrame(rows)
+
+
+def offline_features(sales: pd.DataFrame) -> pd.DataFrame:
+    codes, _ = pd.factorize(sales['id_producto'])
+    features = calendar_lag_features(sales['cantidad_vendida'], sales['fecha'], codes,
+                                     lags=LAGS, windows=WINDOWS, prefix='cantidad_vendida')
+    return pd.DataFrame(features, index=sales.index)
+
+
+def test_windows_exclude_the_row_target():
+    sales = pd.DataFrame({'id_producto': 'A', 'fecha': pd.date_range('2024-01-01', periods=4),
+                          'cantidad_vendida': [1, 2, 3, 100]})
+    features = offline_features(sales)
+
+    # El día de la primera venta no tiene historia
+    assert np.isnan(features['cantidad_vendida_rolling_mean_3'].iloc[0])
+    # El último día (100) no entra en su propia ventana: media de 1, 2, 3
+    assert features['cantidad_vendida_rolling_mean_3'].iloc[3] == pytest.approx(2.0)
+    assert features['cantidad_vendida_lag_1'].iloc[3] == 3
+
+
+def test_online_state_matches_offline_features_of_next_day():
+    sales = make_sales()
+    last_day = sales['fecha'].max()
+    history = sales[sales['fecha'] < last_day]
+    next_day = sales['fecha'] == last_day
+
+    state = OnlineFeatureState.from_history(history, 'id_producto', 'fecha', 'cantidad_vendida',
+                                            lags=LAGS, windows=WINDOWS)
+    assert state.current_day == last_day - pd.Timedelta(days=1)
+
+    offline = offline_features(sales)[next_day]
+    products = sales.loc[next_day, 'id_producto']
+    online = state.features(products)
+
+    # Productos con historia; los que empiezan ese día no tienen features online
+    known = products.isin(history['id_producto']).to_numpy()
+    assert known.any()
+    np.testing.assert_allclose(online.to_numpy()[known], offline[online.columns].to_numpy()[known],
+                               rtol=1e-5, equal_nan=True)
+
+
+def test_incremental_update_matches_from_history():
+    sales = make_sales(seed=1)
+    days = sorted(sales['fecha'].unique())
+    split = days[len(days) // 2]
+
+    state = OnlineFeatureState.from_history(sales[sales['fecha'] <= split], 'id_producto', 'fecha',
+                                            'cantidad_vendida', lags=LAGS, windows=WINDOWS)
+    for day in days[days.index(split) + 1:]:
+        batch = sales[sales['fecha'] == day]
+        state.update(day, batch['id_producto'], batch['cantidad_vendida'])
+
+    reference = OnlineFeatureState.from_history(sales, 'id_producto', 'fecha', 'cantidad_vendida',
+                                                lags=LAGS, windows=WINDOWS)
+    products = ['A', 'B', 'C', 'D']
+    pd.testing.assert_frame_equal(state.features(products), reference.features(products), rtol=1e-5)
+
+
+def test_update_after_gap_longer_than_every_window():
+    history = pd.DataFrame({'id_producto': 'A', 'fecha': pd.date_range('2024-01-01', periods=3),
+                            'cantidad_vendida': 5})
+    state = OnlineFeatureState.from_history(history, 'id_producto', 'fecha', 'cantidad_vendida',
+                                            lags=[1], windows=[3, 14])
+    state.update('2024-01-25', ['A'], [2])
+
+    # Las ventas del 1 al 3 de enero ya no entran en ninguna ventana
+    features = state.features(['A']).iloc[0]
+    assert features['cantidad_vendida_lag_1'] == 2
+    assert features['cantidad_vendida_rolling_mean_3'] == pytest.approx(2 / 3)
+    assert features['cantidad_vendida_rolling_mean_14'] == pytest.approx(2 / 14)
+
+    reference = OnlineFeatureState.from_history(
+        pd.concat([history, pd.DataFrame({'id_producto': ['A'], 'fecha': [pd.Timestamp('2024-01-25')],
+                                          'cantidad_vendida': [2]})]),
+        'id_producto', 'fecha', 'cantidad_vendida', lags=[1], windows=[3, 14])
+    pd.testing.assert_frame_equal(state.features(['A']), reference.features(['A']), rtol=1e-5)
+
+
+
+def fit_preprocessor():
+    """Preprocesador entrenado con claves sustitutas, lags en días y escalado, y las filas del último día."""
+    config = MLConfig()
+    config.DATE_COLUMN = 'fecha'
+    config.FEATURE_ENGINEERING_CONFIG = {**config.FEATURE_ENGINEERING_CONFIG, 'create_lag_features': True,
+                                         'lag_unit': 'days', 'lag_periods': LAGS, 'rolling_windows': WINDOWS}
+    preprocessor = DataPreprocessor(config)
+
+    sales = make_sales(seed=2)
+    sales['precio'] = np.arange(len(sales), dtype=float)
+    natural_ids = sales['id_producto']
+    sales['id_producto'] = preprocessor.key_registry.register('producto', natural_ids)
+    next_day = (sales['fecha'] == sales['fecha'].max()).to_numpy()
+
+    history = preprocessor.create_lag_features(sales[~next_day], group_cols=['id_producto'])
+    train = preprocessor.scale_numerical_features(history.drop(columns=['fecha']))
+    scaler = preprocessor.scalers['numerical']
+
+    # Referencia: las features offline del último día, escaladas igual que al entrenar
+    rows = sales[next_day].assign(**offline_features(sales)[next_day])
+    expected = rows.drop(columns=['fecha']).copy()
+    expected[list(scaler.feature_names_in_)] = scaler.transform(expected[list(scaler.feature_names_in_)])
+    known = np.isin(natural_ids[next_day], natural_ids[~next_day])
+    assert known.any()
+    return preprocessor, train, rows.assign(id_producto=natural_ids[next_day].to_numpy()), expected, known
+
+
+def test_preprocessor_adds_scaled_online_features_by_surrogate_key():
+    preprocessor, _, raw, expected, known = fit_preprocessor()
+    names = preprocessor.feature_state.feature_names()
+
+    # Datos procesados: id_producto escalado
+    online = preprocessor.add_online_features(expected.drop(columns=names))
+    np.testing.assert_allclose(online[names].to_numpy()[known], expected[names].to_numpy()[known],
+                               rtol=1e-4, atol=1e-5)
+
+    # Datos sin procesar: claves naturales, las features quedan escaladas igual
+    online = preprocessor.add_online_features(raw.drop(columns=names))
+    np.testing.assert_allclose(online[names].to_numpy()[known], expected[names].to_numpy()[known],
+                               rtol=1e-4, atol=1e-5)
+
+
+def test_predict_new_data_uses_online_features(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    preprocessor, train, _, expected, known = fit_preprocessor()
+    names = preprocessor.feature_state.feature_names()
+
+    pipeline = MLPipeline()
+    pipeline.preprocessor = preprocessor
+    model = HistGradientBoostingRegressor(max_iter=20, random_state=0).fit(
+        train.drop(columns=['cantidad_vendida']), train['cantidad_vendida'])
+    pipeline.trainer.best_model = model
+
+    X = expected.drop(columns=['cantidad_vendida'])
+    predictions = pipeline.predict_new_data(X.drop(columns=names))
+    np.testing.assert_allclose(predictions[known], model.predict(X)[known], rtol=1e-4)
@@ -0,0 +1,72 @@
+"""
+Tests de paridad entre JoinPlanner y la cadena de merges izquierdos en el
+orden de merge_keys.
+Ejecutar desde ml_pipeline: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from join_planner import JoinPlanner
+
+MERGE_KEYS = {
+    'productos': ['id_producto'],
+    'clientes': ['id_cliente'],
+    'proveedores': ['id_proveedor']
+}
+
+
+def make_tables():
+    rng = np.random.default_rng(0)
+    ventas = pd.DataFrame({'id_venta': range(50),
+                           'id_producto': rng.integers(1, 12, 50),   # 11 no existe
+                           'id_cliente': rng.integers(1, 6, 50),
+                           'precio': rng.normal(20, 5, 50)})
+    productos = pd.DataFrame({'id_producto': range(1, 11), 'id_proveedor': [1, 2] * 5,
+                              'categoria': list('ABCDEFGHIJ'), 'precio': rng.normal(18, 5, 10),
+                              'activo': [True, False] * 5, 'peso': range(10)})
+    # Dimensión estrecha: el plan la une antes que productos
+    clientes = pd.DataFrame({'id_cliente': [3, 1, 2, 4, 5], 'premium': [True, False, True, True, False]})
+    proveedores = pd.DataFrame({'id_proveedor': [1, 2], 'pais': ['ES', 'PT']})
+    return ventas, {'productos': productos, 'clientes': clientes, 'proveedores': proveedores}
+
+
+def merge_chain(ventas, dimensions):
+    result = ventas
+    for name, keys in MERGE_KEYS.items():
+        result = result.merge(dimensions[name], on=keys, how='left')
+    return result
+
+
+@pytest.mark.parametrize('join_mode', ['auto', 'index'])
+def test_planner_matches_merge_chain(join_mode):
+    ventas, dimensions = make_tables()
+    planner = JoinPlanner(MERGE_KEYS, join_mode=join_mode)
+
+    result = planner.execute(ventas, dimensions)
+    expected = merge_chain(ventas, dimensions)
+
+    # El plan no sigue el orden de merge_keys, pero el resultado sí
+    assert [step['table'] for step in planner.last_plan] != list(MERGE_KEYS)
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_booleans_with_missing_keys_are_object_like_merge():
+    ventas, dimensions = make_tables()
+
+    result = JoinPlanner(MERGE_KEYS, join_mode='gather').execute(ventas, dimensions)
+
+    missing = ventas['id_producto'] == 11
+    assert missing.any()
+    assert result['activo'].dtype == object
+    assert result.loc[missing, 'activo'].isna().all()
+    assert set(result.loc[~missing, 'activo']) == {True, False}
+    # Sin claves faltantes el booleano se conserva
+    assert result['premium'].dtype == bool
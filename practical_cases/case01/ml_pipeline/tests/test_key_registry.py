@@ -0,0 +1,42 @@
+"""
+Tests del registro de claves sustitutas (key_registry) y su persistencia
+con el preprocesador.
+Ejecutar desde ml_pipeline: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import MLConfig
+from key_registry import MISSING_CODE, KeyRegistry
+from preprocessor import DataPreprocessor
+
+
+def test_state_round_trip_keeps_codes():
+    registry = KeyRegistry()
+    registry.register('producto', [10, 20, 30])
+    registry.register('cliente', ['A', 'B'])
+
+    restored = KeyRegistry.from_state(registry.get_state())
+
+    # Las claves se normalizan al restaurar: 20, 20.0 y '20' son la misma
+    np.testing.assert_array_equal(restored.encode('producto', ['20', 30.0, 99]), [1, 2, MISSING_CODE])
+    np.testing.assert_array_equal(restored.encode('cliente', ['B', 'A']), [1, 0])
+    assert restored.size('producto') == 3
+
+
+def test_preprocessor_persists_registry(tmp_path):
+    preprocessor = DataPreprocessor(MLConfig())
+    preprocessor.key_registry.register('producto', ['P1', 'P2'])
+    path = str(tmp_path / 'preprocessor.pkl')
+    preprocessor.save_preprocessor(path)
+
+    loaded = DataPreprocessor(MLConfig())
+    loaded.load_preprocessor(path)
+
+    np.testing.assert_array_equal(loaded.key_registry.encode('producto', ['P2', 'P1']), [1, 0])
+    assert loaded.key_registry is not preprocessor.key_registry
@@ -0,0 +1,68 @@
+"""
+Entrenamiento con cada representación de las features categóricas
+(categorical_encoding 'dense', 'sparse' y 'native').
+Ejecutar desde ml_pipeline: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from categorical_encoding import SparseFeatures
+from config import MLConfig
+from model_trainer import ModelTrainer
+from preprocessor import DataPreprocessor
+
+
+def make_data(n_rows: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'precio': rng.normal(50, 10, n_rows),
+        'region': rng.choice(['Norte', 'Sur', 'Este'], n_rows),
+        'canal_venta': rng.choice(['online', 'tienda'], n_rows)
+    })
+    df['cantidad_vendida'] = (df['precio'] * 0.2 + (df['region'] == 'Norte') * 5
+                              + rng.normal(0, 1, n_rows))
+    return df
+
+
+@pytest.mark.parametrize('mode, model_name', [
+    ('dense', 'random_forest'),
+    ('sparse', 'ridge_regression'),
+    ('native', 'lightgbm'),
+    ('native', 'xgboost'),
+    ('native', 'decision_tree')
+])
+def test_train_model_in_each_encoding_mode(mode, model_name):
+    # Los modelos de librerías opcionales solo se prueban si están instaladas
+    if model_name in ('lightgbm', 'xgboost'):
+        pytest.importorskip(model_name)
+    config = MLConfig()
+    config.FEATURE_ENGINEERING_CONFIG['categorical_encoding'] = mode
+    config.CV_FOLDS = 3
+    config.N_JOBS = 1
+
+    preprocessor = DataPreprocessor(config)
+    df = preprocessor.encode_categorical_features(make_data())
+    y = df.pop('cantidad_vendida')
+    if mode == 'dense':
+        # Las columnas originales de texto se sustituyen por sus dummies
+        df = df.drop(columns=['region', 'canal_venta'])
+    X_train, X_val = preprocessor.prepare_features(df.iloc[:200]), preprocessor.prepare_features(df.iloc[200:])
+
+    if mode == 'sparse':
+        assert isinstance(X_train, SparseFeatures)
+    elif mode == 'native':
+        assert isinstance(X_train['region'].dtype, pd.CategoricalDtype)
+
+    trainer = ModelTrainer(config)
+    results = trainer.train_single_model(model_name, X_train, y.iloc[:200], X_val, y.iloc[200:],
+                                         hyperparameter_tuning=False)
+
+    assert results['success'], results.get('error')
+    assert results['val_metrics']['r2'] > 0.5
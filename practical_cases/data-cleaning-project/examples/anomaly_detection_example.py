@@ -1,11 +1,52 @@
-csv_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   └── clean_and_detect.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Anomaly Detection Example
+=========================
+
+Fits the detector once on historical sales and scores a new batch.
+Run from the project root: python examples/anomaly_detection_example.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from anomaly_detector import AnomalyDetector
+
+
+def make_sales(n_rows: int, seed: int) -> pd.DataFrame:
+    """Synthetic sales: quantity, unit price and total amount."""
+    rng = np.random.default_rng(seed)
+    quantity = rng.poisson(3, n_rows) + 1
+    unit_price = rng.lognormal(3, 0.4, n_rows)
+    return pd.DataFrame({
+        'cantidad': quantity,
+        'precio_unitario': unit_price,
+        'monto_total': quantity * unit_price * rng.normal(1, 0.02, n_rows)
+    })
+
+
+def main():
+    history = make_sales(1_000_000, seed=1)
+    batch = make_sales(10_000, seed=2)
+
+    # Inject a few anomalies: inconsistent totals and extreme quantities
+    batch.loc[:4, 'monto_total'] *= 10
+    batch.loc[5:9, 'cantidad'] = 500
+
+    detector = AnomalyDetector(methods=('mad', 'mahalanobis'), max_fit_rows=200_000)
+
+    # Fit on the history in chunks, as it would be read from disk
+    detector.fit(history.iloc[start:start + 250_000] for start in range(0, len(history), 250_000))
+    print(detector.summary())
+
+    anomalies = detector.detect(batch)
+    print(f"Anomalies in the new batch: {len(anomalies)} of {len(batch)}")
+    print(anomalies.sort_values('mahalanobis', ascending=False).head(10))
+
+
+if __name__ == "__main__":
+    main()
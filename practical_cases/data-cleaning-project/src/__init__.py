@@ -1,12 +1,3 @@
-csv_data_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   ├── clean_data.py
-│   └── detect_anomalies.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Data cleaning project: cleaning pipeline, inconsistency and anomaly detection.
+"""
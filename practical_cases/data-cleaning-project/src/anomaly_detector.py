@@ -1,12 +1,356 @@
-csv_data_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   ├── clean_data.py
-│   └── detect_anomalies.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Anomaly Detector
+================
+
+Multivariate anomaly detection for numeric tables, designed to be fit once
+on historical data and then score new batches quickly.
+
+Methods:
+- Robust z-scores based on the median and MAD (per column). Columns whose
+  MAD is zero (mostly constant, e.g. discrete counts) are scaled by the IQR
+  or, failing that, the standard deviation; constant columns are skipped
+- Mahalanobis distance with a Ledoit-Wolf shrinkage covariance
+- Isolation Forest (optional, requires scikit-learn)
+
+Everything runs in batched numpy over chunks. Fitting keeps a bounded
+uniform sample of the history (``max_fit_rows``) and scoring processes
+``chunk_size`` rows at a time, so memory does not grow with the number of
+rows: a 10M-row table is handled as a stream of chunks.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from sklearn.ensemble import IsolationForest
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+# Same for the interquartile range (IQR / 1.349 estimates the standard deviation)
+IQR_SCALE = 1.349
+
+DataInput = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+def ledoit_wolf_covariance(X: np.ndarray, chunk_size: int = 100_000) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrinkage covariance, computed in chunks.
+
+    Shrinks the sample covariance towards a scaled identity, which keeps the
+    estimate well conditioned (invertible) with correlated or few rows.
+
+    Args:
+        X: Centered data, shape (n_rows, n_features)
+        chunk_size: Rows per chunk when accumulating the fourth moments
+
+    Returns:
+        Tuple: (shrunk covariance, shrinkage coefficient in [0, 1])
+    """
+    n_rows, n_features = X.shape
+    S = X.T @ X / n_rows
+    mu = np.trace(S) / n_features
+    delta = np.sum((S - mu * np.eye(n_features)) ** 2)
+
+    # sum_i ||x_i x_i^T - S||_F^2 = sum ||x_i||^4 - 2 sum x_i^T S x_i + n ||S||_F^2
+    total = 0.0
+    for start in range(0, n_rows, chunk_size):
+        chunk = X[start:start + chunk_size]
+        total += np.sum(np.einsum('ij,ij->i', chunk, chunk) ** 2)
+        total -= 2 * np.sum(np.einsum('ij,jk,ik->i', chunk, S, chunk))
+    total += n_rows * np.sum(S ** 2)
+
+    beta = min(total / n_rows ** 2, delta)
+    shrinkage = beta / delta if delta > 0 else 1.0
+    covariance = shrinkage * mu * np.eye(n_features) + (1 - shrinkage) * S
+    return covariance, float(shrinkage)
+
+
+class AnomalyDetector:
+    """
+    Fit/score anomaly detector for numeric columns.
+    """
+
+    METHODS = ('mad', 'mahalanobis', 'isolation_forest')
+
+    def __init__(self, columns: Optional[List[str]] = None,
+                 methods: Iterable[str] = ('mad', 'mahalanobis'),
+                 mad_threshold: float = 3.5,
+                 contamination: float = 0.001,
+                 max_fit_rows: int = 1_000_000,
+                 chunk_size: int = 500_000,
+                 random_state: Optional[int] = 42):
+        """
+        Initialize the detector.
+
+        Args:
+            columns: Numeric columns to use (default: all numeric columns seen in fit)
+            methods: Methods to apply ('mad', 'mahalanobis', 'isolation_forest')
+            mad_threshold: Robust z-score above which a value is anomalous
+            contamination: Expected share of anomalies; sets the Mahalanobis and
+                Isolation Forest thresholds from the fitted sample
+            max_fit_rows: Maximum rows kept from the history to fit the model
+            chunk_size: Rows scored per batch
+            random_state: Seed for sampling and the Isolation Forest
+        """
+        methods = tuple(methods)
+        unknown = set(methods) - set(self.METHODS)
+        if unknown:
+            raise ValueError(f"Unknown methods: {sorted(unknown)}. Use {self.METHODS}")
+        if 'isolation_forest' in methods and not SKLEARN_AVAILABLE:
+            raise ImportError("scikit-learn is required for the 'isolation_forest' method")
+
+        self.columns = list(columns) if columns is not None else None
+        self.methods = methods
+        self.mad_threshold = mad_threshold
+        self.contamination = contamination
+        self.max_fit_rows = max_fit_rows
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+
+        self._rng = np.random.default_rng(random_state)
+        self._sample = None       # Bounded uniform sample of the history
+        self._sample_keys = None  # Random keys of the sampled rows (bottom-k)
+        self._rows_seen = 0
+        self._stale = True
+
+        self.median_ = None
+        self.mad_ = None
+        self.mean_ = None
+        self.precision_ = None
+        self.shrinkage_ = None
+        self.mahalanobis_threshold_ = None
+        self.isolation_forest_ = None
+        self.isolation_threshold_ = None
+
+    # ------------------------------------------------------------------
+    # Fitting
+    # ------------------------------------------------------------------
+
+    def fit(self, data: DataInput) -> 'AnomalyDetector':
+        """
+        Fit the model on historical data.
+
+        Args:
+            data: DataFrame or iterable of DataFrame chunks
+
+        Returns:
+            AnomalyDetector: The fitted detector
+        """
+        self._sample = None
+        self._sample_keys = None
+        self._rows_seen = 0
+        for chunk in self._iter_chunks(data):
+            self.partial_fit(chunk)
+        return self._refit()
+
+    def partial_fit(self, chunk: pd.DataFrame) -> 'AnomalyDetector':
+        """
+        Add a chunk of history. Statistics are recomputed lazily before the
+        next score, so many chunks can be added cheaply.
+
+        Args:
+            chunk: DataFrame chunk
+
+        Returns:
+            AnomalyDetector: The detector
+        """
+        if self.columns is None:
+            self.columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        if not self.columns:
+            raise ValueError("No numeric columns to fit")
+
+        values = self._to_array(chunk)
+        keys = self._rng.random(len(values))
+        self._rows_seen += len(values)
+
+        # Bottom-k reservoir: keep the rows with the smallest random keys
+        if self._sample is not None:
+            values = np.vstack([self._sample, values])
+            keys = np.concatenate([self._sample_keys, keys])
+        if len(values) > self.max_fit_rows:
+            keep = np.argpartition(keys, self.max_fit_rows)[:self.max_fit_rows]
+            values, keys = values[keep], keys[keep]
+
+        self._sample, self._sample_keys = values, keys
+        self._stale = True
+        return self
+
+    def _refit(self) -> 'AnomalyDetector':
+        if self._sample is None or len(self._sample) == 0:
+            raise ValueError("The detector has not seen any data")
+
+        sample = self._sample
+        self.median_ = np.nanmedian(sample, axis=0)
+        self.mad_ = self._robust_scale(sample)
+
+        filled = self._impute(sample)
+        if 'mahalanobis' in self.methods:
+            self.mean_ = filled.mean(axis=0)
+            covariance, self.shrinkage_ = ledoit_wolf_covariance(filled - self.mean_)
+            self.precision_ = np.linalg.pinv(covariance)
+            distances = self._mahalanobis(filled)
+            self.mahalanobis_threshold_ = float(np.quantile(distances, 1 - self.contamination))
+
+        if 'isolation_forest' in self.methods:
+            self.isolation_forest_ = IsolationForest(n_estimators=100, contamination='auto',
+                                                     random_state=self.random_state)
+            self.isolation_forest_.fit(filled)
+            # score_samples: higher = more normal; negate so higher = more anomalous
+            scores = -self.isolation_forest_.score_samples(filled)
+            self.isolation_threshold_ = float(np.quantile(scores, 1 - self.contamination))
+
+        self._stale = False
+        return self
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def score(self, data: DataInput) -> pd.DataFrame:
+        """
+        Score rows against the fitted model.
+
+        Args:
+            data: DataFrame or iterable of DataFrame chunks
+
+        Returns:
+            pd.DataFrame: One row per input row with the score of each method,
+            the per-method flags and 'is_anomaly' (any method flags the row)
+        """
+        return pd.concat(list(self.score_chunks(data)))
+
+    def score_chunks(self, data: DataInput) -> Iterator[pd.DataFrame]:
+        """
+        Score rows chunk by chunk (bounded memory for very large inputs).
+
+        Args:
+            data: DataFrame or iterable of DataFrame chunks
+
+        Yields:
+            pd.DataFrame: Scores of each chunk, indexed like the input
+        """
+        if self._stale:
+            self._refit()
+
+        for chunk in self._iter_chunks(data):
+            for start in range(0, len(chunk), self.chunk_size):
+                batch = chunk.iloc[start:start + self.chunk_size]
+                yield self._score_batch(batch)
+
+    def detect(self, data: DataInput) -> pd.DataFrame:
+        """
+        Return only the anomalous rows, with their scores.
+
+        Args:
+            data: DataFrame or iterable of DataFrame chunks
+
+        Returns:
+            pd.DataFrame: Anomalous rows joined with their scores
+        """
+        found = []
+        for chunk in self._iter_chunks(data):
+            scores = pd.concat(list(self.score_chunks(chunk)))
+            flagged = scores['is_anomaly'].to_numpy()
+            if flagged.any():
+                found.append(chunk[flagged].join(scores[flagged]))
+        return pd.concat(found) if found else pd.DataFrame()
+
+    def _score_batch(self, batch: pd.DataFrame) -> pd.DataFrame:
+        values = self._to_array(batch)
+        result = {}
+        flags = np.zeros(len(values), dtype=bool)
+
+        if 'mad' in self.methods:
+            robust_z = np.abs(values - self.median_) / self.mad_
+            # fmax ignores missing values and skipped columns (NaN only when
+            # nothing is left to score; NaN > threshold is False)
+            result['mad_score'] = np.fmax.reduce(robust_z, axis=1)
+            result['mad_column'] = np.array(self.columns, dtype=object)[
+                np.argmax(np.nan_to_num(robust_z, nan=-1.0), axis=1)]
+            result['mad_flag'] = result['mad_score'] > self.mad_threshold
+            flags |= result['mad_flag']
+
+        if 'mahalanobis' in self.methods or 'isolation_forest' in self.methods:
+            filled = self._impute(values)
+
+        if 'mahalanobis' in self.methods:
+            result['mahalanobis'] = self._mahalanobis(filled)
+            result['mahalanobis_flag'] = result['mahalanobis'] > self.mahalanobis_threshold_
+            flags |= result['mahalanobis_flag']
+
+        if 'isolation_forest' in self.methods:
+            result['isolation_score'] = -self.isolation_forest_.score_samples(filled)
+            result['isolation_flag'] = result['isolation_score'] > self.isolation_threshold_
+            flags |= result['isolation_flag']
+
+        result['is_anomaly'] = flags
+        return pd.DataFrame(result, index=batch.index)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _iter_chunks(self, data: DataInput) -> Iterator[pd.DataFrame]:
+        if isinstance(data, pd.DataFrame):
+            yield data
+        else:
+            yield from data
+
+    def _to_array(self, df: pd.DataFrame) -> np.ndarray:
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise KeyError(f"Missing columns: {missing}")
+        return df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _impute(self, values: np.ndarray) -> np.ndarray:
+        """Replace missing values with the fitted medians."""
+        if not np.isnan(values).any():
+            return values
+        return np.where(np.isnan(values), self.median_, values)
+
+    def _robust_scale(self, sample: np.ndarray) -> np.ndarray:
+        """
+        Per-column scale of the robust z-scores.
+
+        A zero MAD (more than half the values equal the median) would flag
+        every other value, so those columns fall back to the IQR and then to
+        the standard deviation. Constant columns get NaN and are skipped by
+        the MAD method (Mahalanobis still sees them).
+        """
+        scale = np.nanmedian(np.abs(sample - self.median_), axis=0) * MAD_SCALE
+        if np.all(scale > 0):
+            return scale
+        q75, q25 = np.nanpercentile(sample, [75, 25], axis=0)
+        scale = np.where(scale > 0, scale, (q75 - q25) / IQR_SCALE)
+        scale = np.where(scale > 0, scale, np.nanstd(sample, axis=0, ddof=1) if len(sample) > 1 else 0.0)
+        return np.where(scale > 0, scale, np.nan)
+
+    def _mahalanobis(self, values: np.ndarray) -> np.ndarray:
+        centered = values - self.mean_
+        return np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', centered, self.precision_, centered), 0))
+
+    def summary(self) -> Dict:
+        """
+        Fitted parameters, for logging or reports.
+
+        Returns:
+            Dict: Columns, rows seen, sample size and fitted thresholds
+        """
+        if self._stale and self._sample is not None:
+            self._refit()
+        return {
+            'columns': self.columns,
+            'methods': list(self.methods),
+            'rows_seen': self._rows_seen,
+            'fit_rows': 0 if self._sample is None else len(self._sample),
+            'median': dict(zip(self.columns or [], np.round(self.median_, 6).tolist())) if self.median_ is not None else {},
+            'shrinkage': self.shrinkage_,
+            'mahalanobis_threshold': self.mahalanobis_threshold_,
+            'isolation_threshold': self.isolation_threshold_
+        }
@@ -1,11 +1,3 @@
-csv_data_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   └── data_cleaner.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Utilities: file readers/writers and validators.
+"""
@@ -1,12 +1,306 @@
-csv_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   ├── clean_csv.py
-│   └── detect_anomalies.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+File Handlers
+=============
+
+One reader/writer layer for every pipeline:
+
+- Format and compression are sniffed from the file's magic bytes (the
+  extension is only a fallback): csv (plain, gzip, bz2, xz, zstd, zip),
+  parquet, feather/Arrow IPC and xlsx.
+- read_table: whole-table read with column projection, dtype maps and
+  renames. Parquet and feather are memory-mapped; CSV is parsed with the
+  multithreaded pyarrow engine when pyarrow is installed.
+- iter_chunks: uniform chunk iterator for all formats (bounded memory).
+- write_table: matching writers chosen from the output extension (CSV
+  via pandas, or the multithreaded Arrow writer with engine='pyarrow').
+
+Schema on read: only the requested columns are parsed, and column-name
+aliases (e.g. 'customer_id' -> 'id_cliente') can be resolved against the
+file header before reading, so parsing cost scales with the columns used.
+"""
+
+import os
+import zipfile
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Magic bytes -> (format, compression)
+MAGIC_BYTES = [
+    (b'PAR1', ('parquet', None)),
+    (b'ARROW1', ('feather', None)),
+    (b'\x1f\x8b', ('csv', 'gzip')),
+    (b'BZh', ('csv', 'bz2')),
+    (b'\xfd7zXZ\x00', ('csv', 'xz')),
+    (b'\x28\xb5\x2f\xfd', ('csv', 'zstd')),
+    (b'PK\x03\x04', ('zip', None)),
+]
+
+EXTENSIONS = {
+    '.csv': ('csv', None), '.txt': ('csv', None),
+    '.gz': ('csv', 'gzip'), '.bz2': ('csv', 'bz2'), '.xz': ('csv', 'xz'), '.zst': ('csv', 'zstd'),
+    '.zip': ('csv', 'zip'),
+    '.parquet': ('parquet', None), '.pq': ('parquet', None),
+    '.feather': ('feather', None), '.arrow': ('feather', None),
+    '.xlsx': ('xlsx', None), '.xls': ('xlsx', None),
+}
+
+
+def detect_format(path: str) -> Dict[str, Optional[str]]:
+    """
+    Detect the format and compression of a file.
+
+    Args:
+        path: File path
+
+    Returns:
+        Dict: {'format': 'csv'|'parquet'|'feather'|'xlsx', 'compression': str or None}
+    """
+    with open(path, 'rb') as f:
+        head = f.read(8)
+
+    for magic, (file_format, compression) in MAGIC_BYTES:
+        if head.startswith(magic):
+            if file_format == 'zip':
+                # xlsx files are zip archives too
+                with zipfile.ZipFile(path) as archive:
+                    if '[Content_Types].xml' in archive.namelist():
+                        return {'format': 'xlsx', 'compression': None}
+                return {'format': 'csv', 'compression': 'zip'}
+            return {'format': file_format, 'compression': compression}
+
+    extension = os.path.splitext(path)[1].lower()
+    file_format, compression = EXTENSIONS.get(extension, ('csv', None))
+    return {'format': file_format, 'compression': compression}
+
+
+def read_columns(path: str, **csv_options) -> List[str]:
+    """
+    Read only the column names of a file (no data is parsed).
+
+    Args:
+        path: File path
+        **csv_options: Extra options for CSV files
+
+    Returns:
+        List[str]: Column names in file order
+    """
+    info = detect_format(path)
+    if info['format'] == 'parquet':
+        return pq.read_schema(path).names
+    if info['format'] == 'feather':
+        return feather.read_table(path, memory_map=True).schema.names
+    if info['format'] == 'xlsx':
+        return pd.read_excel(path, nrows=0).columns.tolist()
+    return pd.read_csv(path, nrows=0, compression=info['compression'], **csv_options).columns.tolist()
+
+
+def resolve_columns(available: List[str], columns: Optional[List[str]] = None,
+                    standardization: Optional[Dict[str, List[str]]] = None):
+    """
+    Map requested (standard) column names to the names present in a file.
+
+    Args:
+        available: Column names in the file
+        columns: Requested columns by standard name (None = all)
+        standardization: Standard name -> list of aliases. An alias is only
+            renamed if the standard name is not already present, and the
+            first alias found wins
+
+    Returns:
+        Tuple: (source columns to read or None for all, renames source -> standard)
+    """
+    renames = {}
+    if standardization:
+        present = set(available)
+        for standard, aliases in standardization.items():
+            if standard in present:
+                continue
+            for alias in aliases:
+                if alias in present and alias not in renames:
+                    renames[alias] = standard
+                    break
+
+    if columns is None:
+        return None, renames
+
+    source_by_standard = {standard: source for source, standard in renames.items()}
+    source_by_standard.update({column: column for column in available if column not in renames})
+    source_columns = [source_by_standard[column] for column in columns if column in source_by_standard]
+    return source_columns, {source: standard for source, standard in renames.items() if source in source_columns}
+
+
+def _finish(df: pd.DataFrame, dtypes: Optional[Dict], rename: Optional[Dict]) -> pd.DataFrame:
+    """Apply the dtypes not handled by the reader and the renames."""
+    if dtypes:
+        pending = {column: dtype for column, dtype in dtypes.items()
+                   if column in df.columns and str(df[column].dtype) != str(dtype)}
+        if pending:
+            df = df.astype(pending)
+    if rename:
+        df = df.rename(columns=rename)
+    return df
+
+
+def read_table(path: str, columns: Optional[List[str]] = None,
+               dtypes: Optional[Dict[str, str]] = None,
+               rename: Optional[Dict[str, str]] = None,
+               use_threads: bool = True,
+               standardization: Optional[Dict[str, List[str]]] = None,
+               **csv_options) -> pd.DataFrame:
+    """
+    Read a whole table.
+
+    Args:
+        path: File path
+        columns: Columns to read (None = all). With ``standardization``,
+            by standard name; missing columns are skipped
+        dtypes: Column -> dtype map (names in the file)
+        rename: Column renames applied after reading
+        use_threads: Parse with several threads when the engine allows it
+        standardization: Standard name -> aliases, resolved against the header
+        **csv_options: Extra options for CSV files (sep, encoding, ...)
+
+    Returns:
+        pd.DataFrame: The table
+    """
+    if standardization is not None:
+        columns, renames = resolve_columns(read_columns(path, **csv_options), columns, standardization)
+        rename = {**renames, **(rename or {})}
+
+    info = detect_format(path)
+
+    if info['format'] == 'parquet':
+        table = pq.read_table(path, columns=columns, memory_map=True, use_threads=use_threads)
+        return _finish(table.to_pandas(), dtypes, rename)
+
+    if info['format'] == 'feather':
+        table = feather.read_table(path, columns=columns, memory_map=True, use_threads=use_threads)
+        return _finish(table.to_pandas(), dtypes, rename)
+
+    if info['format'] == 'xlsx':
+        df = pd.read_excel(path, usecols=columns, dtype=dtypes)
+        return _finish(df, None, rename)
+
+    # CSV: pyarrow engine (multithreaded) when available, C engine otherwise
+    options = dict(usecols=columns, dtype=dtypes, compression=info['compression'])
+    options.update(csv_options)
+    if PYARROW_AVAILABLE and use_threads and not {'chunksize', 'nrows', 'skiprows'} & set(csv_options):
+        try:
+            return _finish(pd.read_csv(path, engine='pyarrow', **options), None, rename)
+        except (ValueError, TypeError, pa.ArrowException):
+            pass  # Options not supported by the pyarrow engine
+    if info['compression'] is None:
+        options.setdefault('memory_map', True)
+    return _finish(pd.read_csv(path, **options), None, rename)
+
+
+def iter_chunks(path: str, chunk_rows: int = 500_000,
+                columns: Optional[List[str]] = None,
+                dtypes: Optional[Dict[str, str]] = None,
+                rename: Optional[Dict[str, str]] = None,
+                standardization: Optional[Dict[str, List[str]]] = None,
+                **csv_options) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over a table in chunks of at most ``chunk_rows`` rows.
+
+    Args:
+        path: File path
+        chunk_rows: Rows per chunk
+        columns: Columns to read (None = all); by standard name with ``standardization``
+        dtypes: Column -> dtype map (names in the file)
+        rename: Column renames applied to every chunk
+        standardization: Standard name -> aliases, resolved against the header
+        **csv_options: Extra options for CSV files
+
+    Yields:
+        pd.DataFrame: Consecutive chunks
+    """
+    if standardization is not None:
+        columns, renames = resolve_columns(read_columns(path, **csv_options), columns, standardization)
+        rename = {**renames, **(rename or {})}
+
+    info = detect_format(path)
+
+    if info['format'] == 'parquet':
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield _finish(batch.to_pandas(), dtypes, rename)
+        return
+
+    if info['format'] == 'feather':
+        # Memory-mapped: each batch is converted only when requested
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            yield _finish(batch.to_pandas(), dtypes, rename)
+        return
+
+    if info['format'] == 'xlsx':
+        df = read_table(path, columns, dtypes, rename)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+
+    options = dict(usecols=columns, dtype=dtypes, compression=info['compression'])
+    options.update(csv_options)
+    with pd.read_csv(path, chunksize=chunk_rows, **options) as reader:
+        for chunk in reader:
+            yield _finish(chunk, None, rename)
+
+
+def write_table(df: pd.DataFrame, path: str, index: bool = False, engine: Optional[str] = None,
+                **options) -> str:
+    """
+    Write a table in the format given by the output extension
+    (.csv, .csv.gz, .csv.zst, .parquet, .feather, .xlsx).
+
+    CSV is written with pandas by default. engine='pyarrow' uses the
+    multithreaded Arrow writer for plain CSV instead; its output differs
+    (quoted header and strings, true/false, timestamps with nanoseconds),
+    so only use it when the consumer does not depend on the pandas format.
+
+    Args:
+        df: Table to write
+        path: Output path
+        index: Write the index as well
+        engine: CSV writer, None (pandas) or 'pyarrow'
+        **options: Extra options for the underlying writer
+
+    Returns:
+        str: The path written
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    extension = os.path.splitext(path)[1].lower()
+    file_format, compression = EXTENSIONS.get(extension, ('csv', None))
+
+    if file_format == 'parquet':
+        options.setdefault('compression', 'zstd')
+        df.to_parquet(path, index=index, **options)
+    elif file_format == 'feather':
+        options.setdefault('compression', 'lz4')
+        (df.reset_index() if index else df.reset_index(drop=True)).to_feather(path, **options)
+    elif file_format == 'xlsx':
+        df.to_excel(path, index=index, **options)
+    elif engine == 'pyarrow' and compression is None and PYARROW_AVAILABLE and not index and not options:
+        # Multithreaded CSV writer; mixed-type columns fall back to pandas
+        try:
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+        except (pa.ArrowException, TypeError):
+            df.to_csv(path, index=False)
+    else:
+        df.to_csv(path, index=index, compression=compression, **options)
+
+    return path
@@ -1,12 +1,3 @@
-csv_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   ├── clean_csv.py
-│   └── detect_anomalies.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Tests for the data cleaning project.
+"""
@@ -1,11 +1,125 @@
-csv_data_cleaner/
-│
-├── data/
-│   ├── productos.csv
-│   └── proveedores.csv
-│
-├── scripts/
-│   ├── clean_data.py
-│
-├── requirements.txt
-└── README.md
\ No newline at end of file
+"""
+Tests for the anomaly detector (src/anomaly_detector.py).
+Run from the project root: python -m pytest tests/test_anomaly_detection.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from anomaly_detector import MAD_SCALE, AnomalyDetector, ledoit_wolf_covariance
+
+
+def make_table(n_rows: int = 2_000, seed: int = 0) -> pd.DataFrame:
+    """Correlated numeric columns."""
+    rng = np.random.default_rng(seed)
+    price = rng.normal(100, 15, n_rows)
+    return pd.DataFrame({
+        'precio': price,
+        'cantidad': rng.poisson(20, n_rows).astype(float),
+        'importe': price * 3 + rng.normal(0, 5, n_rows)
+    })
+
+
+def test_mad_scores_match_definition():
+    history = pd.DataFrame({'valor': [1.0, 2.0, 3.0, 4.0, 100.0]})
+    detector = AnomalyDetector(methods=('mad',)).fit(history)
+
+    # median 3, |x - 3| = [2, 1, 0, 1, 97] -> MAD 1
+    assert detector.median_[0] == 3.0
+    assert detector.mad_[0] == pytest.approx(MAD_SCALE)
+
+    scores = detector.score(pd.DataFrame({'valor': [3.0, 5.0, 100.0]}))
+    np.testing.assert_allclose(scores['mad_score'], [0.0, 2 / MAD_SCALE, 97 / MAD_SCALE])
+    assert scores['mad_flag'].tolist() == [False, False, True]
+    assert scores['mad_column'].tolist() == ['valor'] * 3
+
+
+def test_zero_mad_column_is_not_flagged_for_every_value():
+    # More than half the values are 0: the MAD is zero
+    rng = np.random.default_rng(1)
+    history = pd.DataFrame({'devoluciones': rng.choice([0.0, 1.0, 2.0], size=1_000, p=[0.7, 0.2, 0.1])})
+    detector = AnomalyDetector(methods=('mad',)).fit(history)
+
+    assert detector.mad_[0] > 0.5
+    scores = detector.score(pd.DataFrame({'devoluciones': [0.0, 1.0, 2.0, 50.0]}))
+    assert scores['mad_flag'].tolist() == [False, False, False, True]
+
+
+def test_constant_column_is_skipped_by_mad():
+    history = pd.DataFrame({'constante': np.ones(100), 'valor': np.arange(100, dtype=float)})
+    detector = AnomalyDetector(methods=('mad',)).fit(history)
+
+    assert np.isnan(detector.mad_[0])
+    scores = detector.score(pd.DataFrame({'constante': [2.0], 'valor': [50.0]}))
+    assert not scores['mad_flag'].iloc[0]
+    assert scores['mad_column'].iloc[0] == 'valor'
+
+
+def test_ledoit_wolf_matches_sklearn():
+    covariance_module = pytest.importorskip('sklearn.covariance')
+    X = make_table().to_numpy()
+    centered = X - X.mean(axis=0)
+
+    covariance, shrinkage = ledoit_wolf_covariance(centered, chunk_size=300)
+    reference = covariance_module.LedoitWolf(assume_centered=True).fit(centered)
+
+    assert shrinkage == pytest.approx(reference.shrinkage_, rel=1e-8)
+    np.testing.assert_allclose(covariance, reference.covariance_, rtol=1e-8)
+
+
+def test_mahalanobis_matches_sklearn():
+    covariance_module = pytest.importorskip('sklearn.covariance')
+    history = make_table()
+    detector = AnomalyDetector(methods=('mahalanobis',)).fit(history)
+
+    X = history.to_numpy()
+    reference = covariance_module.LedoitWolf(assume_centered=True).fit(X - X.mean(axis=0))
+    batch = make_table(100, seed=7)
+    # sklearn returns squared distances
+    expected = np.sqrt(reference.mahalanobis(batch.to_numpy() - X.mean(axis=0)))
+
+    np.testing.assert_allclose(detector.score(batch)['mahalanobis'], expected, rtol=1e-6)
+
+
+def test_chunked_partial_fit_matches_single_fit():
+    history = make_table(5_000)
+    single = AnomalyDetector().fit(history)
+    chunked = AnomalyDetector().fit(history.iloc[start:start + 700] for start in range(0, len(history), 700))
+
+    np.testing.assert_allclose(chunked.median_, single.median_)
+    np.testing.assert_allclose(chunked.mad_, single.mad_)
+    np.testing.assert_allclose(chunked.mean_, single.mean_)
+    np.testing.assert_allclose(chunked.precision_, single.precision_, rtol=1e-8)
+    assert chunked.mahalanobis_threshold_ == pytest.approx(single.mahalanobis_threshold_)
+
+    batch = make_table(500, seed=3)
+    pd.testing.assert_frame_equal(chunked.score(batch), single.score(batch))
+    assert chunked.summary()['rows_seen'] == len(history)
+
+
+def test_missing_values():
+    history = make_table(1_000)
+    history.iloc[::10, 0] = np.nan
+    detector = AnomalyDetector().fit(history)
+
+    # NaN are ignored by the median/MAD and imputed for Mahalanobis
+    np.testing.assert_allclose(detector.median_[0], np.nanmedian(history['precio']))
+    assert np.isfinite(detector.precision_).all()
+
+    batch = pd.DataFrame({'precio': [np.nan, np.nan, 100.0],
+                          'cantidad': [np.nan, 20.0, 20.0],
+                          'importe': [np.nan, 300.0, 300.0]})
+    scores = detector.score(batch)
+    # A fully missing row has no MAD score and is not flagged by it
+    assert np.isnan(scores['mad_score'].iloc[0])
+    assert not scores['mad_flag'].iloc[0]
+    # A missing value scores like the median
+    assert scores['mad_score'].iloc[1] == pytest.approx(
+        np.max(np.abs(batch.iloc[1, 1:].to_numpy() - detector.median_[1:]) / detector.mad_[1:]))
+    assert np.isfinite(scores['mahalanobis']).all()